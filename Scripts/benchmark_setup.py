@@ -0,0 +1,432 @@
+"""
+Headless benchmark and regression check for the Coding_with_Ai generator.
+
+Runs CodingWithAiSetup.run() against throwaway project roots in three scenarios and
+compares the results with a stored baseline:
+
+* cold            – empty project, every unit is rendered and written.
+* warm            – regeneration of an up-to-date project, nothing should be written.
+* single_unit     – one unit's template changed, only that unit and its dependents run.
+
+The generated C++ is snapshotted (one hash per file) in the same baseline. Deterministic
+results always gate the run: output drift, and a scenario touching more files or writing more
+bytes than recorded. Wall time and peak memory depend on the machine and the disk, so they are
+printed next to the baseline and only fail the run when a limit is given. No Unreal Editor is
+required:
+
+    python Scripts/benchmark_setup.py                     # compare with the baseline
+    python Scripts/benchmark_setup.py --max-slowdown 1.25 --max-memory-growth 1.25
+    python Scripts/benchmark_setup.py --update-baseline   # accept the current numbers
+
+With an engine installation it can also time an UnrealBuildTool compile of the module from
+scratch for every Build.cs profile. Those timings depend on the machine and are only reported:
+
+    python Scripts/benchmark_setup.py --compile-profiles MyGame/MyGame.uproject --engine-dir /opt/UE_5.6
+
+A project generated with --replication can be load-tested with a dedicated server and a
+number of bot clients on one machine. The server logs its bandwidth and frame time once a
+second, and the averages over the windows with every client connected are reported:
+
+    python Scripts/benchmark_setup.py --net-bench MyGame/MyGame.uproject --engine-dir /opt/UE_5.6 --map /Game/Maps/Arena
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import hashlib
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from typing import Callable, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import unreal_setup  # noqa: E402
+from unreal_setup import BUILD_PROFILES, CodingWithAiSetup, GenerationReport, GeneratorOptions  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "benchmark_baseline.json"
+BASELINE_VERSION = 1
+CHANGED_UNIT = "ProgressShaderManager"
+
+# Timings of a few milliseconds are noisy, so a slowdown has to exceed both the ratio and an
+# absolute floor before it fails the run.
+TIME_SLACK_SECONDS = 0.005
+MEMORY_SLACK_BYTES = 64 * 1024
+
+
+@dataclasses.dataclass
+class ScenarioResult:
+    name: str
+    seconds: float
+    bytes_written: int
+    files_touched: int
+    peak_memory: int
+
+
+# --------------------------------------------------------------------------------------
+# Scenarios
+# --------------------------------------------------------------------------------------
+def _bytes_written(setup: CodingWithAiSetup, report: GenerationReport) -> int:
+    return sum((setup.source_root / path).stat().st_size for path in report.written)
+
+
+def _prepare_cold(root: Path) -> Callable[[], tuple[CodingWithAiSetup, GenerationReport]]:
+    setup = CodingWithAiSetup(root)
+    return lambda: (setup, setup.run(quiet=True))
+
+
+def _prepare_warm(root: Path) -> Callable[[], tuple[CodingWithAiSetup, GenerationReport]]:
+    setup = CodingWithAiSetup(root)
+    setup.run(quiet=True)
+    return lambda: (setup, setup.run(quiet=True))
+
+
+def _prepare_single_unit(root: Path) -> Callable[[], tuple[CodingWithAiSetup, GenerationReport]]:
+    setup = CodingWithAiSetup(root)
+    setup.run(quiet=True)
+
+    # Simulate an edited template: the unit renders slightly different output from now on.
+    unit = setup.units[CHANGED_UNIT]
+    render = unit.render
+    setup.units[CHANGED_UNIT] = dataclasses.replace(
+        unit, render=lambda: tuple(f"{text}\n// edited" for text in render()), source_hash="edited"
+    )
+    unreal_setup._RENDER_CACHE.clear()
+    return lambda: (setup, setup.run(only=[CHANGED_UNIT], quiet=True))
+
+
+SCENARIOS: dict[str, Callable[[Path], Callable[[], tuple[CodingWithAiSetup, GenerationReport]]]] = {
+    "cold": _prepare_cold,
+    "warm": _prepare_warm,
+    "single_unit": _prepare_single_unit,
+}
+
+
+def run_scenario(name: str, repeats: int) -> ScenarioResult:
+    prepare = SCENARIOS[name]
+    timings = []
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as temp_dir, redirect_stdout(StringIO()):
+            unreal_setup._RENDER_CACHE.clear()
+            action = prepare(Path(temp_dir))
+            started = time.perf_counter()
+            setup, report = action()
+            timings.append(time.perf_counter() - started)
+            bytes_written = _bytes_written(setup, report)
+            files_touched = len(report.written)
+
+    # Memory is measured in a separate pass so tracing overhead does not skew the timings.
+    with tempfile.TemporaryDirectory() as temp_dir, redirect_stdout(StringIO()):
+        unreal_setup._RENDER_CACHE.clear()
+        action = prepare(Path(temp_dir))
+        tracemalloc.start()
+        try:
+            action()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return ScenarioResult(name, round(statistics.median(timings), 6), bytes_written, files_touched, peak_memory)
+
+
+def snapshot_output() -> dict[str, str]:
+    """Hash of every generated file for the default options, keyed by relative path."""
+    unreal_setup._RENDER_CACHE.clear()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        files = CodingWithAiSetup(temp_dir).render()
+    return {path.as_posix(): hashlib.sha256(data).hexdigest() for path, data in sorted(files.items())}
+
+
+# --------------------------------------------------------------------------------------
+# Baseline comparison
+# --------------------------------------------------------------------------------------
+def compare(
+    results: Sequence[ScenarioResult],
+    snapshot: dict[str, str],
+    baseline: dict,
+    max_slowdown: float | None = None,
+    max_memory_growth: float | None = None,
+) -> list[str]:
+    """Differences from the baseline that fail the run.
+
+    Time and peak memory are only checked against the ratios that are given.
+    """
+    problems = []
+    scenarios = baseline.get("scenarios", {})
+    for result in results:
+        expected = scenarios.get(result.name)
+        if expected is None:
+            problems.append(f"{result.name}: no baseline recorded")
+            continue
+        if result.files_touched > expected["files_touched"]:
+            problems.append(f"{result.name}: touched {result.files_touched} files vs baseline {expected['files_touched']}")
+        if result.bytes_written > expected["bytes_written"]:
+            problems.append(f"{result.name}: wrote {result.bytes_written} B vs baseline {expected['bytes_written']} B")
+        if max_slowdown is not None and result.seconds > expected["seconds"] * max_slowdown + TIME_SLACK_SECONDS:
+            problems.append(f"{result.name}: {result.seconds * 1000:.2f} ms vs baseline {expected['seconds'] * 1000:.2f} ms")
+        if max_memory_growth is not None and result.peak_memory > expected["peak_memory"] * max_memory_growth + MEMORY_SLACK_BYTES:
+            problems.append(f"{result.name}: peak memory {result.peak_memory} B vs baseline {expected['peak_memory']} B")
+
+    recorded = baseline.get("snapshot", {})
+    for path in sorted(set(recorded) | set(snapshot)):
+        if path not in snapshot:
+            problems.append(f"snapshot: {path} is no longer generated")
+        elif path not in recorded:
+            problems.append(f"snapshot: {path} is newly generated")
+        elif recorded[path] != snapshot[path]:
+            problems.append(f"snapshot: {path} output changed")
+    return problems
+
+
+# --------------------------------------------------------------------------------------
+# Compile time per build profile
+# --------------------------------------------------------------------------------------
+def _ubt_command(engine_dir: Path, uproject: Path, target: str, platform: str, *extra: str) -> list[str]:
+    script = "RunUBT.bat" if sys.platform == "win32" else "RunUBT.sh"
+    return [
+        str(engine_dir / "Engine" / "Build" / "BatchFiles" / script),
+        target,
+        platform,
+        "Development",
+        f"-Project={uproject}",
+        "-WaitMutex",
+        "-NoHotReloadFromIDE",
+        *extra,
+    ]
+
+
+def _clean_module(uproject: Path, platform: str, module: str) -> None:
+    """Delete the module's intermediate files so the next build compiles it from scratch.
+
+    A target-wide -Clean would also clean engine modules on a source-built engine.
+    """
+    build_dir = uproject.parent / "Intermediate" / "Build" / platform
+    for path in build_dir.glob(f"**/{module}"):
+        if path.is_dir() and path.parent.name == "Development":
+            shutil.rmtree(path)
+
+
+def _snapshot_files(paths: Sequence[Path]) -> dict[Path, tuple[bytes, int] | None]:
+    """Content and mtime of every file under paths; None marks a path that does not exist."""
+    snapshot: dict[Path, tuple[bytes, int] | None] = {}
+    for path in paths:
+        files = [path] if path.is_file() else [file for file in path.rglob("*") if file.is_file()] if path.is_dir() else []
+        if not files:
+            snapshot[path] = None
+        for file in files:
+            snapshot[file] = (file.read_bytes(), file.stat().st_mtime_ns)
+    return snapshot
+
+
+def _restore_files(paths: Sequence[Path], snapshot: dict[Path, tuple[bytes, int] | None]) -> None:
+    """Put paths back as snapshotted, timestamps included, so the next build sees no change."""
+    for path in paths:
+        current = [path] if path.is_file() else [file for file in path.rglob("*") if file.is_file()] if path.is_dir() else []
+        for file in current:
+            if snapshot.get(file) is None:
+                file.unlink()
+    for file, saved in snapshot.items():
+        if saved is None:
+            continue
+        data, mtime_ns = saved
+        if not file.exists() or file.read_bytes() != data:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            file.write_bytes(data)
+        os.utime(file, ns=(mtime_ns, mtime_ns))
+
+
+def compile_profiles(engine_dir: Path, uproject: Path, platform: str, module: str | None = None) -> dict[str, float]:
+    """Generate the module with each build profile and time an editor build of it from scratch.
+
+    The generated module and engine config are restored afterwards, so the project keeps
+    the profile it had. The build products are those of the last profile built.
+    """
+    uproject = uproject.resolve()
+    module = module or uproject.stem
+    target = f"{uproject.stem}Editor"
+    touched = [uproject.parent / "Source", uproject.parent / "Config" / "DefaultEngine.ini"]
+    original = _snapshot_files(touched)
+    timings = {}
+    try:
+        for profile in BUILD_PROFILES:
+            options = GeneratorOptions(project_name=module, module_api=f"{module.upper()}_API", build_profile=profile)
+            CodingWithAiSetup(uproject.parent, options).run(quiet=True)
+            _clean_module(uproject, platform, module)
+            started = time.perf_counter()
+            subprocess.run(_ubt_command(engine_dir, uproject, target, platform), check=True, capture_output=True)
+            timings[profile] = time.perf_counter() - started
+    finally:
+        _restore_files(touched, original)
+    return timings
+
+
+# --------------------------------------------------------------------------------------
+# Dedicated server with bot clients
+# --------------------------------------------------------------------------------------
+NET_BENCH_PORT = 7777
+NET_BENCH_LINE = re.compile(
+    r"NetBench clients=(?P<clients>\d+) out_bytes_per_sec=(?P<out>\d+) in_bytes_per_sec=(?P<in>\d+) "
+    r"avg_frame_ms=(?P<avg>[\d.]+) max_frame_ms=(?P<max>[\d.]+)"
+)
+
+
+def _editor_cmd(engine_dir: Path, platform: str) -> str:
+    suffix = ".exe" if platform == "Win64" else ""
+    return str(engine_dir / "Engine" / "Binaries" / platform / f"UnrealEditor-Cmd{suffix}")
+
+
+def net_bench(engine_dir: Path, uproject: Path, game_map: str, clients: int, seconds: float, platform: str) -> dict[str, float]:
+    """Run a dedicated server and bot clients, then average the server's NetBench windows."""
+    editor = _editor_cmd(engine_dir, platform)
+    uproject = uproject.resolve()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server_log = Path(temp_dir) / "server.log"
+        processes = [
+            subprocess.Popen(
+                [editor, str(uproject), game_map, "-server", "-nullrhi", "-nosound", "-unattended",
+                 "-CodingWithAiNetBench", f"-port={NET_BENCH_PORT}", f"-abslog={server_log}"],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+        ]
+        try:
+            for index in range(clients):
+                processes.append(subprocess.Popen(
+                    [editor, str(uproject), f"127.0.0.1:{NET_BENCH_PORT}", "-game", "-nullrhi", "-nosound", "-unattended",
+                     "-CodingWithAiBot", f"-abslog={Path(temp_dir) / f'client{index}.log'}"],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                ))
+            time.sleep(seconds)
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait()
+        log = server_log.read_text(encoding="utf-8", errors="replace") if server_log.exists() else ""
+
+    windows = [match for match in NET_BENCH_LINE.finditer(log) if int(match["clients"]) == clients]
+    if not windows:
+        return {}
+    return {
+        "windows": len(windows),
+        "out_bytes_per_sec": statistics.mean(int(match["out"]) for match in windows),
+        "in_bytes_per_sec": statistics.mean(int(match["in"]) for match in windows),
+        "avg_frame_ms": statistics.mean(float(match["avg"]) for match in windows),
+        "max_frame_ms": max(float(match["max"]) for match in windows),
+    }
+
+
+def _default_platform() -> str:
+    if sys.platform == "win32":
+        return "Win64"
+    return "Mac" if sys.platform == "darwin" else "Linux"
+
+
+def print_results(results: Sequence[ScenarioResult]) -> None:
+    print(f"{'Scenario':<12}  {'Time (ms)':>9}  {'Written (B)':>11}  {'Files':>5}  {'Peak mem (KiB)':>14}")
+    for result in results:
+        print(
+            f"{result.name:<12}  {result.seconds * 1000:>9.2f}  {result.bytes_written:>11}  "
+            f"{result.files_touched:>5}  {result.peak_memory / 1024:>14.1f}"
+        )
+
+
+def print_comparison(results: Sequence[ScenarioResult], baseline: dict) -> None:
+    """Time and memory relative to the recorded baseline."""
+    scenarios = baseline.get("scenarios", {})
+    for result in results:
+        expected = scenarios.get(result.name)
+        if expected and expected["seconds"] and expected["peak_memory"]:
+            print(
+                f"{result.name:<12}  time x{result.seconds / expected['seconds']:.2f}  "
+                f"peak memory x{result.peak_memory / expected['peak_memory']:.2f}  (baseline machine may differ)"
+            )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Coding_with_Ai generator against a stored baseline.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-slowdown", type=float, metavar="RATIO", help="fail when a scenario takes longer than RATIO x baseline")
+    parser.add_argument(
+        "--max-memory-growth", type=float, metavar="RATIO", help="fail when a scenario's peak traced memory exceeds RATIO x baseline"
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="record the current results as the baseline")
+    parser.add_argument("--compile-profiles", type=Path, metavar="UPROJECT", help="time a from-scratch module build per Build.cs profile")
+    parser.add_argument("--module", help="module generated by --compile-profiles; defaults to the .uproject name")
+    parser.add_argument("--net-bench", type=Path, metavar="UPROJECT", help="measure a dedicated server with bot clients")
+    parser.add_argument("--map", help="map loaded by the --net-bench server")
+    parser.add_argument("--clients", type=int, default=4, help="bot clients started by --net-bench")
+    parser.add_argument("--seconds", type=float, default=60.0, help="duration of the --net-bench run")
+    parser.add_argument("--engine-dir", type=Path, help="engine installation used by --compile-profiles and --net-bench")
+    parser.add_argument("--platform", default=_default_platform())
+    args = parser.parse_args(argv)
+
+    if args.net_bench:
+        if not args.engine_dir or not args.map:
+            parser.error("--net-bench needs --engine-dir and --map")
+        stats = net_bench(args.engine_dir, args.net_bench, args.map, args.clients, args.seconds, args.platform)
+        if not stats:
+            print(f"No NetBench samples with {args.clients} clients; was the project generated with --replication?")
+            return 1
+        print(f"{'Clients':>7}  {'Windows':>7}  {'Out (B/s)':>10}  {'In (B/s)':>10}  {'Avg frame (ms)':>14}  {'Worst (ms)':>10}")
+        print(
+            f"{args.clients:>7}  {stats['windows']:>7}  {stats['out_bytes_per_sec']:>10.0f}  {stats['in_bytes_per_sec']:>10.0f}  "
+            f"{stats['avg_frame_ms']:>14.2f}  {stats['max_frame_ms']:>10.2f}"
+        )
+        return 0
+
+    if args.compile_profiles:
+        if not args.engine_dir:
+            parser.error("--compile-profiles needs --engine-dir")
+        try:
+            timings = compile_profiles(args.engine_dir, args.compile_profiles, args.platform, args.module)
+        except subprocess.CalledProcessError as error:
+            print(f"UnrealBuildTool failed ({error.returncode}):\n{error.stdout.decode(errors='replace')}")
+            return 1
+        print(f"{'Profile':<16}  {'Compile (s)':>11}")
+        for profile, seconds in timings.items():
+            print(f"{profile:<16}  {seconds:>11.1f}")
+        return 0
+
+    results = [run_scenario(name, args.repeats) for name in SCENARIOS]
+    snapshot = snapshot_output()
+    print_results(results)
+
+    if args.update_baseline:
+        baseline = {
+            "version": BASELINE_VERSION,
+            "scenarios": {result.name: dataclasses.asdict(result) for result in results},
+            "snapshot": snapshot,
+        }
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    try:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}; run with --update-baseline first.")
+        return 1
+
+    print_comparison(results, baseline)
+    problems = compare(results, snapshot, baseline, args.max_slowdown, args.max_memory_growth)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    if not problems:
+        print("No regressions against the baseline.")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
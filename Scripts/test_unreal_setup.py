@@ -0,0 +1,35 @@
+"""
+Unit tests for the DefaultEngine.ini merge of the Coding_with_Ai generator.
+
+    python -m unittest discover Scripts
+"""
+
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from unreal_setup import COLLISION_PROFILE_SECTION, merge_collision_profile  # noqa: E402
+
+FOREIGN_PROFILE = (
+    '+Profiles=(Name="HeavyPickup",CollisionEnabled=QueryAndPhysics,bCanModify=True,'
+    'ObjectTypeName="Collectible",CustomResponses=((Channel="Pawn",Response=ECR_Overlap)))'
+)
+
+
+class MergeCollisionProfileTest(unittest.TestCase):
+    def test_keeps_project_profiles_using_the_collectible_object_type(self):
+        config = f"{COLLISION_PROFILE_SECTION}\r\n{FOREIGN_PROFILE}\r\n"
+
+        merged = merge_collision_profile(config)
+
+        self.assertIn(FOREIGN_PROFILE + "\r\n", merged)
+        self.assertEqual(merged.count('+Profiles=(Name="Collectible",'), 1)
+        self.assertEqual(merge_collision_profile(merged), merged)
+
+
+if __name__ == "__main__":
+    unittest.main()
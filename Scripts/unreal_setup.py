@@ -2,15 +2,421 @@
 UE5 Python setup script for the Coding_with_Ai project.
 Run this inside the Unreal Editor's Python console to scaffold the C++ gameplay classes
 needed for the third-person collection, AI pursuit, and shader feedback mechanics.
+
+It can also be run from a plain Python interpreter to generate several project checkouts
+in one process, e.g. on a build farm:
+
+    python Scripts/unreal_setup.py /farm/ProjectA /farm/ProjectB --jobs 4
+    python Scripts/unreal_setup.py --manifest projects.json
 """
 
 from __future__ import annotations
 
+import argparse
+import contextlib
+import difflib
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields, replace
+from functools import partial
 from pathlib import Path
 from textwrap import dedent
+from typing import Callable, Iterable, Sequence
 
 PROJECT_NAME = "Coding_with_Ai"
 MODULE_API = "CODING_WITH_AI_API"
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1
+MAX_WRITE_WORKERS = 16
+TEMPLATE_SPEC = "unit.json"
+TEMPLATE_CACHE_DIR = Path("Intermediate") / "CodingWithAiSetup" / "TemplateCache"
+TEMPLATE_CACHE_VERSION = 1
+
+# Project config the EngineConfig unit merges its settings into, relative to the module
+# source root.
+ENGINE_CONFIG = Path("../../Config/DefaultEngine.ini")
+COLLISION_PROFILE_SECTION = "[/Script/Engine.CollisionProfile]"
+COLLECTIBLE_CHANNEL = "Collectible"
+SYSTEM_SETTINGS_SECTION = "[SystemSettings]"
+PUSH_MODEL_CVAR = "net.IsPushModelEnabled"
+GAME_CHANNELS = tuple(f"ECC_GameTraceChannel{index}" for index in range(1, 19))
+
+SHADER_BACKENDS = ("dynamic_instance", "parameter_collection")
+GRAB_QUERIES = ("registry", "async_sweep")
+LOG_VERBOSITIES = ("NoLogging", "Fatal", "Error", "Warning", "Display", "Log", "Verbose", "VeryVerbose")
+
+# Hot functions wrapped in a cycle counter and an Unreal Insights CPU event scope.
+PROFILED_SCOPES = (
+    "TryCollectItem",
+    "GrabSweepResult",
+    "MovementInput",
+    "RefreshHeat",
+    "HandleTargetPerceptionUpdated",
+    "SearchTick",
+    "SearchScheduler",
+    "EvaluateSignificance",
+    "CollectibleQuery",
+    "PoolUpdate",
+    "PursuerVision",
+    "PursuerMovement",
+)
+
+# Default pursuer significance table: (max distance, tick interval, perception enabled,
+# tick pose while off-screen, net update frequency). Projects tune it under Project
+# Settings > Enemy Significance.
+ENEMY_SIGNIFICANCE_BUCKETS = (
+    (1500.0, 0.0, True, True, 30.0),
+    (4000.0, 0.1, True, False, 10.0),
+    (8000.0, 0.25, False, False, 2.0),
+)
+
+_BLANK_LINE_RUNS = re.compile(r"\n{3,}")
+_PLACEHOLDER = re.compile(r"\$\{([A-Z][A-Z0-9_]*)\}")
+_INCLUDE = re.compile(r'^\s*#include "([^"]+)"', re.MULTILINE)
+_INI_SECTION = re.compile(r"^\[.*\]$")
+_CHANNEL_RESPONSE = re.compile(r'^\+DefaultChannelResponses=\(Channel=(\w+),.*Name="([^"]*)"')
+# Only the generator's own channel and profile; project profiles may use the Collectible object type.
+_COLLECTIBLE_ENTRY = re.compile(
+    rf'^\+(?:DefaultChannelResponses=\(.*\bName="{COLLECTIBLE_CHANNEL}"|Profiles=\(Name="{COLLECTIBLE_CHANNEL}",)'
+)
+
+# Engine module providing an include, matched by longest path prefix; anything else is Engine.
+INCLUDE_MODULES = {
+    "CoreMinimal.h": "Core",
+    "Async/": "Core",
+    "HAL/": "Core",
+    "Math/": "Core",
+    "Misc/": "Core",
+    "ProfilingDebugging/": "Core",
+    "Stats/": "Core",
+    "UObject/": "CoreUObject",
+    "AIController.h": "AIModule",
+    "Navigation/": "AIModule",
+    "Perception/": "AIModule",
+    "NavigationSystem.h": "NavigationSystem",
+    "Engine/DeveloperSettings.h": "DeveloperSettings",
+    "MassEntity": "MassEntity",
+    "MassEntityTemplateRegistry.h": "MassSpawner",
+    "MassEntityTraitBase.h": "MassSpawner",
+    "MassExecutionContext.h": "MassEntity",
+    "MassProcessor.h": "MassEntity",
+    "MassCommon": "MassCommon",
+    "Net/Core/": "NetCore",
+    "Net/Serialization/": "NetCore",
+}
+_CORE_MODULES = ("Core", "CoreUObject", "Engine")
+
+
+def _header_module(header: str) -> str:
+    matches = [prefix for prefix in INCLUDE_MODULES if header.startswith(prefix)]
+    return INCLUDE_MODULES[max(matches, key=len)] if matches else "Engine"
+
+
+def _module_order(module: str) -> tuple[int, str]:
+    """Core modules first in their usual order, then the rest alphabetically."""
+    return (_CORE_MODULES.index(module), "") if module in _CORE_MODULES else (len(_CORE_MODULES), module)
+
+
+@dataclass(frozen=True)
+class BuildProfile:
+    """Module-level UnrealBuildTool settings written into Build.cs.
+
+    ``unity_bytes_per_cpp`` of 0 keeps UBT's default unity blob size, and
+    ``editor_optimize_code`` overrides ``optimize_code`` for editor targets when set.
+    """
+
+    description: str
+    unity: bool
+    unity_bytes_per_cpp: int
+    iwyu: str
+    optimize_code: str
+    editor_optimize_code: str | None = None
+
+
+BUILD_PROFILES = {
+    "fast_iteration": BuildProfile(
+        "Default unity blobs, unoptimized editor code, includes not enforced.",
+        unity=True,
+        unity_bytes_per_cpp=0,
+        iwyu="KeepAsIsForNow",
+        optimize_code="InNonDebugBuilds",
+        editor_optimize_code="Never",
+    ),
+    "ci": BuildProfile(
+        "Large unity blobs for clean builds, IWYU enforced.",
+        unity=True,
+        unity_bytes_per_cpp=1024 * 1024,
+        iwyu="Full",
+        optimize_code="Default",
+    ),
+    "shipping": BuildProfile(
+        "Large unity blobs, IWYU enforced, always optimized.",
+        unity=True,
+        unity_bytes_per_cpp=1024 * 1024,
+        iwyu="Full",
+        optimize_code="Always",
+    ),
+}
+
+
+@dataclass(frozen=True)
+class GeneratorOptions:
+    """Parameters baked into the rendered templates.
+
+    * shader_backend – ``dynamic_instance`` gives every ProgressShaderManager its own MID;
+      ``parameter_collection`` has one manager drive a shared UMaterialParameterCollection.
+    * grab_query – ``registry`` answers Grab from the collectible registry's grid on the input
+      frame; ``async_sweep`` queues a UWorld::AsyncSweepByObjectType on the Collectible channel
+      and collects next frame.
+    * mass_crowd – also emit a MassEntity pursuer archetype (trait, fragments, vision and
+      movement processors) for large crowds; hero enemies keep AEnemyAIController.
+    * replication – server-authoritative collection for dedicated servers: push-model
+      properties, dormant pickups, fast-array inventory deltas, distance-based enemy relevancy
+      and a NetBench probe for -server benchmarks.
+    * build_profile – key of BUILD_PROFILES controlling unity, PCH, IWYU and optimization
+      settings in the generated Build.cs.
+    * shipping_log_verbosity – most verbose LogCodingWithAi level compiled into Test and
+      Shipping builds; anything chattier is stripped at compile time.
+    * template_dir – directory of extra generation units (see load_template_units); a unit
+      named like a built-in one replaces it.
+    """
+
+    project_name: str = PROJECT_NAME
+    module_api: str = MODULE_API
+    shader_backend: str = "dynamic_instance"
+    shipping_log_verbosity: str = "Warning"
+    build_profile: str = "fast_iteration"
+    grab_query: str = "registry"
+    mass_crowd: bool = False
+    replication: bool = False
+    template_dir: str | None = None
+
+    def __post_init__(self) -> None:
+        if self.shader_backend not in SHADER_BACKENDS:
+            raise ValueError(f"Unknown shader backend {self.shader_backend!r}; expected one of {', '.join(SHADER_BACKENDS)}")
+        if self.shipping_log_verbosity not in LOG_VERBOSITIES:
+            raise ValueError(
+                f"Unknown log verbosity {self.shipping_log_verbosity!r}; expected one of {', '.join(LOG_VERBOSITIES)}"
+            )
+        if self.build_profile not in BUILD_PROFILES:
+            raise ValueError(f"Unknown build profile {self.build_profile!r}; expected one of {', '.join(BUILD_PROFILES)}")
+        if self.grab_query not in GRAB_QUERIES:
+            raise ValueError(f"Unknown grab query {self.grab_query!r}; expected one of {', '.join(GRAB_QUERIES)}")
+
+
+# Rendered, dedented file contents keyed by (options, unit name, unit source hash). Templates
+# only depend on the generator options, so every project sharing them reuses one rendering
+# per process.
+_RENDER_CACHE: dict[tuple[GeneratorOptions, str, str], tuple[bytes, ...]] = {}
+
+# Built-in templates live in this file, so its hash identifies their version.
+_GENERATOR_HASH = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+
+def _embed(snippet: str, indent: int) -> str:
+    """Prepare a multi-line template snippet for a ``{placeholder}`` indented by ``indent``."""
+    return dedent(snippet).strip().replace("\n", "\n" + " " * indent)
+
+
+@dataclass(frozen=True)
+class GenerationUnit:
+    """A named piece of the generated module.
+
+    ``render`` is only called when the unit is selected for a run and returns one template
+    string per entry in ``outputs`` (paths relative to the module source root).
+    ``dependencies`` name the units whose output this unit includes or otherwise relies on.
+    ``modules`` are extra engine modules for Build.cs that the include scan cannot infer, and
+    ``source_hash`` identifies the template version (the generator itself when empty).
+    Units that merge into files the project also edits set ``cacheable=False``; they are
+    rendered afresh on every run and written exactly as rendered.
+    """
+
+    name: str
+    outputs: tuple[Path, ...]
+    render: Callable[[], tuple[str, ...]]
+    dependencies: tuple[str, ...] = ()
+    modules: tuple[str, ...] = ()
+    source_hash: str = ""
+    cacheable: bool = True
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """An external template split into literal text (even indices) and placeholder names (odd)."""
+
+    digest: str
+    parts: tuple[str, ...]
+
+    def render(self, parameters: dict[str, str]) -> str:
+        return "".join(parameters[part] if index % 2 else part for index, part in enumerate(self.parts))
+
+
+_COMPILED_TEMPLATES: dict[str, CompiledTemplate] = {}
+
+
+def template_parameters(options: GeneratorOptions) -> dict[str, str]:
+    """``${NAME}`` values available to external templates: every option, upper-cased."""
+    return {option.name.upper(): str(getattr(options, option.name)) for option in fields(GeneratorOptions)}
+
+
+def compile_template(path: Path) -> CompiledTemplate:
+    """Parse a template file once per content hash."""
+    text = path.read_text(encoding="utf-8")
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    compiled = _COMPILED_TEMPLATES.get(digest)
+    if compiled is None:
+        parts = tuple(_PLACEHOLDER.split(text))
+        unknown = set(parts[1::2]) - set(template_parameters(GeneratorOptions()))
+        if unknown:
+            raise ValueError(f"{path}: unknown placeholder(s) {', '.join(sorted(unknown))}")
+        compiled = _COMPILED_TEMPLATES[digest] = CompiledTemplate(digest, parts)
+    return compiled
+
+
+def _render_templates(templates: tuple[CompiledTemplate, ...], options: GeneratorOptions) -> tuple[str, ...]:
+    parameters = template_parameters(options)
+    return tuple(template.render(parameters) for template in templates)
+
+
+def _merge_ini_section(config: str, section: str, owned: Callable[[str], bool], entries: Callable[[list[str]], list[str]]) -> str:
+    """Replace the lines of ``section`` that ``owned`` matches with ``entries(section_lines)``.
+
+    The entries take the place of the first owned line, or follow the section's last non-blank
+    line, and the section is appended when missing. Every other line of ``config`` is kept
+    byte for byte, line endings included; new lines use the file's newline style.
+    """
+    newline = "\r\n" if "\r\n" in config else "\n"
+    lines = config.splitlines(keepends=True)
+    try:
+        start = next(index for index, line in enumerate(lines) if line.strip() == section) + 1
+    except StopIteration:
+        if lines and not lines[-1].endswith(("\r", "\n")):
+            lines[-1] += newline
+        lines += [newline, section + newline] if lines else [section + newline]
+        start = len(lines)
+    end = next((index for index in range(start, len(lines)) if _INI_SECTION.match(lines[index].strip())), len(lines))
+
+    current = [line.rstrip("\r\n") for line in lines[start:end]]
+    owned_lines = {start + index for index, line in enumerate(current) if owned(line)}
+    if owned_lines:
+        insert = min(owned_lines)
+    else:
+        insert = start + next((index + 1 for index in reversed(range(len(current))) if current[index].strip()), 0)
+    if insert and not lines[insert - 1].endswith(("\r", "\n")):
+        lines[insert - 1] += newline
+    merged = [entry + newline for entry in entries(current)]
+    return "".join(lines[:insert] + merged + [line for index, line in enumerate(lines[insert:], insert) if index not in owned_lines])
+
+
+def merge_collision_profile(config: str) -> str:
+    """Add or refresh the Collectible object channel and profile in DefaultEngine.ini text.
+
+    An existing Collectible channel keeps its slot; otherwise the first game channel no
+    other entry uses is taken.
+    """
+
+    def entries(section: list[str]) -> list[str]:
+        channels = {}
+        for line in section:
+            match = _CHANNEL_RESPONSE.match(line.strip())
+            if match:
+                channels[match.group(2)] = match.group(1)
+
+        channel = channels.get(COLLECTIBLE_CHANNEL)
+        if channel is None:
+            used = set(channels.values())
+            channel = next((candidate for candidate in GAME_CHANNELS if candidate not in used), None)
+            if channel is None:
+                raise ValueError(f"{COLLISION_PROFILE_SECTION} has no free object channel for {COLLECTIBLE_CHANNEL}")
+        return [
+            f"+DefaultChannelResponses=(Channel={channel},DefaultResponse=ECR_Block,bTraceType=False,"
+            f'bStaticObject=False,Name="{COLLECTIBLE_CHANNEL}")',
+            f'+Profiles=(Name="{COLLECTIBLE_CHANNEL}",CollisionEnabled=QueryAndPhysics,bCanModify=False,'
+            f'ObjectTypeName="{COLLECTIBLE_CHANNEL}",CustomResponses=((Channel="Visibility",Response=ECR_Ignore),'
+            '(Channel="Camera",Response=ECR_Ignore)),HelpMessage="Pickups: block the world and pawns, '
+            'invisible to visibility and camera traces. Grab queries filter on this object type.")',
+        ]
+
+    return _merge_ini_section(config, COLLISION_PROFILE_SECTION, lambda line: bool(_COLLECTIBLE_ENTRY.match(line.strip())), entries)
+
+
+def merge_push_model(config: str) -> str:
+    """Turn on push-model replication (``net.IsPushModelEnabled``) in DefaultEngine.ini text."""
+    return _merge_ini_section(
+        config,
+        SYSTEM_SETTINGS_SECTION,
+        lambda line: line.strip().startswith(f"{PUSH_MODEL_CVAR}="),
+        lambda section: [f"{PUSH_MODEL_CVAR}=1"],
+    )
+
+
+def load_template_units(template_dir: Path, options: GeneratorOptions) -> list[GenerationUnit]:
+    """Read the generation units defined under ``template_dir``.
+
+    Every subdirectory holding a ``unit.json`` is one unit named after the directory::
+
+        {
+            "outputs": {"Public/Doors/Door.h": "Door.h.in", "Private/Doors/Door.cpp": "Door.cpp.in"},
+            "dependencies": ["AgentKaiCharacter"],
+            "modules": ["GameplayTags"]
+        }
+
+    Template files are plain C++ with ``${PROJECT_NAME}``, ``${MODULE_API}`` or any other
+    upper-cased GeneratorOptions field as placeholders, so braces need no escaping.
+    """
+    units = []
+    for spec_path in sorted(template_dir.glob(f"*/{TEMPLATE_SPEC}")):
+        spec = json.loads(spec_path.read_text(encoding="utf-8"))
+        outputs = spec.get("outputs")
+        if not isinstance(outputs, dict) or not outputs:
+            raise ValueError(f"{spec_path}: 'outputs' must map generated paths to template files")
+
+        templates = tuple(compile_template(spec_path.parent / name) for name in outputs.values())
+        source_hash = hashlib.sha256(
+            spec_path.read_bytes() + "".join(template.digest for template in templates).encode("ascii")
+        ).hexdigest()
+        units.append(
+            GenerationUnit(
+                spec_path.parent.name,
+                tuple(Path(output) for output in outputs),
+                partial(_render_templates, templates, options),
+                dependencies=tuple(spec.get("dependencies", ())),
+                modules=tuple(spec.get("modules", ())),
+                source_hash=source_hash,
+            )
+        )
+    return units
+
+
+@dataclass
+class GenerationReport:
+    """Files touched by a single run, as paths relative to the module source root.
+
+    * written  – rendered content differed from disk (or incremental mode was off).
+    * skipped  – content on disk already matched the rendered output and was left alone.
+    * stale    – recorded by an earlier run, no longer produced and edited since, so kept.
+    * pruned   – recorded by an earlier run, no longer produced and unmodified, so deleted.
+    * diffs    – unified diffs of every change, filled in by dry runs only.
+
+    In a dry run the lists describe what a real run would do; nothing is touched.
+    """
+
+    written: list[Path] = field(default_factory=list)
+    skipped: list[Path] = field(default_factory=list)
+    stale: list[Path] = field(default_factory=list)
+    pruned: list[Path] = field(default_factory=list)
+    diffs: list[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.written)} written, {len(self.skipped)} unchanged, "
+            f"{len(self.pruned)} pruned, {len(self.stale)} stale"
+        )
 
 
 class CodingWithAiSetup:
@@ -19,29 +425,359 @@ class CodingWithAiSetup:
     The script creates the UE5 C++ source tree with the following gameplay classes:
     * AAgentKaiCharacter      – playable hero with grab-and-attach collection logic.
     * ACollectibleItem        – pickup actor that can be attached to the hero's back.
+    * UCollectibleRegistrySubsystem – spatial grid of collectibles for grab/proximity queries.
+    * ACollectiblePoolManager – instanced idle pickups promoted to pooled actors near the player.
     * AEnemyAICharacter       – pursuer pawn configured for AI control.
+    * UEnemySignificanceSubsystem – distance/visibility LOD buckets for pursuers.
     * AEnemyAIController      – sight-based perception and chase/search behavior.
+    * UEnemySearchScheduler   – time-sliced, budgeted search steps shared by all enemies.
     * AProgressShaderManager  – dynamic material updater for distance + progress heat.
+    * CodingWithAiStats.h     – STATGROUP_CodingWithAi counters and Insights scopes.
+    * CodingWithAiLog.h       – LogCodingWithAi category and the CodingWithAi.DebugDraw CVar.
+    * Private/Tests           – CodingWithAi.Perf automation micro-benchmarks.
+    * Mass/Pursuer*           – optional MassEntity crowd pursuers (GeneratorOptions.mass_crowd).
     """
 
-    def __init__(self, project_root: Path | str | None = None) -> None:
+    def __init__(
+        self,
+        project_root: Path | str | None = None,
+        options: GeneratorOptions | None = None,
+        template_cache: bool = True,
+    ) -> None:
+        self.options = options or GeneratorOptions()
         self.project_root = Path(project_root or Path(__file__).resolve().parents[1]).resolve()
-        self.source_root = self.project_root / "Source" / PROJECT_NAME
+        self.template_cache_dir = self.project_root / TEMPLATE_CACHE_DIR if template_cache else None
+        self.source_root = self.project_root / "Source" / self.options.project_name
         self.public_dir = self.source_root / "Public"
         self.private_dir = self.source_root / "Private"
+        self.manifest_path = self.source_root.parent / f"{self.options.project_name}{MANIFEST_SUFFIX}"
+
+        self.units = self._build_registry()
+
+        self._incremental = True
+        self._dry_run = False
+        self._previous_manifest: dict[str, dict] = {}
+        self._manifest: dict[str, dict] = {}
+        self._selected: set[str] | None = None
+        self._report = GenerationReport()
 
     # ----------------------------------------------------------------------------------
     # Entry point
     # ----------------------------------------------------------------------------------
-    def run(self) -> None:
-        self._ensure_directories()
-        self._write_build_cs()
-        self._write_player_character()
-        self._write_collectible_item()
-        self._write_enemy_ai_character()
-        self._write_enemy_ai_controller()
-        self._write_shader_manager()
-        print("Coding_with_Ai C++ scaffolding generated. Review and build from the UE5 Editor.")
+    def run(
+        self,
+        only: Iterable[str] | None = None,
+        incremental: bool = True,
+        quiet: bool = False,
+        dry_run: bool = False,
+        prune: bool = True,
+    ) -> GenerationReport:
+        """Generate the module sources.
+
+        ``only`` restricts the run to the named units plus every unit that depends on them;
+        the rest are neither rendered nor touched. With ``incremental`` enabled, files whose
+        rendered content already matches the disk are not rewritten, so their timestamps stay
+        put and UnrealBuildTool skips them.
+
+        With ``prune``, files an earlier run generated that no unit produces any more are
+        deleted, unless they were edited since, along with the cached renders of those units. ``dry_run`` renders in memory only and returns
+        the same report plus unified diffs, without writing, deleting or caching anything.
+        """
+        self._dry_run = dry_run
+        self._incremental = incremental
+        # Loaded first: Build.cs takes the includes of units a selective run skips from it.
+        self._previous_manifest = self._load_manifest()
+        files = self.render(only)
+        self._manifest = {}
+        self._report = GenerationReport()
+
+        if dry_run:
+            self._diff_batch(files)
+        else:
+            self._ensure_directories()
+            self._write_batch(files)
+        self._collect_stale_files()
+        if prune:
+            self._prune_stale_files()
+            self._prune_template_cache()
+        if not dry_run:
+            self._save_manifest()
+
+        if not quiet:
+            if dry_run:
+                print("".join(self._report.diffs), end="")
+                print(f"{self.options.project_name} dry run under {self.source_root} ({self._report.summary()}); nothing was changed.")
+            else:
+                print(
+                    f"{self.options.project_name} C++ scaffolding generated under {self.source_root} ({self._report.summary()}). "
+                    "Review and build from the UE5 Editor."
+                )
+        return self._report
+
+    def render(self, only: Iterable[str] | None = None) -> dict[Path, bytes]:
+        """Render the selected units in memory, keyed by path relative to the source root."""
+        files: dict[Path, bytes] = {}
+        units = self.resolve_units(only)
+        self._selected = None if only is None else {unit.name for unit in units}
+        try:
+            for unit in units:
+                files.update(zip(unit.outputs, self._render_unit(unit)))
+        finally:
+            self._selected = None
+        return files
+
+    def _render_unit(self, unit: GenerationUnit) -> tuple[bytes, ...]:
+        source_hash = unit.source_hash or _GENERATOR_HASH
+        key = (self.options, unit.name, source_hash)
+        # In a selective run Build.cs also reflects what this project's manifest records for the
+        # skipped units, so it is rendered per project rather than shared through the caches.
+        cacheable = unit.cacheable and not (unit.name == "BuildRules" and self._selected is not None)
+        cached = _RENDER_CACHE.get(key) if cacheable else None
+        if cached is None and cacheable:
+            cached = self._load_cached_render(unit, source_hash)
+        if cached is None:
+            rendered = unit.render()
+            if len(rendered) != len(unit.outputs):
+                raise ValueError(f"Unit {unit.name} rendered {len(rendered)} files for {len(unit.outputs)} outputs")
+            if unit.cacheable:
+                # Optional template blocks that render empty leave blank runs behind; fold them.
+                cached = tuple(
+                    (_BLANK_LINE_RUNS.sub("\n\n", dedent(content).strip()) + "\n").encode("utf-8") for content in rendered
+                )
+            else:
+                # Merged output is the project's own file with our lines spliced in; write it as is.
+                cached = tuple(content.encode("utf-8") for content in rendered)
+            if not cacheable:
+                return cached
+            self._store_cached_render(unit, source_hash, cached)
+        _RENDER_CACHE[key] = cached
+        return cached
+
+    # ----------------------------------------------------------------------------------
+    # On-disk template cache
+    # ----------------------------------------------------------------------------------
+    def _cache_path(self, unit: GenerationUnit, source_hash: str) -> Path:
+        key = json.dumps([TEMPLATE_CACHE_VERSION, unit.name, source_hash, asdict(self.options)], sort_keys=True)
+        return self.template_cache_dir / f"{unit.name}-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:24]}.json"
+
+    def _load_cached_render(self, unit: GenerationUnit, source_hash: str) -> tuple[bytes, ...] | None:
+        if self.template_cache_dir is None:
+            return None
+        try:
+            contents = json.loads(self._cache_path(unit, source_hash).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        if not isinstance(contents, list) or len(contents) != len(unit.outputs):
+            return None
+        return tuple(content.encode("utf-8") for content in contents)
+
+    def _store_cached_render(self, unit: GenerationUnit, source_hash: str, rendered: tuple[bytes, ...]) -> None:
+        if self.template_cache_dir is None or self._dry_run:
+            return
+        path = self._cache_path(unit, source_hash)
+        self.template_cache_dir.mkdir(parents=True, exist_ok=True)
+        # Keep a single rendering per unit; older template versions and other options go.
+        for old in self.template_cache_dir.glob(f"{unit.name}-*.json"):
+            if old != path and len(old.stem) == len(path.stem):
+                with contextlib.suppress(FileNotFoundError):
+                    old.unlink()
+        # A lost cache entry only costs a re-render, so skip the fsync.
+        self._atomic_write(path, json.dumps([content.decode("utf-8") for content in rendered]).encode("utf-8"), durable=False)
+
+    def _prune_template_cache(self) -> None:
+        """Delete cached renders of units these options no longer generate, e.g. MassCrowd."""
+        if self.template_cache_dir is None or self._dry_run or not self.template_cache_dir.is_dir():
+            return
+        for path in self.template_cache_dir.glob("*.json"):
+            # Cache files are named "<unit>-<24 hex digits>.json".
+            if path.stem[:-25] not in self.units:
+                with contextlib.suppress(FileNotFoundError):
+                    path.unlink()
+
+    # ----------------------------------------------------------------------------------
+    # Unit registry
+    # ----------------------------------------------------------------------------------
+    def _build_registry(self) -> dict[str, GenerationUnit]:
+        units = [
+            GenerationUnit(
+                "Stats",
+                (Path("Public/CodingWithAiStats.h"), Path("Private/CodingWithAiStats.cpp")),
+                self._render_stats,
+            ),
+            GenerationUnit(
+                "Diagnostics",
+                (Path("Public/CodingWithAiLog.h"), Path("Private/CodingWithAiLog.cpp")),
+                self._render_diagnostics,
+            ),
+            GenerationUnit(
+                "EngineConfig",
+                (ENGINE_CONFIG,),
+                self._render_engine_config,
+                cacheable=False,
+            ),
+            GenerationUnit(
+                "CollectibleRegistry",
+                (
+                    Path("Public/Collectibles/CollectibleRegistrySubsystem.h"),
+                    Path("Private/Collectibles/CollectibleRegistrySubsystem.cpp"),
+                ),
+                self._render_collectible_registry,
+                dependencies=("Stats",),
+            ),
+            GenerationUnit(
+                "CollectibleState",
+                (
+                    Path("Public/Collectibles/CollectibleStateSubsystem.h"),
+                    Path("Private/Collectibles/CollectibleStateSubsystem.cpp"),
+                ),
+                self._render_collectible_state,
+            ),
+            GenerationUnit(
+                "CollectibleItem",
+                (Path("Public/Collectibles/CollectibleItem.h"), Path("Private/Collectibles/CollectibleItem.cpp")),
+                self._render_collectible_item,
+                dependencies=("CollectibleRegistry", "CollectibleState", "EngineConfig"),
+            ),
+            GenerationUnit(
+                "CollectionInventory",
+                (
+                    Path("Public/Characters/CollectionInventoryComponent.h"),
+                    Path("Private/Characters/CollectionInventoryComponent.cpp"),
+                ),
+                self._render_collection_inventory,
+            ),
+            GenerationUnit(
+                "AgentKaiCharacter",
+                (Path("Public/Characters/AgentKaiCharacter.h"), Path("Private/Characters/AgentKaiCharacter.cpp")),
+                self._render_player_character,
+                dependencies=("CollectibleItem", "CollectibleRegistry", "CollectionInventory", "Diagnostics", "Stats"),
+            ),
+            GenerationUnit(
+                "CollectiblePool",
+                (Path("Public/Collectibles/CollectiblePoolManager.h"), Path("Private/Collectibles/CollectiblePoolManager.cpp")),
+                self._render_collectible_pool,
+                dependencies=("CollectibleItem", "CollectibleState", "Stats"),
+            ),
+            GenerationUnit(
+                "EnemySignificance",
+                (Path("Public/AI/EnemySignificanceSubsystem.h"), Path("Private/AI/EnemySignificanceSubsystem.cpp")),
+                self._render_enemy_significance,
+                dependencies=("Stats",),
+            ),
+            GenerationUnit(
+                "EnemySearchScheduler",
+                (Path("Public/AI/EnemySearchScheduler.h"), Path("Private/AI/EnemySearchScheduler.cpp")),
+                self._render_enemy_search_scheduler,
+                dependencies=("Stats",),
+            ),
+            GenerationUnit(
+                "EnemyAIController",
+                (Path("Public/AI/EnemyAIController.h"), Path("Private/AI/EnemyAIController.cpp")),
+                self._render_enemy_ai_controller,
+                dependencies=("Diagnostics", "EnemySearchScheduler", "Stats"),
+            ),
+            GenerationUnit(
+                "EnemyAICharacter",
+                (Path("Public/Characters/EnemyAICharacter.h"), Path("Private/Characters/EnemyAICharacter.cpp")),
+                self._render_enemy_ai_character,
+                dependencies=("EnemyAIController", "EnemySignificance", "Stats"),
+            ),
+            GenerationUnit(
+                "ProgressShaderManager",
+                (Path("Public/Shaders/ProgressShaderManager.h"), Path("Private/Shaders/ProgressShaderManager.cpp")),
+                self._render_shader_manager,
+                dependencies=("CollectionInventory", "Stats"),
+            ),
+            GenerationUnit(
+                "PerformanceTests",
+                (Path("Private/Tests/MovementPerfTest.cpp"), Path("Private/Tests/GameplayPerfSpec.cpp")),
+                self._render_performance_tests,
+                dependencies=("AgentKaiCharacter", "CollectibleItem", "EnemyAICharacter", "EnemyAIController", "ProgressShaderManager"),
+            ),
+        ]
+        if self.options.mass_crowd:
+            units.append(
+                GenerationUnit(
+                    "MassCrowd",
+                    (
+                        Path("Public/Mass/PursuerFragments.h"),
+                        Path("Public/Mass/PursuerTrait.h"),
+                        Path("Private/Mass/PursuerTrait.cpp"),
+                        Path("Public/Mass/PursuerProcessors.h"),
+                        Path("Private/Mass/PursuerProcessors.cpp"),
+                    ),
+                    self._render_mass_crowd,
+                    dependencies=("Stats",),
+                )
+            )
+        if self.options.replication:
+            units.append(
+                GenerationUnit(
+                    "NetBench",
+                    (Path("Public/Net/CodingWithAiNetBenchSubsystem.h"), Path("Private/Net/CodingWithAiNetBenchSubsystem.cpp")),
+                    self._render_net_bench,
+                    dependencies=("Diagnostics",),
+                )
+            )
+        if self.options.template_dir:
+            by_name = {unit.name: index for index, unit in enumerate(units)}
+            for unit in load_template_units(Path(self.options.template_dir), self.options):
+                if unit.name in by_name:
+                    units[by_name[unit.name]] = unit
+                else:
+                    units.append(unit)
+
+        # Build rules are derived from what the other units include, so they depend on all of them.
+        units.append(
+            GenerationUnit(
+                "BuildRules",
+                (Path(f"../{self.options.project_name}.Build.cs"), Path(f"Private/{self.options.project_name}PCH.h")),
+                self._render_build_cs,
+                dependencies=tuple(unit.name for unit in units),
+                source_hash=hashlib.sha256(
+                    "".join(unit.source_hash or _GENERATOR_HASH for unit in units).encode("ascii")
+                ).hexdigest(),
+            )
+        )
+        return {unit.name: unit for unit in units}
+
+    def resolve_units(self, only: Iterable[str] | None = None) -> list[GenerationUnit]:
+        """Return the units a run would generate, dependencies first.
+
+        Without ``only`` every registered unit is returned; otherwise the named units plus all
+        units that (transitively) depend on them.
+        """
+        if only is None:
+            selected = set(self.units)
+        else:
+            selected = set(only)
+            unknown = selected - set(self.units)
+            if unknown:
+                raise ValueError(f"Unknown generation unit(s): {', '.join(sorted(unknown))}")
+            grew = True
+            while grew:
+                dependents = {unit.name for unit in self.units.values() if selected.intersection(unit.dependencies)}
+                grew = not dependents <= selected
+                selected |= dependents
+
+        ordered: list[GenerationUnit] = []
+        visiting: set[str] = set()
+
+        def visit(name: str) -> None:
+            unit = self.units[name]
+            if unit in ordered:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through generation unit {name}")
+            visiting.add(name)
+            for dependency in unit.dependencies:
+                visit(dependency)
+            visiting.discard(name)
+            ordered.append(unit)
+
+        for name in self.units:
+            visit(name)
+        return [unit for unit in ordered if unit.name in selected]
 
     # ----------------------------------------------------------------------------------
     # Filesystem helpers
@@ -49,62 +785,651 @@ class CodingWithAiSetup:
     def _ensure_directories(self) -> None:
         for path in [self.source_root, self.public_dir, self.private_dir]:
             path.mkdir(parents=True, exist_ok=True)
-        print(f"Ensured source directories under {self.source_root}")
 
-    def _write_file(self, relative_path: Path, content: str) -> None:
+    def _write_batch(self, files: dict[Path, bytes]) -> None:
+        """Sync every rendered file to disk at once through a thread pool.
+
+        Each changed file is written to a temp file in its target directory, fsynced and then
+        renamed over the destination, so builds and hot-reload never observe partial output.
+        """
+        for directory in {(self.source_root / relative_path).parent for relative_path in files}:
+            directory.mkdir(parents=True, exist_ok=True)
+
+        workers = max(1, min(MAX_WRITE_WORKERS, len(files)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(self._sync_file, files.keys(), files.values()))
+
+        for relative_path, written, entry in results:
+            (self._report.written if written else self._report.skipped).append(relative_path)
+            self._manifest[relative_path.as_posix()] = entry
+
+    def _sync_file(self, relative_path: Path, data: bytes) -> tuple[Path, bool, dict]:
         full_path = self.source_root / relative_path
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-        with full_path.open("w", encoding="utf-8") as file:
-            file.write(dedent(content).strip() + "\n")
-        print(f"Wrote {full_path.relative_to(self.project_root)}")
+        digest = hashlib.sha256(data).hexdigest()
+        entry = self._previous_manifest.get(relative_path.as_posix())
+
+        written = not (self._incremental and self._is_up_to_date(full_path, digest, entry))
+        if written:
+            self._atomic_write(full_path, data)
+
+        stat = full_path.stat()
+        entry = {
+            "sha256": digest,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "includes": _INCLUDE.findall(data.decode("utf-8")),
+        }
+        return relative_path, written, entry
+
+    def _diff_batch(self, files: dict[Path, bytes]) -> None:
+        """Dry-run counterpart of _write_batch: compare with disk and record diffs instead."""
+        for relative_path, data in files.items():
+            full_path = self._full_path(relative_path)
+            try:
+                current = full_path.read_bytes()
+            except FileNotFoundError:
+                current = None
+
+            unchanged = current == data
+            (self._report.skipped if unchanged and self._incremental else self._report.written).append(relative_path)
+            if not unchanged:
+                self._report.diffs.append(self._unified_diff(relative_path, current, data))
+            self._manifest[relative_path.as_posix()] = {"sha256": hashlib.sha256(data).hexdigest()}
+
+    def _full_path(self, relative_path: Path) -> Path:
+        # Outputs outside the module use "..", which must not depend on the module folder existing.
+        return Path(os.path.normpath(self.source_root / relative_path))
+
+    def _unified_diff(self, relative_path: Path, old: bytes | None, new: bytes | None) -> str:
+        name = self._full_path(relative_path).relative_to(self.project_root).as_posix()
+        old_lines = old.decode("utf-8", errors="replace").splitlines(keepends=True) if old is not None else []
+        new_lines = new.decode("utf-8", errors="replace").splitlines(keepends=True) if new is not None else []
+        return "".join(
+            difflib.unified_diff(
+                old_lines,
+                new_lines,
+                fromfile=f"a/{name}" if old is not None else "/dev/null",
+                tofile=f"b/{name}" if new is not None else "/dev/null",
+            )
+        )
+
+    @staticmethod
+    def _atomic_write(full_path: Path, data: bytes, durable: bool = True) -> None:
+        try:
+            mode = full_path.stat().st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+
+        handle, temp_name = tempfile.mkstemp(dir=full_path.parent, prefix=f".{full_path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as file:
+                file.write(data)
+                if durable:
+                    file.flush()
+                    os.fsync(file.fileno())
+            os.chmod(temp_name, mode)
+            os.replace(temp_name, full_path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(temp_name)
+            raise
+
+    @staticmethod
+    def _is_up_to_date(full_path: Path, digest: str, entry: dict | None) -> bool:
+        try:
+            stat = full_path.stat()
+        except FileNotFoundError:
+            return False
+
+        # Fast path: the manifest already vouches for this exact file, no need to read it.
+        if entry and entry.get("sha256") == digest and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return True
+        return hashlib.sha256(full_path.read_bytes()).hexdigest() == digest
+
+    # ----------------------------------------------------------------------------------
+    # Manifest
+    # ----------------------------------------------------------------------------------
+    def _load_manifest(self) -> dict[str, dict]:
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def _save_manifest(self) -> None:
+        text = json.dumps({"version": MANIFEST_VERSION, "files": self._manifest}, indent=2, sort_keys=True) + "\n"
+        if not self.manifest_path.exists() or self.manifest_path.read_text(encoding="utf-8") != text:
+            self._atomic_write(self.manifest_path, text.encode("utf-8"))
+
+    def _collect_stale_files(self) -> None:
+        # Outputs of units skipped by a selective run keep their manifest entries. Files from
+        # earlier runs that no unit produces any more stay tracked (and reported) until they
+        # are removed from disk, so nothing the generator owns is forgotten.
+        owned = {path.as_posix() for unit in self.units.values() for path in unit.outputs}
+        for key, entry in self._previous_manifest.items():
+            if key in self._manifest:
+                continue
+            if key in owned:
+                self._manifest[key] = entry
+                continue
+            if not (self.source_root / key).exists():
+                continue
+            self._manifest[key] = entry
+            self._report.stale.append(Path(key))
+
+    def _prune_stale_files(self) -> None:
+        """Delete stale files that still hold exactly what the generator wrote."""
+        still_stale = []
+        for relative_path in self._report.stale:
+            full_path = self.source_root / relative_path
+            current = full_path.read_bytes()
+            # Project config outside Source is shared with the editor, so it is never deleted.
+            outside_source = relative_path.parts[:2] == ("..", "..")
+            if outside_source or hashlib.sha256(current).hexdigest() != self._manifest[relative_path.as_posix()].get("sha256"):
+                still_stale.append(relative_path)
+                continue
+
+            del self._manifest[relative_path.as_posix()]
+            self._report.pruned.append(relative_path)
+            if self._dry_run:
+                self._report.diffs.append(self._unified_diff(relative_path, current, None))
+                continue
+
+            full_path.unlink()
+            # Drop directories the pruned file leaves empty, but never leave the module tree.
+            directory = full_path.parent
+            while directory != self.source_root and self.source_root in directory.parents and not any(directory.iterdir()):
+                directory.rmdir()
+                directory = directory.parent
+        self._report.stale = still_stale
 
     # ----------------------------------------------------------------------------------
     # Build.cs
     # ----------------------------------------------------------------------------------
-    def _write_build_cs(self) -> None:
-        content = f'''
+    def _scan_includes(self) -> tuple[dict[str, set[Path]], set[str]]:
+        """Engine headers included by the other units, mapped to the generated files including
+        them, plus the modules needed by public headers."""
+        local_headers = {
+            Path(*output.parts[1:]).as_posix()
+            for unit in self.units.values()
+            for output in unit.outputs
+            if output.parts[0] == "Public"
+        }
+        engine_headers: dict[str, set[Path]] = {}
+        public_modules: set[str] = set()
+        for unit in self.units.values():
+            # Config merged outside the module holds no includes.
+            if unit.name == "BuildRules" or all(output.parts[0] == ".." for output in unit.outputs):
+                continue
+            for output, includes in self._unit_includes(unit):
+                for header in includes:
+                    if header in local_headers or header.endswith(".generated.h"):
+                        continue
+                    engine_headers.setdefault(header, set()).add(output)
+                    if output.parts[0] == "Public":
+                        public_modules.add(_header_module(header))
+        return engine_headers, public_modules
+
+    def _unit_includes(self, unit: GenerationUnit) -> list[tuple[Path, list[str]]]:
+        """Includes of each output of unit.
+
+        Units left out of a selective run are not rendered: their includes come from the
+        manifest, which records what is on disk. Older manifests without that record fall
+        back to rendering.
+        """
+        if self._selected is not None and unit.name not in self._selected:
+            entries = [self._previous_manifest.get(output.as_posix(), {}) for output in unit.outputs]
+            if all("includes" in entry for entry in entries):
+                return [(output, entry["includes"]) for output, entry in zip(unit.outputs, entries)]
+        return [(output, _INCLUDE.findall(content.decode("utf-8"))) for output, content in zip(unit.outputs, self._render_unit(unit))]
+
+    def _render_build_cs(self) -> tuple[str, ...]:
+        name = self.options.project_name
+        profile_name = self.options.build_profile
+        profile = BUILD_PROFILES[profile_name]
+        engine_headers, public_modules = self._scan_includes()
+
+        # The public set always carries the modules a UCLASS header needs.
+        public_modules |= {"Core", "CoreUObject", "Engine"}
+        private_modules = {_header_module(header) for header in engine_headers}
+        private_modules |= {module for unit in self.units.values() for module in unit.modules}
+        private_modules -= public_modules
+
+        # Engine headers shared by several gameplay files are parsed once, in the private PCH.
+        # Automation tests are left out so test-only headers stay out of game builds.
+        pch_headers = sorted(
+            (header for header, users in engine_headers.items() if sum("Tests" not in user.parts for user in users) > 1),
+            key=lambda header: (header != "CoreMinimal.h", header),
+        )
+        pch_includes = _embed("\n".join(f'#include "{header}"' for header in pch_headers), 12)
+
+        def module_list(modules: set[str]) -> str:
+            return _embed(",\n".join(f'"{module}"' for module in sorted(modules, key=_module_order)), 24)
+
+        unity_bytes = (
+            f"\n                    NumIncludedBytesPerUnityCPPOverride = {profile.unity_bytes_per_cpp};"
+            if profile.unity_bytes_per_cpp
+            else ""
+        )
+
+        optimize_code = (
+            f"Target.Type == TargetType.Editor ? CodeOptimization.{profile.editor_optimize_code} : "
+            f"CodeOptimization.{profile.optimize_code}"
+            if profile.editor_optimize_code
+            else f"CodeOptimization.{profile.optimize_code}"
+        )
+
+        build_cs = f'''
             using UnrealBuildTool;
             
-            public class {PROJECT_NAME} : ModuleRules
+            public class {name} : ModuleRules
             {{
-                public {PROJECT_NAME}(ReadOnlyTargetRules Target) : base(Target)
+                public {name}(ReadOnlyTargetRules Target) : base(Target)
                 {{
+                    // Build profile: {profile_name}. {profile.description}
                     PCHUsage = PCHUsageMode.UseExplicitOrSharedPCHs;
+                    PrivatePCHHeaderFile = "Private/{name}PCH.h";
+                    IWYUSupport = IWYUSupport.{profile.iwyu};
+                    OptimizeCode = {optimize_code};
+
+                    // Adaptive unity (on by default in UBT) compiles files edited under source
+                    // control outside their unity blob, so iteration stays incremental.
+                    bUseUnity = {"true" if profile.unity else "false"};{unity_bytes}
 
+                    // Stat counters and Insights markers are compiled out of Shipping builds.
+                    PublicDefinitions.Add(Target.Configuration == UnrealTargetConfiguration.Shipping ? "CODINGWITHAI_STATS=0" : "CODINGWITHAI_STATS=1");
+
+                    // Trimmed to the modules the generated headers and sources include.
                     PublicDependencyModuleNames.AddRange(new string[]
                     {{
-                        "Core",
-                        "CoreUObject",
-                        "Engine",
-                        "InputCore",
-                        "AIModule",
-                        "GameplayTasks",
-                        "UMG"
+                        {module_list(public_modules)}
                     }});
 
-                    PrivateDependencyModuleNames.AddRange(new string[] {{ }});
+                    PrivateDependencyModuleNames.AddRange(new string[]
+                    {{
+                        {module_list(private_modules)}
+                    }});
                 }}
             }}
         '''
-        self._write_file(Path(f"../{PROJECT_NAME}.Build.cs"), content)
+
+        pch = f'''
+            #pragma once
+
+            // Generated private PCH: engine headers included by more than one generated file.
+            {pch_includes}
+        '''
+        return build_cs, pch
+
+    # ----------------------------------------------------------------------------------
+    # Stats and profiling markers
+    # ----------------------------------------------------------------------------------
+    def _render_stats(self) -> tuple[str, ...]:
+        api = self.options.module_api
+        cycle_stats = _embed(
+            "\n".join(
+                f'DECLARE_CYCLE_STAT_EXTERN(TEXT("{name}"), STAT_CodingWithAi_{name}, STATGROUP_CodingWithAi, {api});'
+                for name in PROFILED_SCOPES
+            ),
+            12,
+        )
+        cycle_definitions = _embed("\n".join(f"DEFINE_STAT(STAT_CodingWithAi_{name});" for name in PROFILED_SCOPES), 12)
+
+        header = f'''
+            #pragma once
+
+            #include "CoreMinimal.h"
+            #include "ProfilingDebugging/CpuProfilerTrace.h"
+            #include "Stats/Stats.h"
+
+            // Set by the module's Build.cs: enabled in every configuration except Shipping.
+            #ifndef CODINGWITHAI_STATS
+            #define CODINGWITHAI_STATS !UE_BUILD_SHIPPING
+            #endif
+
+            #if CODINGWITHAI_STATS
+
+            DECLARE_STATS_GROUP(TEXT("CodingWithAi"), STATGROUP_CodingWithAi, STATCAT_Advanced);
+
+            {cycle_stats}
+
+            DECLARE_DWORD_ACCUMULATOR_STAT_EXTERN(TEXT("Active enemies"), STAT_CodingWithAi_ActiveEnemies, STATGROUP_CodingWithAi, {api});
+            DECLARE_DWORD_ACCUMULATOR_STAT_EXTERN(TEXT("Registered collectibles"), STAT_CodingWithAi_RegisteredCollectibles, STATGROUP_CodingWithAi, {api});
+            DECLARE_DWORD_COUNTER_STAT_EXTERN(TEXT("Material parameter writes"), STAT_CodingWithAi_MaterialParameterWrites, STATGROUP_CodingWithAi, {api});
+
+            /** Cycle counter for `stat CodingWithAi` plus a matching Unreal Insights CPU event. */
+            #define CODINGWITHAI_SCOPE(Name) \\
+                SCOPE_CYCLE_COUNTER(STAT_CodingWithAi_##Name); \\
+                TRACE_CPUPROFILER_EVENT_SCOPE(CodingWithAi_##Name)
+
+            #define CODINGWITHAI_INC_COUNTER(Name) INC_DWORD_STAT(STAT_CodingWithAi_##Name)
+            #define CODINGWITHAI_DEC_COUNTER(Name) DEC_DWORD_STAT(STAT_CodingWithAi_##Name)
+
+            #else
+
+            #define CODINGWITHAI_SCOPE(Name)
+            #define CODINGWITHAI_INC_COUNTER(Name)
+            #define CODINGWITHAI_DEC_COUNTER(Name)
+
+            #endif
+        '''
+
+        source = f'''
+            #include "CodingWithAiStats.h"
+
+            #if CODINGWITHAI_STATS
+
+            {cycle_definitions}
+
+            DEFINE_STAT(STAT_CodingWithAi_ActiveEnemies);
+            DEFINE_STAT(STAT_CodingWithAi_RegisteredCollectibles);
+            DEFINE_STAT(STAT_CodingWithAi_MaterialParameterWrites);
+
+            #endif
+        '''
+
+        return header, source
+
+    # ----------------------------------------------------------------------------------
+    # Log category and debug switches
+    # ----------------------------------------------------------------------------------
+    def _render_diagnostics(self) -> tuple[str, ...]:
+        header = f'''
+            #pragma once
+
+            #include "CoreMinimal.h"
+            #include "HAL/IConsoleManager.h"
+
+            // Messages above the compile-time verbosity are removed by the preprocessor, format arguments included.
+            #if UE_BUILD_SHIPPING || UE_BUILD_TEST
+            DECLARE_LOG_CATEGORY_EXTERN(LogCodingWithAi, Log, {self.options.shipping_log_verbosity});
+            #else
+            DECLARE_LOG_CATEGORY_EXTERN(LogCodingWithAi, Log, All);
+            #endif
+
+            // Debug visuals only exist in Debug and Development builds.
+            #define CODINGWITHAI_DEBUG_DRAW !(UE_BUILD_SHIPPING || UE_BUILD_TEST)
+
+            #if CODINGWITHAI_DEBUG_DRAW
+            extern TAutoConsoleVariable<bool> CVarCodingWithAiDebugDraw;
+
+            /** True while `CodingWithAi.DebugDraw 1` asks for grab cones and other debug visuals. */
+            inline bool IsCodingWithAiDebugDrawEnabled()
+            {{
+                return CVarCodingWithAiDebugDraw.GetValueOnGameThread();
+            }}
+            #endif
+        '''
+
+        source = f'''
+            #include "CodingWithAiLog.h"
+
+            DEFINE_LOG_CATEGORY(LogCodingWithAi);
+
+            #if CODINGWITHAI_DEBUG_DRAW
+            TAutoConsoleVariable<bool> CVarCodingWithAiDebugDraw(
+                TEXT("CodingWithAi.DebugDraw"),
+                false,
+                TEXT("Draw grab cones and other {self.options.project_name} debug visuals."),
+                ECVF_Cheat);
+            #endif
+        '''
+
+        return header, source
+
+    # ----------------------------------------------------------------------------------
+    # Engine config
+    # ----------------------------------------------------------------------------------
+    def _render_engine_config(self) -> tuple[str, ...]:
+        # Merged into the project's own DefaultEngine.ini, so the current file is the template.
+        try:
+            config = self._full_path(ENGINE_CONFIG).read_bytes().decode("utf-8")
+        except FileNotFoundError:
+            config = ""
+        # Keep the byte order mark the editor may have written in front of the first section.
+        bom = "\ufeff" if config.startswith("\ufeff") else ""
+        config = merge_collision_profile(config[len(bom):])
+        if self.options.replication:
+            config = merge_push_model(config)
+        return (bom + config,)
 
     # ----------------------------------------------------------------------------------
     # Player character
     # ----------------------------------------------------------------------------------
-    def _write_player_character(self) -> None:
+    def _render_player_character(self) -> tuple[str, ...]:
+        if self.options.grab_query == "async_sweep":
+            # The sweep runs with the physics scene's async traces and its result is delivered
+            # through the delegate next frame, so the input frame only queues the request.
+            header_includes = """
+                #include "GameFramework/Character.h"
+                #include "WorldCollision.h"
+            """
+            grab_declarations = """
+                void HandleGrabSweep(const FTraceHandle& Handle, FTraceDatum& Datum);
+
+                FTraceDelegate GrabSweepDelegate;
+
+                /** Sweep queued by the last press; valid until its result has been handled. */
+                FTraceHandle PendingGrabSweep;
+            """
+            grab_includes = """
+                #include "Engine/World.h"
+            """
+            grab_defaults = """
+                GrabSweepDelegate.BindUObject(this, &AAgentKaiCharacter::HandleGrabSweep);
+            """
+            grab_setup = ""
+            grab_functions = """
+                void AAgentKaiCharacter::TryCollectItem()
+                {
+                    CODINGWITHAI_SCOPE(TryCollectItem);
+                    // Further presses fold into the sweep that is already in flight.
+                    if (PendingGrabSweep.IsValid())
+                    {
+                        return;
+                    }
+
+                    const FVector Origin = GetActorLocation();
+                    const FVector End = Origin + FollowCamera->GetForwardVector() * GrabDistance;
+                    FCollisionQueryParams Params(SCENE_QUERY_STAT(AgentKaiGrab), false, this);
+                    // Only pickups are on the Collectible object channel, so level geometry is never tested.
+                    PendingGrabSweep = GetWorld()->AsyncSweepByObjectType(
+                        EAsyncTraceType::Multi, Origin, End, FQuat::Identity,
+                        FCollisionObjectQueryParams(ACollectibleItem::GetCollectibleChannel()),
+                        FCollisionShape::MakeSphere(GrabRadius), Params, &GrabSweepDelegate);
+                }
+
+                void AAgentKaiCharacter::HandleGrabSweep(const FTraceHandle& Handle, FTraceDatum& Datum)
+                {
+                    CODINGWITHAI_SCOPE(GrabSweepResult);
+                    PendingGrabSweep = FTraceHandle();
+
+                    ACollectibleItem* Item = nullptr;
+                    for (const FHitResult& Hit : Datum.OutHits)
+                    {
+                        ACollectibleItem* Candidate = Cast<ACollectibleItem>(Hit.GetActor());
+                        if (Candidate && !Candidate->IsCollected())
+                        {
+                            Item = Candidate;
+                            break;
+                        }
+                    }
+
+                #if CODINGWITHAI_DEBUG_DRAW
+                    if (IsCodingWithAiDebugDrawEnabled())
+                    {
+                        const FColor Color = Item ? FColor::Green : FColor::Red;
+                        DrawDebugLine(GetWorld(), Datum.Start, Datum.End, Color, false, 2.0f);
+                        DrawDebugSphere(GetWorld(), Datum.End, GrabRadius, 12, Color, false, 2.0f);
+                    }
+                #endif
+
+                    if (Item)
+                    {
+                        UE_LOG(LogCodingWithAi, Log, TEXT("Grab query hit: %s"), *GetNameSafe(Item));
+                        CollectItem(Item);
+                    }
+                    else
+                    {
+                        UE_LOG(LogCodingWithAi, Verbose, TEXT("Grab query found nothing."));
+                    }
+                }
+            """
+        else:
+            header_includes = """
+                #include "GameFramework/Character.h"
+            """
+            grab_declarations = """
+                TWeakObjectPtr<UCollectibleRegistrySubsystem> CollectibleRegistry;
+            """
+            grab_includes = """
+                #include "Collectibles/CollectibleRegistrySubsystem.h"
+            """
+            grab_defaults = ""
+            grab_setup = """
+                CollectibleRegistry = GetWorld()->GetSubsystem<UCollectibleRegistrySubsystem>();
+            """
+            grab_functions = """
+                void AAgentKaiCharacter::TryCollectItem()
+                {
+                    CODINGWITHAI_SCOPE(TryCollectItem);
+                    UCollectibleRegistrySubsystem* Registry = CollectibleRegistry.Get();
+                    if (!Registry)
+                    {
+                        return;
+                    }
+
+                    // Aim with the camera but measure reach from the hero, so the boom length does not matter.
+                    const FVector Origin = GetActorLocation();
+                    const FVector AimDirection = FollowCamera->GetForwardVector();
+
+                    ACollectibleItem* Item = Registry->FindBestInCone(Origin, AimDirection, GrabDistance, GrabConeHalfAngle);
+                    if (!Item)
+                    {
+                        TArray<ACollectibleItem*> Nearby;
+                        if (Registry->FindNearestCollectibles(Origin, GrabRadius, 1, Nearby) > 0)
+                        {
+                            Item = Nearby[0];
+                        }
+                    }
+
+                #if CODINGWITHAI_DEBUG_DRAW
+                    if (IsCodingWithAiDebugDrawEnabled())
+                    {
+                        const float ConeAngle = FMath::DegreesToRadians(GrabConeHalfAngle);
+                        DrawDebugCone(GetWorld(), Origin, AimDirection, GrabDistance, ConeAngle, ConeAngle, 12, Item ? FColor::Green : FColor::Red, false, 2.0f);
+                    }
+                #endif
+
+                    if (Item)
+                    {
+                        UE_LOG(LogCodingWithAi, Log, TEXT("Grab query hit: %s"), *GetNameSafe(Item));
+                        CollectItem(Item);
+                    }
+                    else
+                    {
+                        UE_LOG(LogCodingWithAi, Verbose, TEXT("Grab query found nothing."));
+                    }
+                }
+            """
+
+        if self.options.replication:
+            # Clients only ask to grab; the server runs the query and owns the inventory.
+            net_declarations = """
+                /** Grab request from the owning client; the server runs the query. */
+                UFUNCTION(Server, Reliable)
+                void ServerStartGrab();
+
+                /** Net benchmark bot: circles and grabs once a second when started with -CodingWithAiBot. */
+                void TickBenchmarkBot(float DeltaTime);
+
+                bool bBenchmarkBot;
+                float BotGrabCooldown;
+            """
+            net_includes = """
+                #include "Misc/CommandLine.h"
+                #include "Misc/Parse.h"
+            """
+            net_defaults = """
+                bBenchmarkBot = false;
+                BotGrabCooldown = 0.0f;
+            """
+            net_setup = """
+                bBenchmarkBot = FParse::Param(FCommandLine::Get(), TEXT("CodingWithAiBot"));
+            """
+            tick_body = """
+                Super::Tick(DeltaTime);
+
+                if (bBenchmarkBot && IsLocallyControlled())
+                {
+                    TickBenchmarkBot(DeltaTime);
+                }
+            """
+            start_grab = """
+                void AAgentKaiCharacter::StartGrab()
+                {
+                    if (!HasAuthority())
+                    {
+                        ServerStartGrab();
+                        return;
+                    }
+
+                    TryCollectItem();
+                }
+
+                void AAgentKaiCharacter::ServerStartGrab_Implementation()
+                {
+                    TryCollectItem();
+                }
+
+                void AAgentKaiCharacter::TickBenchmarkBot(float DeltaTime)
+                {
+                    // A slow circle keeps the server replicating movement; the grabs exercise collection.
+                    FVector Forward, Right;
+                    ComputeYawBasis(GetWorld()->GetTimeSeconds() * 30.0f, Forward, Right);
+                    AddMovementInput(Forward, 1.0f);
+
+                    BotGrabCooldown -= DeltaTime;
+                    if (BotGrabCooldown <= 0.0f)
+                    {
+                        BotGrabCooldown = 1.0f;
+                        StartGrab();
+                    }
+                }
+            """
+        else:
+            net_declarations = ""
+            net_includes = ""
+            net_defaults = ""
+            net_setup = ""
+            tick_body = """
+                Super::Tick(DeltaTime);
+            """
+            start_grab = """
+                void AAgentKaiCharacter::StartGrab()
+                {
+                    TryCollectItem();
+                }
+            """
+
         header = f'''
             #pragma once
 
             #include "CoreMinimal.h"
-            #include "GameFramework/Character.h"
+            {_embed(header_includes, 12)}
             #include "AgentKaiCharacter.generated.h"
 
             class USpringArmComponent;
             class UCameraComponent;
             class ACollectibleItem;
+            class UCollectibleRegistrySubsystem;
+            class UCollectionInventoryComponent;
+            class UInstancedStaticMeshComponent;
 
             UCLASS()
-            class {MODULE_API} AAgentKaiCharacter : public ACharacter
+            class {self.options.module_api} AAgentKaiCharacter : public ACharacter
             {{
                 GENERATED_BODY()
 
@@ -114,14 +1439,30 @@ class CodingWithAiSetup:
                 virtual void Tick(float DeltaTime) override;
                 virtual void SetupPlayerInputComponent(class UInputComponent* PlayerInputComponent) override;
 
+                UFUNCTION(BlueprintPure, Category = "Collecting")
+                int32 GetCollectedCount() const;
+
+                UCollectionInventoryComponent* GetInventory() const {{ return Inventory; }}
+
+                /** Ground-plane forward and right vectors for a control yaw, as FRotationMatrix would give them. */
+                static void ComputeYawBasis(float Yaw, FVector& OutForward, FVector& OutRight);
+
+                /** Grab action handler; the automation perf tests drive it directly. */
+                void StartGrab();
+
             protected:
                 virtual void BeginPlay() override;
 
                 void MoveForward(float Value);
                 void MoveRight(float Value);
+                void HandleMoveInput(EAxis::Type Axis, float Value);
                 void TestLogAction();
-                void StartGrab();
                 void TryCollectItem();
+                void CollectItem(ACollectibleItem* Item);
+
+                {_embed(grab_declarations, 16)}
+
+                {_embed(net_declarations, 16)}
 
                 UPROPERTY(VisibleAnywhere, BlueprintReadOnly, Category = "Camera")
                 USpringArmComponent* CameraBoom;
@@ -129,12 +1470,30 @@ class CodingWithAiSetup:
                 UPROPERTY(VisibleAnywhere, BlueprintReadOnly, Category = "Camera")
                 UCameraComponent* FollowCamera;
 
+                UPROPERTY(VisibleAnywhere, BlueprintReadOnly, Category = "Collecting")
+                UCollectionInventoryComponent* Inventory;
+
+                /** Collected items drawn on the hero's back; set its static mesh to override the item mesh. */
+                UPROPERTY(VisibleAnywhere, BlueprintReadOnly, Category = "Collecting")
+                UInstancedStaticMeshComponent* BackDisplay;
+
                 UPROPERTY(EditDefaultsOnly, Category = "Collecting")
                 float GrabDistance;
 
                 UPROPERTY(EditDefaultsOnly, Category = "Collecting")
                 float GrabRadius;
 
+                /** Half angle of the aim cone searched in front of the camera. */
+                UPROPERTY(EditDefaultsOnly, Category = "Collecting")
+                float GrabConeHalfAngle;
+
+                UPROPERTY(EditDefaultsOnly, Category = "Collecting")
+                FName BackAttachSocket;
+
+                /** Yaw basis shared by both movement axes; rebuilt once per frame. */
+                FVector MoveForwardVector;
+                FVector MoveRightVector;
+                uint64 MoveBasisFrame;
             }};
         '''
 
@@ -142,10 +1501,16 @@ class CodingWithAiSetup:
             #include "Characters/AgentKaiCharacter.h"
 
             #include "Camera/CameraComponent.h"
+            #include "Characters/CollectionInventoryComponent.h"
+            #include "CodingWithAiLog.h"
+            #include "CodingWithAiStats.h"
             #include "Collectibles/CollectibleItem.h"
+            {_embed(grab_includes, 12)}
+            #include "Components/InstancedStaticMeshComponent.h"
+            #include "Components/StaticMeshComponent.h"
             #include "GameFramework/SpringArmComponent.h"
-            #include "Kismet/KismetSystemLibrary.h"
             #include "DrawDebugHelpers.h"
+            {_embed(net_includes, 12)}
 
             AAgentKaiCharacter::AAgentKaiCharacter()
             {{
@@ -160,19 +1525,43 @@ class CodingWithAiSetup:
                 FollowCamera->SetupAttachment(CameraBoom, USpringArmComponent::SocketName);
                 FollowCamera->bUsePawnControlRotation = false;
 
+                // One instanced mesh follows the socket, so carrying items adds no per-item transform updates.
+                Inventory = CreateDefaultSubobject<UCollectionInventoryComponent>(TEXT("Inventory"));
+                BackDisplay = CreateDefaultSubobject<UInstancedStaticMeshComponent>(TEXT("BackDisplay"));
+                BackDisplay->SetupAttachment(GetMesh());
+                BackDisplay->SetCollisionEnabled(ECollisionEnabled::NoCollision);
+                BackDisplay->SetCanEverAffectNavigation(false);
+
+                {_embed(grab_defaults, 16)}
+
+                {_embed(net_defaults, 16)}
+
                 GrabDistance = 250.0f;
                 GrabRadius = 60.0f;
+                GrabConeHalfAngle = 35.0f;
+                BackAttachSocket = TEXT("spine_03");
+                MoveForwardVector = FVector::ForwardVector;
+                MoveRightVector = FVector::RightVector;
+                MoveBasisFrame = TNumericLimits<uint64>::Max();
             }}
 
             void AAgentKaiCharacter::BeginPlay()
             {{
                 Super::BeginPlay();
-                UE_LOG(LogTemp, Log, TEXT("AgentKai ready for collection tests."));
+
+                {_embed(grab_setup, 16)}
+
+                BackDisplay->AttachToComponent(GetMesh(), FAttachmentTransformRules::SnapToTargetNotIncludingScale, BackAttachSocket);
+                Inventory->SetDisplay(BackDisplay);
+
+                {_embed(net_setup, 16)}
+
+                UE_LOG(LogCodingWithAi, Log, TEXT("AgentKai ready for collection tests."));
             }}
 
             void AAgentKaiCharacter::Tick(float DeltaTime)
             {{
-                Super::Tick(DeltaTime);
+                {_embed(tick_body, 16)}
             }}
 
             void AAgentKaiCharacter::SetupPlayerInputComponent(UInputComponent* PlayerInputComponent)
@@ -188,416 +1577,3358 @@ class CodingWithAiSetup:
                 PlayerInputComponent->BindAction("Grab", IE_Pressed, this, &AAgentKaiCharacter::StartGrab);
             }}
 
-            void AAgentKaiCharacter::MoveForward(float Value)
+            int32 AAgentKaiCharacter::GetCollectedCount() const
             {{
-                if (Controller && FMath::Abs(Value) > KINDA_SMALL_NUMBER)
-                {{
-                    const FRotator ControlRotation = Controller->GetControlRotation();
-                    const FRotator YawRotation(0.f, ControlRotation.Yaw, 0.f);
-
-                    const FVector Direction = FRotationMatrix(YawRotation).GetUnitAxis(EAxis::X);
-                    AddMovementInput(Direction, Value);
-                }}
+                return Inventory->GetItemCount();
             }}
 
-            void AAgentKaiCharacter::MoveRight(float Value)
+            void AAgentKaiCharacter::ComputeYawBasis(float Yaw, FVector& OutForward, FVector& OutRight)
             {{
-                if (Controller && FMath::Abs(Value) > KINDA_SMALL_NUMBER)
-                {{
-                    const FRotator ControlRotation = Controller->GetControlRotation();
-                    const FRotator YawRotation(0.f, ControlRotation.Yaw, 0.f);
-
-                    const FVector Direction = FRotationMatrix(YawRotation).GetUnitAxis(EAxis::Y);
-                    AddMovementInput(Direction, Value);
-                }}
+                float Sin, Cos;
+                FMath::SinCos(&Sin, &Cos, FMath::DegreesToRadians(Yaw));
+                OutForward = FVector(Cos, Sin, 0.0f);
+                OutRight = FVector(-Sin, Cos, 0.0f);
             }}
 
-            void AAgentKaiCharacter::TestLogAction()
+            void AAgentKaiCharacter::MoveForward(float Value)
             {{
-                UE_LOG(LogTemp, Log, TEXT("TestLog action pressed — input mapping confirmed."));
+                HandleMoveInput(EAxis::X, Value);
             }}
 
-            void AAgentKaiCharacter::StartGrab()
+            void AAgentKaiCharacter::MoveRight(float Value)
             {{
-                TryCollectItem();
+                HandleMoveInput(EAxis::Y, Value);
             }}
 
-            void AAgentKaiCharacter::TryCollectItem()
+            void AAgentKaiCharacter::HandleMoveInput(EAxis::Type Axis, float Value)
             {{
-                const FVector Start = FollowCamera->GetComponentLocation();
-                const FVector End = Start + FollowCamera->GetForwardVector() * GrabDistance;
-
-                FHitResult HitResult;
-                const bool bHit = UKismetSystemLibrary::SphereTraceSingle(
-                    GetWorld(),
-                    Start,
-                    End,
-                    GrabRadius,
-                    UEngineTypes::ConvertToTraceType(ECC_Visibility),
-                    false,
-                    {{ this }},
-                    EDrawDebugTrace::ForDuration,
-                    HitResult,
-                    true);
-
-                if (bHit)
+                CODINGWITHAI_SCOPE(MovementInput);
+                if (!Controller || FMath::Abs(Value) <= KINDA_SMALL_NUMBER)
                 {{
-                    UE_LOG(LogTemp, Log, TEXT("Grab trace hit: %s"), *GetNameSafe(HitResult.GetActor()));
+                    return;
                 }}
-                else
+
+                // Both axes fire every frame; the first one with input builds the basis for both.
+                if (MoveBasisFrame != GFrameCounter)
                 {{
-                    UE_LOG(LogTemp, Verbose, TEXT("Grab trace found nothing."));
+                    MoveBasisFrame = GFrameCounter;
+                    ComputeYawBasis(Controller->GetControlRotation().Yaw, MoveForwardVector, MoveRightVector);
                 }}
+
+                AddMovementInput(Axis == EAxis::X ? MoveForwardVector : MoveRightVector, Value);
             }}
 
-        '''
+            void AAgentKaiCharacter::TestLogAction()
+            {{
+                UE_LOG(LogCodingWithAi, Log, TEXT("TestLog action pressed — input mapping confirmed."));
+            }}
 
-        self._write_file(Path("Public/Characters/AgentKaiCharacter.h"), header)
-        self._write_file(Path("Private/Characters/AgentKaiCharacter.cpp"), source)
+            {_embed(start_grab, 12)}
 
-    # ----------------------------------------------------------------------------------
-    # Collectible item
-    # ----------------------------------------------------------------------------------
-    def _write_collectible_item(self) -> None:
-        header = f'''
-            #pragma once
-
-            #include "CoreMinimal.h"
-            #include "GameFramework/Actor.h"
-            #include "CollectibleItem.generated.h"
+            {_embed(grab_functions, 12)}
 
-            UCLASS()
-            class {MODULE_API} ACollectibleItem : public AActor
+            void AAgentKaiCharacter::CollectItem(ACollectibleItem* Item)
             {{
-                GENERATED_BODY()
-            
-            public:
-                ACollectibleItem();
-
-                void OnCollected();
+                // The actor itself leaves play; the inventory keeps its ID and the back display draws it.
+                Item->OnCollected();
+                Inventory->AddItem(Item->GetItemId(), Item->GetItemMesh()->GetStaticMesh());
+            }}
 
-            protected:
-                UPROPERTY(VisibleAnywhere, BlueprintReadOnly, Category = "Item")
-                UStaticMeshComponent* ItemMesh;
-            }};
         '''
 
-        source = f'''
-            #include "Collectibles/CollectibleItem.h"
+        return header, source
 
-            #include "Components/StaticMeshComponent.h"
+    # ----------------------------------------------------------------------------------
+    # Collection inventory
+    # ----------------------------------------------------------------------------------
+    def _render_collection_inventory(self) -> tuple[str, ...]:
+        if self.options.replication:
+            # A fast array sends only the entries added or removed since the last update.
+            storage_includes = """
+                #include "Net/Serialization/FastArraySerializer.h"
+            """
+            storage_types = """
+                class UCollectionInventoryComponent;
 
-            ACollectibleItem::ACollectibleItem()
-            {{
-                PrimaryActorTick.bCanEverTick = false;
+                USTRUCT()
+                struct FCollectedItemEntry : public FFastArraySerializerItem
+                {
+                    GENERATED_BODY()
 
-                ItemMesh = CreateDefaultSubobject<UStaticMeshComponent>(TEXT("ItemMesh"));
-                ItemMesh->SetCollisionEnabled(ECollisionEnabled::QueryAndPhysics);
-                ItemMesh->SetSimulatePhysics(true);
-                SetRootComponent(ItemMesh);
-            }}
+                    UPROPERTY()
+                    FName ItemId;
 
-            void ACollectibleItem::OnCollected()
-            {{
-                ItemMesh->SetSimulatePhysics(false);
-                SetActorEnableCollision(false);
-            }}
-        '''
+                    /** Mesh the item is displayed with, so clients can draw the stack too. */
+                    UPROPERTY()
+                    UStaticMesh* Mesh = nullptr;
+                };
 
-        self._write_file(Path("Public/Collectibles/CollectibleItem.h"), header)
-        self._write_file(Path("Private/Collectibles/CollectibleItem.cpp"), source)
+                USTRUCT()
+                struct FCollectedItemArray : public FFastArraySerializer
+                {
+                    GENERATED_BODY()
 
-    # ----------------------------------------------------------------------------------
-    # Enemy AI character
-    # ----------------------------------------------------------------------------------
-    def _write_enemy_ai_character(self) -> None:
-        header = f'''
-            #pragma once
+                    UPROPERTY()
+                    TArray<FCollectedItemEntry> Items;
 
-            #include "CoreMinimal.h"
-            #include "GameFramework/Character.h"
-            #include "EnemyAICharacter.generated.h"
+                    UPROPERTY(NotReplicated)
+                    UCollectionInventoryComponent* Owner = nullptr;
 
-            UCLASS()
-            class {MODULE_API} AEnemyAICharacter : public ACharacter
-            {{
-                GENERATED_BODY()
+                    void PostReplicatedReceive(const FFastArraySerializer::FPostReplicatedReceiveParameters& Parameters);
 
-            public:
-                AEnemyAICharacter();
-            }};
-        '''
+                    bool NetDeltaSerialize(FNetDeltaSerializeInfo& DeltaParameters)
+                    {
+                        return FFastArraySerializer::FastArrayDeltaSerialize<FCollectedItemEntry, FCollectedItemArray>(Items, DeltaParameters, *this);
+                    }
+                };
 
-        source = f'''
-            #include "Characters/EnemyAICharacter.h"
+                template<>
+                struct TStructOpsTypeTraits<FCollectedItemArray> : public TStructOpsTypeTraitsBase2<FCollectedItemArray>
+                {
+                    enum
+                    {
+                        WithNetDeltaSerializer = true,
+                    };
+                };
+            """
+            net_declarations = """
+                virtual void GetLifetimeReplicatedProps(TArray<FLifetimeProperty>& OutLifetimeProps) const override;
 
-            AEnemyAICharacter::AEnemyAICharacter()
-            {{
-                PrimaryActorTick.bCanEverTick = false;
-                AutoPossessAI = EAutoPossessAI::PlacedInWorldOrSpawned;
-            }}
-        '''
+                /** Refreshes the display and listeners after a client received inventory changes. */
+                void HandleItemsReplicated();
+            """
+            storage_declaration = """
+                UPROPERTY(Replicated)
+                FCollectedItemArray Items;
+            """
+            item_count = "Items.Items.Num()"
+            item_at = "Items.Items[Index].ItemId"
+            net_includes = """
+                #include "Net/Core/PushModel/PushModel.h"
+                #include "Net/UnrealNetwork.h"
+            """
+            net_defaults = """
+                SetIsReplicatedByDefault(true);
+                Items.Owner = this;
+            """
+            add_entry = """
+                FCollectedItemEntry& Entry = Items.Items.AddDefaulted_GetRef();
+                Entry.ItemId = ItemId;
+                Entry.Mesh = DisplayMesh;
+                Items.MarkItemDirty(Entry);
+                MARK_PROPERTY_DIRTY_FROM_NAME(UCollectionInventoryComponent, Items, this);
+            """
+            find_entry = "Items.Items.FindLastByPredicate([ItemId](const FCollectedItemEntry& Entry) { return Entry.ItemId == ItemId; })"
+            remove_entry = """
+                Items.Items.RemoveAt(Index, 1, EAllowShrinking::No);
+                Items.MarkArrayDirty();
+                MARK_PROPERTY_DIRTY_FROM_NAME(UCollectionInventoryComponent, Items, this);
+            """
+            display_mesh = """
+                if (!Display->GetStaticMesh())
+                {
+                    // Clients never run AddItem, so they take the mesh from the replicated entries.
+                    for (const FCollectedItemEntry& Entry : Items.Items)
+                    {
+                        if (Entry.Mesh)
+                        {
+                            Display->SetStaticMesh(Entry.Mesh);
+                            break;
+                        }
+                    }
+                }
+            """
+            net_functions = """
+                void UCollectionInventoryComponent::GetLifetimeReplicatedProps(TArray<FLifetimeProperty>& OutLifetimeProps) const
+                {
+                    Super::GetLifetimeReplicatedProps(OutLifetimeProps);
 
-        self._write_file(Path("Public/Characters/EnemyAICharacter.h"), header)
-        self._write_file(Path("Private/Characters/EnemyAICharacter.cpp"), source)
+                    FDoRepLifetimeParams Params;
+                    Params.bIsPushBased = true;
+                    DOREPLIFETIME_WITH_PARAMS_FAST(UCollectionInventoryComponent, Items, Params);
+                }
+
+                void UCollectionInventoryComponent::HandleItemsReplicated()
+                {
+                    SyncDisplay();
+                    OnCollectionChanged.Broadcast(GetItemCount());
+                }
+
+                void FCollectedItemArray::PostReplicatedReceive(const FFastArraySerializer::FPostReplicatedReceiveParameters& Parameters)
+                {
+                    if (Owner)
+                    {
+                        Owner->HandleItemsReplicated();
+                    }
+                }
+            """
+        else:
+            storage_includes = ""
+            storage_types = ""
+            net_declarations = ""
+            storage_declaration = """
+                UPROPERTY(VisibleInstanceOnly, Category = "Inventory")
+                TArray<FName> ItemIds;
+            """
+            item_count = "ItemIds.Num()"
+            item_at = "ItemIds[Index]"
+            net_includes = ""
+            net_defaults = ""
+            add_entry = """
+                ItemIds.Add(ItemId);
+            """
+            find_entry = "ItemIds.FindLast(ItemId)"
+            remove_entry = """
+                ItemIds.RemoveAt(Index, 1, EAllowShrinking::No);
+            """
+            display_mesh = ""
+            net_functions = ""
 
-    # ----------------------------------------------------------------------------------
-    # Enemy AI controller
-    # ----------------------------------------------------------------------------------
-    def _write_enemy_ai_controller(self) -> None:
         header = f'''
             #pragma once
 
             #include "CoreMinimal.h"
-            #include "AIController.h"
-            #include "EnemyAIController.generated.h"
+            #include "Components/ActorComponent.h"
+            {_embed(storage_includes, 12)}
+            #include "CollectionInventoryComponent.generated.h"
 
-            class UAIPerceptionComponent;
-            class UAISenseConfig_Sight;
+            class UInstancedStaticMeshComponent;
+            class UStaticMesh;
 
-            UCLASS()
-            class {MODULE_API} AEnemyAIController : public AAIController
+            DECLARE_DYNAMIC_MULTICAST_DELEGATE_OneParam(FOnCollectionChanged, int32, CollectedCount);
+
+            {_embed(storage_types, 12)}
+
+            /**
+             * Collected items as a flat array of item IDs. The count is the array size, and the items
+             * are drawn as stacked instances of one instanced mesh instead of attached actors.
+             */
+            UCLASS(ClassGroup = (CodingWithAi), meta = (BlueprintSpawnableComponent))
+            class {self.options.module_api} UCollectionInventoryComponent : public UActorComponent
             {{
                 GENERATED_BODY()
 
             public:
-                AEnemyAIController();
+                UCollectionInventoryComponent();
 
-            protected:
-                virtual void OnPossess(APawn* InPawn) override;
+                {_embed(net_declarations, 16)}
 
-                UFUNCTION()
-                void HandleTargetPerceptionUpdated(AActor* Actor, FAIStimulus Stimulus);
+                /** Records ItemId and adds an instance of DisplayMesh to the display. */
+                void AddItem(FName ItemId, UStaticMesh* DisplayMesh);
 
-                void BeginSearch();
-                void SearchTick();
+                /** Removes the most recent ItemId entry; returns false when there is none. */
+                bool RemoveItem(FName ItemId);
 
-                UPROPERTY(VisibleAnywhere, BlueprintReadOnly, Category = "AI")
-                UAIPerceptionComponent* PerceptionComponent;
+                /** Instanced mesh that draws the items, usually attached to a socket of the owner. */
+                void SetDisplay(UInstancedStaticMeshComponent* InDisplay);
 
-                UPROPERTY()
-                UAISenseConfig_Sight* SightConfig;
+                UFUNCTION(BlueprintPure, Category = "Inventory")
+                int32 GetItemCount() const {{ return {item_count}; }}
 
-                UPROPERTY()
-                FTimerHandle SearchTimerHandle;
+                FName GetItemId(int32 Index) const {{ return {item_at}; }}
 
-                UPROPERTY(EditDefaultsOnly, Category = "AI")
-                float SearchDuration;
+                /** Broadcast with the new total whenever an item is added or removed. */
+                UPROPERTY(BlueprintAssignable, Category = "Inventory")
+                FOnCollectionChanged OnCollectionChanged;
+
+            protected:
+                void SyncDisplay();
+
+                /** Distance between stacked items along the display's Z axis. */
+                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Inventory")
+                float StackSpacing;
+
+                /** Items past this count are kept in the inventory but not drawn. */
+                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Inventory", meta = (ClampMin = "0"))
+                int32 MaxDisplayedItems;
+
+                {_embed(storage_declaration, 16)}
+
+                UPROPERTY()
+                UInstancedStaticMeshComponent* Display;
             }};
         '''
 
         source = f'''
-            #include "AI/EnemyAIController.h"
+            #include "Characters/CollectionInventoryComponent.h"
 
-            #include "Perception/AIPerceptionComponent.h"
-            #include "Perception/AISenseConfig_Sight.h"
-            #include "Perception/AISense_Sight.h"
-            #include "Kismet/GameplayStatics.h"
+            #include "Components/InstancedStaticMeshComponent.h"
+            {_embed(net_includes, 12)}
 
-            AEnemyAIController::AEnemyAIController()
+            UCollectionInventoryComponent::UCollectionInventoryComponent()
             {{
-                PerceptionComponent = CreateDefaultSubobject<UAIPerceptionComponent>(TEXT("PerceptionComponent"));
-                SetPerceptionComponent(*PerceptionComponent);
-
-                SightConfig = CreateDefaultSubobject<UAISenseConfig_Sight>(TEXT("SightConfig"));
-                SightConfig->SightRadius = 900.0f;
-                SightConfig->LoseSightRadius = 1200.0f;
-                SightConfig->PeripheralVisionAngleDegrees = 75.0f;
-                SightConfig->SetMaxAge(5.0f);
-                SightConfig->DetectionByAffiliation.bDetectEnemies = true;
-                SightConfig->DetectionByAffiliation.bDetectFriendlies = true;
-                SightConfig->DetectionByAffiliation.bDetectNeutrals = true;
-
-                PerceptionComponent->ConfigureSense(*SightConfig);
-                PerceptionComponent->SetDominantSense(SightConfig->GetSenseImplementation());
-                PerceptionComponent->OnTargetPerceptionUpdated.AddDynamic(this, &AEnemyAIController::HandleTargetPerceptionUpdated);
+                PrimaryComponentTick.bCanEverTick = false;
+                {_embed(net_defaults, 16)}
 
-                SearchDuration = 60.0f;
+                StackSpacing = 12.0f;
+                MaxDisplayedItems = 32;
+                Display = nullptr;
             }}
 
-            void AEnemyAIController::OnPossess(APawn* InPawn)
+            void UCollectionInventoryComponent::AddItem(FName ItemId, UStaticMesh* DisplayMesh)
             {{
-                Super::OnPossess(InPawn);
-                UE_LOG(LogTemp, Log, TEXT("EnemyAIController possessed %s"), *GetNameSafe(InPawn));
+                {_embed(add_entry, 16)}
+                if (Display && !Display->GetStaticMesh() && DisplayMesh)
+                {{
+                    Display->SetStaticMesh(DisplayMesh);
+                }}
+
+                SyncDisplay();
+                OnCollectionChanged.Broadcast(GetItemCount());
             }}
 
-            void AEnemyAIController::HandleTargetPerceptionUpdated(AActor* Actor, FAIStimulus Stimulus)
+            bool UCollectionInventoryComponent::RemoveItem(FName ItemId)
             {{
-                if (!Actor)
+                const int32 Index = {find_entry};
+                if (Index == INDEX_NONE)
                 {{
-                    return;
+                    return false;
                 }}
 
-                if (Stimulus.WasSuccessfullySensed())
-                {{
-                    UE_LOG(LogTemp, Log, TEXT("Player seen: %s"), *Actor->GetName());
-                    MoveToActor(Actor, 75.0f);
-                    GetWorld()->GetTimerManager().ClearTimer(SearchTimerHandle);
-                }}
-                else
-                {{
-                    UE_LOG(LogTemp, Log, TEXT("Player lost: %s"), *Actor->GetName());
-                    BeginSearch();
-                }}
+                {_embed(remove_entry, 16)}
+                SyncDisplay();
+                OnCollectionChanged.Broadcast(GetItemCount());
+                return true;
             }}
 
-            void AEnemyAIController::BeginSearch()
+            void UCollectionInventoryComponent::SetDisplay(UInstancedStaticMeshComponent* InDisplay)
             {{
-                GetWorld()->GetTimerManager().SetTimer(SearchTimerHandle, this, &AEnemyAIController::SearchTick, 2.5f, true);
-                GetWorld()->GetTimerManager().SetTimerForNextTick([this]()
-                {{
-                    SearchTick();
-                }});
+                Display = InDisplay;
+                SyncDisplay();
             }}
 
-            void AEnemyAIController::SearchTick()
+            void UCollectionInventoryComponent::SyncDisplay()
             {{
-                if (!GetPawn())
+                if (!Display)
                 {{
                     return;
                 }}
 
-                const FVector Origin = GetPawn()->GetActorLocation();
-                const FVector RandomPoint = Origin + FMath::VRand() * 600.0f;
-                MoveToLocation(RandomPoint);
+                {_embed(display_mesh, 16)}
 
-                const float Elapsed = GetWorld()->GetTimerManager().GetTimerElapsed(SearchTimerHandle);
-                if (Elapsed > SearchDuration)
+                // Instances are stack slots in the display's local space, so only the top one changes.
+                const int32 Wanted = FMath::Min(GetItemCount(), MaxDisplayedItems);
+                while (Display->GetInstanceCount() > Wanted)
                 {{
-                    GetWorld()->GetTimerManager().ClearTimer(SearchTimerHandle);
+                    Display->RemoveInstance(Display->GetInstanceCount() - 1);
+                }}
+                while (Display->GetInstanceCount() < Wanted)
+                {{
+                    Display->AddInstance(FTransform(FVector(0.0f, 0.0f, Display->GetInstanceCount() * StackSpacing)), false);
                 }}
             }}
+
+            {_embed(net_functions, 12)}
         '''
 
-        self._write_file(Path("Public/AI/EnemyAIController.h"), header)
-        self._write_file(Path("Private/AI/EnemyAIController.cpp"), source)
+        return header, source
 
     # ----------------------------------------------------------------------------------
-    # Shader distance feedback
+    # Collectible item
     # ----------------------------------------------------------------------------------
-    def _write_shader_manager(self) -> None:
+    def _render_collectible_item(self) -> tuple[str, ...]:
+        if self.options.replication:
+            # Untouched pickups stay net-dormant; collection or a nudge wakes them for one update.
+            net_declarations = """
+                virtual void GetLifetimeReplicatedProps(TArray<FLifetimeProperty>& OutLifetimeProps) const override;
+            """
+            collected_declaration = """
+                UPROPERTY(ReplicatedUsing = OnRep_Collected)
+                bool bCollected;
+
+                UFUNCTION()
+                void OnRep_Collected();
+            """
+            net_includes = """
+                #include "Net/Core/PushModel/PushModel.h"
+                #include "Net/UnrealNetwork.h"
+            """
+            net_defaults = """
+                bReplicates = true;
+                SetReplicatingMovement(true);
+                NetDormancy = DORM_Initial;
+            """
+            set_collected = """
+                bCollected = true;
+                MARK_PROPERTY_DIRTY_FROM_NAME(ACollectibleItem, bCollected, this);
+                FlushNetDormancy();
+            """
+            clear_collected = """
+                bCollected = false;
+                MARK_PROPERTY_DIRTY_FROM_NAME(ACollectibleItem, bCollected, this);
+                FlushNetDormancy();
+            """
+            disturb_guard = "bCollected || !HasAuthority() || ItemMesh->IsSimulatingPhysics()"
+            wake_body = """
+                ItemMesh->SetSimulatePhysics(true);
+                ItemMesh->WakeRigidBody();
+
+                // Replicate the tumble; the item goes dormant again when it falls asleep.
+                SetNetDormancy(DORM_Awake);
+            """
+            settle_body = """
+                ItemMesh->SetSimulatePhysics(false);
+                if (HasAuthority())
+                {
+                    SetNetDormancy(DORM_DormantAll);
+                }
+            """
+            net_functions = """
+                void ACollectibleItem::GetLifetimeReplicatedProps(TArray<FLifetimeProperty>& OutLifetimeProps) const
+                {
+                    Super::GetLifetimeReplicatedProps(OutLifetimeProps);
+
+                    FDoRepLifetimeParams Params;
+                    Params.bIsPushBased = true;
+                    DOREPLIFETIME_WITH_PARAMS_FAST(ACollectibleItem, bCollected, Params);
+                }
+
+                void ACollectibleItem::OnRep_Collected()
+                {
+                    // Visibility replicates with the actor; collision and the registry entry are local.
+                    SetActorEnableCollision(!bCollected);
+                    UCollectibleRegistrySubsystem* Registry = GetWorld()->GetSubsystem<UCollectibleRegistrySubsystem>();
+                    if (Registry && bCollected)
+                    {
+                        Registry->UnregisterCollectible(this);
+                    }
+                }
+            """
+        else:
+            net_declarations = ""
+            collected_declaration = """
+                bool bCollected;
+            """
+            net_includes = ""
+            net_defaults = ""
+            set_collected = """
+                bCollected = true;
+            """
+            clear_collected = """
+                bCollected = false;
+            """
+            disturb_guard = "bCollected || ItemMesh->IsSimulatingPhysics()"
+            wake_body = """
+                ItemMesh->SetSimulatePhysics(true);
+                ItemMesh->WakeRigidBody();
+            """
+            settle_body = """
+                ItemMesh->SetSimulatePhysics(false);
+            """
+            net_functions = ""
+
         header = f'''
             #pragma once
 
             #include "CoreMinimal.h"
             #include "GameFramework/Actor.h"
-            #include "ProgressShaderManager.generated.h"
-
-            class UMaterialInstanceDynamic;
-            class UStaticMeshComponent;
+            #include "CollectibleItem.generated.h"
 
             UCLASS()
-            class {MODULE_API} AProgressShaderManager : public AActor
+            class {self.options.module_api} ACollectibleItem : public AActor
             {{
                 GENERATED_BODY()
-
+            
             public:
-                AProgressShaderManager();
+                ACollectibleItem();
 
-                virtual void Tick(float DeltaTime) override;
+                {_embed(net_declarations, 16)}
 
-            protected:
-                virtual void BeginPlay() override;
+                void OnCollected();
 
-                UFUNCTION(BlueprintCallable, Category = "Shader")
-                void RefreshHeat();
+                bool IsCollected() const {{ return bCollected; }}
 
-                UPROPERTY(VisibleAnywhere, BlueprintReadOnly, Category = "Shader")
-                UStaticMeshComponent* PreviewMesh;
+                FName GetItemId() const {{ return ItemId; }}
 
-                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Shader")
-                AActor* PlayerActor;
+                /** Switches a resting, kinematic pickup to simulated physics until it sleeps again. */
+                void Disturb();
 
-                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Shader")
-                AActor* TargetActor;
+                bool IsDisturbed() const;
 
-                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Shader")
-                float WarmDistance;
+                /** Object channel of the "{COLLECTIBLE_CHANNEL}" profile in DefaultEngine.ini; WorldDynamic without it. */
+                static ECollisionChannel GetCollectibleChannel();
 
-                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Shader")
-                float CoolDistance;
+                /** Hides the item and takes it out of play so a pool can hand it out again. */
+                void DeactivateForPool();
 
-                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Shader")
-                float CollectedIntensityScale;
+                /** Puts a pooled item back into play at Transform, kinematic until disturbed, as the placed item InPersistentId. */
+                void ActivateFromPool(const FTransform& Transform, const FGuid& InPersistentId);
 
-                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Shader")
-                UMaterialInterface* BaseMaterial;
+                UStaticMeshComponent* GetItemMesh() const {{ return ItemMesh; }}
 
-                UPROPERTY()
-                UMaterialInstanceDynamic* DynamicMaterial;
+                const FGuid& GetPersistentId() const {{ return PersistentId; }}
 
-                int32 CachedCollectedCount;
+                /** Takes an item that the collected-state table already lists out of play for good. */
+                void RemoveCollected();
+
+                virtual void OnConstruction(const FTransform& Transform) override;
+
+            #if WITH_EDITOR
+                virtual void PostEditImport() override;
+            #endif
+
+            protected:
+                virtual void BeginPlay() override;
+                virtual void EndPlay(const EEndPlayReason::Type EndPlayReason) override;
+
+                /** Re-files the item in the registry and makes it kinematic once physics has brought it to rest. */
+                UFUNCTION()
+                void HandleMeshSleep(UPrimitiveComponent* SleepingComponent, FName BoneName);
+
+                /** Wakes a kinematic pickup when a pawn or a moving pickup runs into it. */
+                UFUNCTION()
+                void HandleMeshHit(UPrimitiveComponent* HitComponent, AActor* OtherActor, UPrimitiveComponent* OtherComp, FVector NormalImpulse, const FHitResult& Hit);
+
+                UPROPERTY(VisibleAnywhere, BlueprintReadOnly, Category = "Item")
+                UStaticMeshComponent* ItemMesh;
+
+                /** Scales the engine's sleep thresholds; higher values let disturbed pickups settle sooner. */
+                UPROPERTY(EditAnywhere, Category = "Item", meta = (ClampMin = "0.1"))
+                float SleepThresholdMultiplier;
+
+                /** What the item is once collected; inventories store only this. */
+                UPROPERTY(EditAnywhere, BlueprintReadOnly, Category = "Item")
+                FName ItemId;
+
+                /** Stable id of a placed item, assigned in the editor; keys its collected-state entry. */
+                UPROPERTY(VisibleInstanceOnly, AdvancedDisplay, Category = "Item")
+                FGuid PersistentId;
+
+                {_embed(collected_declaration, 16)}
             }};
         '''
 
         source = f'''
-            #include "Shaders/ProgressShaderManager.h"
-
-            #include "Characters/AgentKaiCharacter.h"
             #include "Collectibles/CollectibleItem.h"
+
+            #include "Collectibles/CollectibleRegistrySubsystem.h"
+            #include "Collectibles/CollectibleStateSubsystem.h"
             #include "Components/StaticMeshComponent.h"
-            #include "Materials/MaterialInstanceDynamic.h"
-            #include "Kismet/KismetMathLibrary.h"
+            #include "Engine/CollisionProfile.h"
+            #include "Engine/World.h"
+            {_embed(net_includes, 12)}
 
-            AProgressShaderManager::AProgressShaderManager()
+            namespace
             {{
-                PrimaryActorTick.bCanEverTick = true;
+                const FName CollectibleProfileName(TEXT("{COLLECTIBLE_CHANNEL}"));
+            }}
 
-                PreviewMesh = CreateDefaultSubobject<UStaticMeshComponent>(TEXT("PreviewMesh"));
-                SetRootComponent(PreviewMesh);
+            ACollectibleItem::ACollectibleItem()
+            {{
+                PrimaryActorTick.bCanEverTick = false;
 
-                WarmDistance = 200.0f;
-                CoolDistance = 1200.0f;
-                CollectedIntensityScale = 0.15f;
-                CachedCollectedCount = 0;
+                // Idle pickups are kinematic: they block and can be queried, but cost the physics
+                // scene nothing until something runs into them.
+                ItemMesh = CreateDefaultSubobject<UStaticMeshComponent>(TEXT("ItemMesh"));
+                ItemMesh->SetCollisionProfileName(CollectibleProfileName);
+                ItemMesh->SetSimulatePhysics(false);
+                ItemMesh->SetNotifyRigidBodyCollision(true);
+                ItemMesh->BodyInstance.bGenerateWakeEvents = true;
+                ItemMesh->BodyInstance.bStartAwake = false;
+                ItemMesh->BodyInstance.SleepFamily = ESleepFamily::Custom;
+                ItemMesh->SetLinearDamping(0.2f);
+                ItemMesh->SetAngularDamping(0.5f);
+                SetRootComponent(ItemMesh);
+
+                {_embed(net_defaults, 16)}
+
+                ItemId = TEXT("Collectible");
+                SleepThresholdMultiplier = 4.0f;
+                bCollected = false;
             }}
 
-            void AProgressShaderManager::BeginPlay()
+            ECollisionChannel ACollectibleItem::GetCollectibleChannel()
+            {{
+                // The channel slot is picked when the profile is merged into DefaultEngine.ini, so look it up.
+                static const ECollisionChannel Channel = []()
+                {{
+                    FCollisionResponseTemplate Template;
+                    return UCollisionProfile::Get()->GetProfileTemplate(CollectibleProfileName, Template)
+                        ? Template.ObjectType.GetValue()
+                        : ECC_WorldDynamic;
+                }}();
+                return Channel;
+            }}
+
+            void ACollectibleItem::OnConstruction(const FTransform& Transform)
+            {{
+                Super::OnConstruction(Transform);
+
+                // Placed items get their id once in the editor; pooled and spawned ones take it from the pool.
+                if (!PersistentId.IsValid() && !GetWorld()->IsGameWorld())
+                {{
+                    PersistentId = FGuid::NewGuid();
+                }}
+            }}
+
+            #if WITH_EDITOR
+            void ACollectibleItem::PostEditImport()
+            {{
+                Super::PostEditImport();
+
+                // Pasted and duplicated items are new items, not copies of the original's state.
+                PersistentId = FGuid::NewGuid();
+            }}
+            #endif
+
+            void ACollectibleItem::BeginPlay()
             {{
                 Super::BeginPlay();
 
-                if (BaseMaterial)
+                // The cell of an item collected earlier, or listed by a loaded save, streams it in again.
+                const UCollectibleStateSubsystem* State = GetWorld()->GetSubsystem<UCollectibleStateSubsystem>();
+                if (State && State->IsCollected(PersistentId))
                 {{
-                    DynamicMaterial = UMaterialInstanceDynamic::Create(BaseMaterial, this);
-                    PreviewMesh->SetMaterial(0, DynamicMaterial);
+                    RemoveCollected();
+                    return;
                 }}
 
-                RefreshHeat();
+                ItemMesh->BodyInstance.CustomSleepThresholdMultiplier = SleepThresholdMultiplier;
+                ItemMesh->OnComponentSleep.AddDynamic(this, &ACollectibleItem::HandleMeshSleep);
+                ItemMesh->OnComponentHit.AddDynamic(this, &ACollectibleItem::HandleMeshHit);
+
+                // A pool may absorb the item before it begins play; it stays idle until activated.
+                if (IsHidden())
+                {{
+                    return;
+                }}
+                if (UCollectibleRegistrySubsystem* Registry = GetWorld()->GetSubsystem<UCollectibleRegistrySubsystem>())
+                {{
+                    Registry->RegisterCollectible(this);
+                }}
             }}
 
-            void AProgressShaderManager::Tick(float DeltaTime)
+            void ACollectibleItem::EndPlay(const EEndPlayReason::Type EndPlayReason)
             {{
-                Super::Tick(DeltaTime);
-                RefreshHeat();
+                if (UCollectibleRegistrySubsystem* Registry = GetWorld()->GetSubsystem<UCollectibleRegistrySubsystem>())
+                {{
+                    Registry->UnregisterCollectible(this);
+                }}
+
+                Super::EndPlay(EndPlayReason);
             }}
 
-            void AProgressShaderManager::RefreshHeat()
+            void ACollectibleItem::HandleMeshSleep(UPrimitiveComponent* SleepingComponent, FName BoneName)
             {{
-                if (!DynamicMaterial || !PlayerActor || !TargetActor)
+                {_embed(settle_body, 16)}
+                if (UCollectibleRegistrySubsystem* Registry = GetWorld()->GetSubsystem<UCollectibleRegistrySubsystem>())
                 {{
-                    return;
+                    Registry->UpdateCollectible(this);
                 }}
+            }}
 
-                const float Distance = FVector::Distance(PlayerActor->GetActorLocation(), TargetActor->GetActorLocation());
-                const float HeatAlpha = UKismetMathLibrary::MapRangeClamped(Distance, WarmDistance, CoolDistance, 1.0f, 0.0f);
+            void ACollectibleItem::HandleMeshHit(UPrimitiveComponent* HitComponent, AActor* OtherActor, UPrimitiveComponent* OtherComp, FVector NormalImpulse, const FHitResult& Hit)
+            {{
+                // Resting on the floor does not count; only movers wake a pickup.
+                if (OtherComp && OtherComp->Mobility == EComponentMobility::Movable)
+                {{
+                    Disturb();
+                }}
+            }}
 
-                float Intensity = HeatAlpha;
-                if (const AAgentKaiCharacter* Agent = Cast<AAgentKaiCharacter>(PlayerActor))
+            void ACollectibleItem::Disturb()
+            {{
+                if ({disturb_guard})
                 {{
-                    const int32 NewCount = Agent->GetMesh() ? Agent->GetMesh()->GetNumChildrenComponents() : CachedCollectedCount;
-                    CachedCollectedCount = NewCount;
-                    Intensity += NewCount * CollectedIntensityScale;
+                    return;
                 }}
 
-                DynamicMaterial->SetScalarParameterValue(TEXT("HeatValue"), HeatAlpha);
-                DynamicMaterial->SetScalarParameterValue(TEXT("HeatIntensity"), Intensity);
+                {_embed(wake_body, 16)}
             }}
-        '''
 
-        self._write_file(Path("Public/Shaders/ProgressShaderManager.h"), header)
-        self._write_file(Path("Private/Shaders/ProgressShaderManager.cpp"), source)
+            bool ACollectibleItem::IsDisturbed() const
+            {{
+                return ItemMesh->IsSimulatingPhysics();
+            }}
+
+            void ACollectibleItem::OnCollected()
+            {{
+                {_embed(set_collected, 16)}
+                if (UCollectibleRegistrySubsystem* Registry = GetWorld()->GetSubsystem<UCollectibleRegistrySubsystem>())
+                {{
+                    Registry->UnregisterCollectible(this);
+                }}
+                if (UCollectibleStateSubsystem* State = GetWorld()->GetSubsystem<UCollectibleStateSubsystem>())
+                {{
+                    State->MarkCollected(PersistentId);
+                }}
+
+                ItemMesh->SetSimulatePhysics(false);
+                SetActorEnableCollision(false);
+                SetActorHiddenInGame(true);
+            }}
+
+            void ACollectibleItem::RemoveCollected()
+            {{
+                {_embed(set_collected, 16)}
+                if (UCollectibleRegistrySubsystem* Registry = GetWorld()->GetSubsystem<UCollectibleRegistrySubsystem>())
+                {{
+                    Registry->UnregisterCollectible(this);
+                }}
+
+                // Placed items are destroyed to free their memory until the cell unloads; pooled
+                // actors are only hidden so their pool can hand them out again.
+                if (HasAuthority() && !GetOwner())
+                {{
+                    Destroy();
+                    return;
+                }}
+
+                ItemMesh->SetSimulatePhysics(false);
+                SetActorEnableCollision(false);
+                SetActorHiddenInGame(true);
+            }}
+
+            void ACollectibleItem::DeactivateForPool()
+            {{
+                if (UCollectibleRegistrySubsystem* Registry = GetWorld()->GetSubsystem<UCollectibleRegistrySubsystem>())
+                {{
+                    Registry->UnregisterCollectible(this);
+                }}
+
+                DetachFromActor(FDetachmentTransformRules::KeepWorldTransform);
+                ItemMesh->SetSimulatePhysics(false);
+                SetActorEnableCollision(false);
+                SetActorHiddenInGame(true);
+                // An idle pooled actor stands for no placed item until it is activated again.
+                PersistentId.Invalidate();
+            }}
+
+            void ACollectibleItem::ActivateFromPool(const FTransform& Transform, const FGuid& InPersistentId)
+            {{
+                {_embed(clear_collected, 16)}
+                PersistentId = InPersistentId;
+                SetActorTransform(Transform, false, nullptr, ETeleportType::ResetPhysics);
+                SetActorHiddenInGame(false);
+                SetActorEnableCollision(true);
+                ItemMesh->SetSimulatePhysics(false);
+
+                if (UCollectibleRegistrySubsystem* Registry = GetWorld()->GetSubsystem<UCollectibleRegistrySubsystem>())
+                {{
+                    Registry->RegisterCollectible(this);
+                }}
+            }}
+
+            {_embed(net_functions, 12)}
+        '''
+
+        return header, source
+
+    # ----------------------------------------------------------------------------------
+    # Collectible pool
+    # ----------------------------------------------------------------------------------
+    def _render_collectible_pool(self) -> tuple[str, ...]:
+        if self.options.replication:
+            # Replicated pickups rely on dormancy instead: clients would not see the server's instances.
+            pool_condition = "GetNetMode() != NM_Standalone || GetWorld()->IsPartitionedWorld()"
+            pool_comment = """
+                // Net games keep idle pickups dormant instead. World Partition already streams pickups
+                // by cell; absorbing them would tie cell actors to a pool that outlives the cell.
+            """
+        else:
+            pool_condition = "GetWorld()->IsPartitionedWorld()"
+            pool_comment = """
+                // World Partition already streams pickups by cell; absorbing them would tie cell
+                // actors and their collected state to a pool that outlives the cell.
+            """
+
+        header = f'''
+            #pragma once
+
+            #include "CoreMinimal.h"
+            #include "GameFramework/Actor.h"
+            #include "CollectiblePoolManager.generated.h"
+
+            class ACollectibleItem;
+            class UHierarchicalInstancedStaticMeshComponent;
+
+            /**
+             * Draws idle pickups as instances of one hierarchical instanced mesh and keeps a pool of
+             * ACollectibleItem actors. Instances near the player are promoted to pooled actors so
+             * they can be grabbed; untouched actors that fall behind are demoted back to instances.
+             */
+            UCLASS()
+            class {self.options.module_api} ACollectiblePoolManager : public AActor
+            {{
+                GENERATED_BODY()
+
+            public:
+                ACollectiblePoolManager();
+
+                /**
+                 * Activates a pooled item at Transform, spawning a new one when the pool is empty.
+                 * PersistentId is the placed item it stands for, so collecting it is remembered;
+                 * returns null when that item was already collected.
+                 */
+                ACollectibleItem* AcquireItem(const FTransform& Transform, const FGuid& PersistentId = FGuid());
+
+                /** Takes Item out of play and keeps it for reuse. */
+                void ReleaseItem(ACollectibleItem* Item);
+
+            protected:
+                virtual void BeginPlay() override;
+                virtual void EndPlay(const EEndPlayReason::Type EndPlayReason) override;
+
+                void AbsorbPlacedItems();
+                void UpdateRepresentation();
+                void PromoteNearbyInstances(const FVector& PlayerLocation);
+                void DemoteDistantItems(const FVector& PlayerLocation);
+
+                /** Adds an idle instance for the item PersistentId, reusing a freed slot when there is one. */
+                void AddIdleInstance(const FTransform& Transform, const FGuid& PersistentId);
+
+                /** Collapses an instance and frees its slot; indices never shift, so InstanceIds stays aligned. */
+                void RemoveIdleInstance(int32 InstanceIndex);
+
+                /** Drops the idle instances whose items the state subsystem lists as collected. */
+                UFUNCTION()
+                void RemoveCollectedInstances();
+
+                /** Forgets an item that leaves play, e.g. a placed one destroyed with its level. */
+                UFUNCTION()
+                void HandleItemEndPlay(AActor* Actor, EEndPlayReason::Type EndPlayReason);
+
+                /** Idle pickups; its static mesh selects which placed items the pool absorbs. */
+                UPROPERTY(VisibleAnywhere, BlueprintReadOnly, Category = "Pool")
+                UHierarchicalInstancedStaticMeshComponent* IdleInstances;
+
+                UPROPERTY(EditAnywhere, Category = "Pool")
+                TSubclassOf<ACollectibleItem> ItemClass;
+
+                /** Instances within this distance of the player become grabbable actors. */
+                UPROPERTY(EditAnywhere, Category = "Pool", meta = (ClampMin = "0.0"))
+                float PromoteRadius;
+
+                /** Resting actors beyond this distance return to instances; keep above PromoteRadius. */
+                UPROPERTY(EditAnywhere, Category = "Pool", meta = (ClampMin = "0.0"))
+                float DemoteRadius;
+
+                UPROPERTY(EditAnywhere, Category = "Pool", meta = (ClampMin = "0.01"))
+                float ScanInterval;
+
+                /** Actors spawned up front so promotion rarely has to spawn during play. */
+                UPROPERTY(EditAnywhere, Category = "Pool", meta = (ClampMin = "0"))
+                int32 PrewarmCount;
+
+                UPROPERTY()
+                TArray<ACollectibleItem*> AvailableItems;
+
+                UPROPERTY()
+                TArray<ACollectibleItem*> PromotedItems;
+
+                /** Persistent id of the placed item each instance stands for, by instance index. */
+                TArray<FGuid> InstanceIds;
+
+                /** Instance slots that currently draw nothing and can be reused. */
+                TBitArray<> FreeSlots;
+
+                FTimerHandle ScanTimerHandle;
+            }};
+        '''
+
+        source = f'''
+            #include "Collectibles/CollectiblePoolManager.h"
+
+            #include "Collectibles/CollectibleItem.h"
+            #include "Collectibles/CollectibleStateSubsystem.h"
+            #include "Components/HierarchicalInstancedStaticMeshComponent.h"
+            #include "CodingWithAiStats.h"
+            #include "Components/StaticMeshComponent.h"
+            #include "Engine/World.h"
+            #include "EngineUtils.h"
+            #include "GameFramework/Pawn.h"
+            #include "Kismet/GameplayStatics.h"
+            #include "TimerManager.h"
+
+            ACollectiblePoolManager::ACollectiblePoolManager()
+            {{
+                PrimaryActorTick.bCanEverTick = false;
+
+                IdleInstances = CreateDefaultSubobject<UHierarchicalInstancedStaticMeshComponent>(TEXT("IdleInstances"));
+                IdleInstances->SetCollisionEnabled(ECollisionEnabled::NoCollision);
+                SetRootComponent(IdleInstances);
+
+                ItemClass = ACollectibleItem::StaticClass();
+                PromoteRadius = 600.0f;
+                DemoteRadius = 900.0f;
+                ScanInterval = 0.2f;
+                PrewarmCount = 16;
+            }}
+
+            void ACollectiblePoolManager::BeginPlay()
+            {{
+                Super::BeginPlay();
+
+                {_embed(pool_comment, 16)}
+                if ({pool_condition})
+                {{
+                    return;
+                }}
+
+                // Hold every prewarmed item until all are spawned; releasing each one right away
+                // would hand the same actor back to the next acquire.
+                TArray<ACollectibleItem*> Prewarmed;
+                Prewarmed.Reserve(PrewarmCount);
+                for (int32 Index = 0; Index < PrewarmCount; ++Index)
+                {{
+                    Prewarmed.Add(AcquireItem(GetActorTransform()));
+                }}
+                for (ACollectibleItem* Item : Prewarmed)
+                {{
+                    ReleaseItem(Item);
+                }}
+
+                AbsorbPlacedItems();
+                if (UCollectibleStateSubsystem* State = GetWorld()->GetSubsystem<UCollectibleStateSubsystem>())
+                {{
+                    State->OnStateRestored.AddDynamic(this, &ACollectiblePoolManager::RemoveCollectedInstances);
+                }}
+                GetWorldTimerManager().SetTimer(ScanTimerHandle, this, &ACollectiblePoolManager::UpdateRepresentation, ScanInterval, true);
+            }}
+
+            void ACollectiblePoolManager::EndPlay(const EEndPlayReason::Type EndPlayReason)
+            {{
+                GetWorldTimerManager().ClearTimer(ScanTimerHandle);
+                if (UCollectibleStateSubsystem* State = GetWorld()->GetSubsystem<UCollectibleStateSubsystem>())
+                {{
+                    State->OnStateRestored.RemoveDynamic(this, &ACollectiblePoolManager::RemoveCollectedInstances);
+                }}
+                Super::EndPlay(EndPlayReason);
+            }}
+
+            ACollectibleItem* ACollectiblePoolManager::AcquireItem(const FTransform& Transform, const FGuid& PersistentId)
+            {{
+                const UCollectibleStateSubsystem* State = GetWorld()->GetSubsystem<UCollectibleStateSubsystem>();
+                if (State && State->IsCollected(PersistentId))
+                {{
+                    return nullptr;
+                }}
+
+                ACollectibleItem* Item = AvailableItems.IsEmpty() ? nullptr : AvailableItems.Pop(EAllowShrinking::No);
+                if (!Item)
+                {{
+                    FActorSpawnParameters SpawnParameters;
+                    SpawnParameters.Owner = this;
+                    SpawnParameters.SpawnCollisionHandlingOverride = ESpawnActorCollisionHandlingMethod::AlwaysSpawn;
+                    Item = GetWorld()->SpawnActor<ACollectibleItem>(ItemClass, Transform, SpawnParameters);
+                    if (!Item)
+                    {{
+                        return nullptr;
+                    }}
+
+                    Item->OnEndPlay.AddDynamic(this, &ACollectiblePoolManager::HandleItemEndPlay);
+
+                    if (IdleInstances->GetStaticMesh())
+                    {{
+                        Item->GetItemMesh()->SetStaticMesh(IdleInstances->GetStaticMesh());
+                    }}
+                }}
+
+                Item->ActivateFromPool(Transform, PersistentId);
+                PromotedItems.Add(Item);
+                return Item;
+            }}
+
+            void ACollectiblePoolManager::ReleaseItem(ACollectibleItem* Item)
+            {{
+                if (!Item)
+                {{
+                    return;
+                }}
+
+                Item->DeactivateForPool();
+                PromotedItems.RemoveSwap(Item, EAllowShrinking::No);
+                AvailableItems.AddUnique(Item);
+            }}
+
+            void ACollectiblePoolManager::AbsorbPlacedItems()
+            {{
+                const APawn* Player = UGameplayStatics::GetPlayerPawn(this, 0);
+                const float PromoteRadiusSquared = FMath::Square(PromoteRadius);
+
+                for (TActorIterator<ACollectibleItem> It(GetWorld()); It; ++It)
+                {{
+                    ACollectibleItem* Item = *It;
+                    if (Item->IsCollected() || Item->IsHidden() || Item->GetAttachParentActor() || AvailableItems.Contains(Item))
+                    {{
+                        continue;
+                    }}
+
+                    UStaticMesh* Mesh = Item->GetItemMesh()->GetStaticMesh();
+                    if (!IdleInstances->GetStaticMesh() && Mesh)
+                    {{
+                        IdleInstances->SetStaticMesh(Mesh);
+                    }}
+                    if (!Mesh || Mesh != IdleInstances->GetStaticMesh())
+                    {{
+                        continue;
+                    }}
+
+                    // Placed items have no owner and go away with their level, so the pool must let go.
+                    Item->OnEndPlay.AddUniqueDynamic(this, &ACollectiblePoolManager::HandleItemEndPlay);
+
+                    if (Player && FVector::DistSquared(Player->GetActorLocation(), Item->GetActorLocation()) <= PromoteRadiusSquared)
+                    {{
+                        PromotedItems.AddUnique(Item);
+                        continue;
+                    }}
+
+                    AddIdleInstance(Item->GetActorTransform(), Item->GetPersistentId());
+                    ReleaseItem(Item);
+                }}
+            }}
+
+            void ACollectiblePoolManager::AddIdleInstance(const FTransform& Transform, const FGuid& PersistentId)
+            {{
+                const int32 FreeSlot = FreeSlots.Find(true);
+                if (FreeSlot == INDEX_NONE)
+                {{
+                    IdleInstances->AddInstance(Transform, true);
+                    InstanceIds.Add(PersistentId);
+                    FreeSlots.Add(false);
+                    return;
+                }}
+
+                IdleInstances->UpdateInstanceTransform(FreeSlot, Transform, true, true);
+                InstanceIds[FreeSlot] = PersistentId;
+                FreeSlots[FreeSlot] = false;
+            }}
+
+            void ACollectiblePoolManager::RemoveIdleInstance(int32 InstanceIndex)
+            {{
+                FTransform Transform;
+                IdleInstances->GetInstanceTransform(InstanceIndex, Transform, true);
+                Transform.SetScale3D(FVector::ZeroVector);
+                IdleInstances->UpdateInstanceTransform(InstanceIndex, Transform, true, true);
+                InstanceIds[InstanceIndex].Invalidate();
+                FreeSlots[InstanceIndex] = true;
+            }}
+
+            void ACollectiblePoolManager::RemoveCollectedInstances()
+            {{
+                const UCollectibleStateSubsystem* State = GetWorld()->GetSubsystem<UCollectibleStateSubsystem>();
+                if (!State)
+                {{
+                    return;
+                }}
+
+                for (int32 InstanceIndex = 0; InstanceIndex < InstanceIds.Num(); ++InstanceIndex)
+                {{
+                    if (!FreeSlots[InstanceIndex] && State->IsCollected(InstanceIds[InstanceIndex]))
+                    {{
+                        RemoveIdleInstance(InstanceIndex);
+                    }}
+                }}
+            }}
+
+            void ACollectiblePoolManager::HandleItemEndPlay(AActor* Actor, EEndPlayReason::Type EndPlayReason)
+            {{
+                ACollectibleItem* Item = Cast<ACollectibleItem>(Actor);
+                AvailableItems.RemoveSwap(Item, EAllowShrinking::No);
+                PromotedItems.RemoveSwap(Item, EAllowShrinking::No);
+            }}
+
+            void ACollectiblePoolManager::UpdateRepresentation()
+            {{
+                CODINGWITHAI_SCOPE(PoolUpdate);
+                const APawn* Player = UGameplayStatics::GetPlayerPawn(this, 0);
+                if (!Player)
+                {{
+                    return;
+                }}
+
+                const FVector PlayerLocation = Player->GetActorLocation();
+                PromoteNearbyInstances(PlayerLocation);
+                DemoteDistantItems(PlayerLocation);
+            }}
+
+            void ACollectiblePoolManager::PromoteNearbyInstances(const FVector& PlayerLocation)
+            {{
+                const UCollectibleStateSubsystem* State = GetWorld()->GetSubsystem<UCollectibleStateSubsystem>();
+                const TArray<int32> Nearby = IdleInstances->GetInstancesOverlappingSphere(PlayerLocation, PromoteRadius, true);
+                for (const int32 InstanceIndex : Nearby)
+                {{
+                    FTransform Transform;
+                    if (FreeSlots[InstanceIndex] || !IdleInstances->GetInstanceTransform(InstanceIndex, Transform, true))
+                    {{
+                        continue;
+                    }}
+
+                    // A collected item stays gone; its instance only frees the slot.
+                    if ((State && State->IsCollected(InstanceIds[InstanceIndex])) || AcquireItem(Transform, InstanceIds[InstanceIndex]))
+                    {{
+                        RemoveIdleInstance(InstanceIndex);
+                    }}
+                }}
+            }}
+
+            void ACollectiblePoolManager::DemoteDistantItems(const FVector& PlayerLocation)
+            {{
+                const float DemoteRadiusSquared = FMath::Square(DemoteRadius);
+                for (int32 Index = PromotedItems.Num() - 1; Index >= 0; --Index)
+                {{
+                    ACollectibleItem* Item = PromotedItems[Index];
+                    if (!IsValid(Item))
+                    {{
+                        PromotedItems.RemoveAtSwap(Index, 1, EAllowShrinking::No);
+                        continue;
+                    }}
+
+                    if (Item->IsCollected())
+                    {{
+                        // The hero's inventory only keeps the item's ID, so the actor can be reused.
+                        ReleaseItem(Item);
+                        continue;
+                    }}
+
+                    if (!Item->IsDisturbed() && FVector::DistSquared(PlayerLocation, Item->GetActorLocation()) > DemoteRadiusSquared)
+                    {{
+                        AddIdleInstance(Item->GetActorTransform(), Item->GetPersistentId());
+                        ReleaseItem(Item);
+                    }}
+                }}
+            }}
+        '''
+
+        return header, source
+
+    # ----------------------------------------------------------------------------------
+    # Collectible registry
+    # ----------------------------------------------------------------------------------
+    def _render_collectible_registry(self) -> tuple[str, ...]:
+        header = f'''
+            #pragma once
+
+            #include "CoreMinimal.h"
+            #include "Subsystems/WorldSubsystem.h"
+            #include "CollectibleRegistrySubsystem.generated.h"
+
+            class ACollectibleItem;
+
+            /**
+             * Uniform grid of the collectibles in a world. Grab and proximity queries only visit the
+             * cells overlapping their radius instead of tracing against all visible geometry.
+             */
+            UCLASS()
+            class {self.options.module_api} UCollectibleRegistrySubsystem : public UWorldSubsystem
+            {{
+                GENERATED_BODY()
+
+            public:
+                void RegisterCollectible(ACollectibleItem* Item);
+                void UnregisterCollectible(ACollectibleItem* Item);
+
+                /** Moves a registered item to the cell matching its current location. */
+                void UpdateCollectible(ACollectibleItem* Item);
+
+                /** Closest item within Radius of Origin and inside the cone around Direction. */
+                ACollectibleItem* FindBestInCone(const FVector& Origin, const FVector& Direction, float Radius, float HalfAngleDegrees) const;
+
+                /** Fills OutItems with up to MaxCount items within Radius, nearest first, and returns how many were found. */
+                int32 FindNearestCollectibles(const FVector& Origin, float Radius, int32 MaxCount, TArray<ACollectibleItem*>& OutItems) const;
+
+                UFUNCTION(BlueprintCallable, Category = "Collecting")
+                TArray<ACollectibleItem*> GetNearestCollectibles(FVector Origin, float Radius, int32 MaxCount) const;
+
+                UFUNCTION(BlueprintPure, Category = "Collecting")
+                int32 GetNumRegistered() const {{ return CellByItem.Num(); }}
+
+            private:
+                FIntVector GetCell(const FVector& Location) const;
+
+                template <typename FunctorType>
+                void ForEachInRadius(const FVector& Origin, float Radius, FunctorType&& Functor) const;
+
+                /** Edge length of a grid cell; roughly the grab reach so a grab touches few cells. */
+                float CellSize = 400.0f;
+
+                TMap<FIntVector, TArray<ACollectibleItem*>> Cells;
+                TMap<ACollectibleItem*, FIntVector> CellByItem;
+            }};
+        '''
+
+        source = f'''
+            #include "Collectibles/CollectibleRegistrySubsystem.h"
+
+            #include "CodingWithAiStats.h"
+            #include "Collectibles/CollectibleItem.h"
+
+            FIntVector UCollectibleRegistrySubsystem::GetCell(const FVector& Location) const
+            {{
+                return FIntVector(
+                    FMath::FloorToInt(Location.X / CellSize),
+                    FMath::FloorToInt(Location.Y / CellSize),
+                    FMath::FloorToInt(Location.Z / CellSize));
+            }}
+
+            template <typename FunctorType>
+            void UCollectibleRegistrySubsystem::ForEachInRadius(const FVector& Origin, float Radius, FunctorType&& Functor) const
+            {{
+                const FIntVector MinCell = GetCell(Origin - FVector(Radius));
+                const FIntVector MaxCell = GetCell(Origin + FVector(Radius));
+                const float RadiusSquared = FMath::Square(Radius);
+
+                for (int32 X = MinCell.X; X <= MaxCell.X; ++X)
+                {{
+                    for (int32 Y = MinCell.Y; Y <= MaxCell.Y; ++Y)
+                    {{
+                        for (int32 Z = MinCell.Z; Z <= MaxCell.Z; ++Z)
+                        {{
+                            const TArray<ACollectibleItem*>* Bucket = Cells.Find(FIntVector(X, Y, Z));
+                            if (!Bucket)
+                            {{
+                                continue;
+                            }}
+
+                            for (ACollectibleItem* Item : *Bucket)
+                            {{
+                                const float DistanceSquared = FVector::DistSquared(Origin, Item->GetActorLocation());
+                                if (DistanceSquared <= RadiusSquared)
+                                {{
+                                    Functor(Item, DistanceSquared);
+                                }}
+                            }}
+                        }}
+                    }}
+                }}
+            }}
+
+            void UCollectibleRegistrySubsystem::RegisterCollectible(ACollectibleItem* Item)
+            {{
+                if (!Item || Item->IsCollected() || CellByItem.Contains(Item))
+                {{
+                    return;
+                }}
+
+                const FIntVector Cell = GetCell(Item->GetActorLocation());
+                Cells.FindOrAdd(Cell).Add(Item);
+                CellByItem.Add(Item, Cell);
+                CODINGWITHAI_INC_COUNTER(RegisteredCollectibles);
+            }}
+
+            void UCollectibleRegistrySubsystem::UnregisterCollectible(ACollectibleItem* Item)
+            {{
+                FIntVector Cell;
+                if (!CellByItem.RemoveAndCopyValue(Item, Cell))
+                {{
+                    return;
+                }}
+                CODINGWITHAI_DEC_COUNTER(RegisteredCollectibles);
+
+                if (TArray<ACollectibleItem*>* Bucket = Cells.Find(Cell))
+                {{
+                    Bucket->RemoveSwap(Item);
+                    if (Bucket->IsEmpty())
+                    {{
+                        Cells.Remove(Cell);
+                    }}
+                }}
+            }}
+
+            void UCollectibleRegistrySubsystem::UpdateCollectible(ACollectibleItem* Item)
+            {{
+                const FIntVector* CurrentCell = CellByItem.Find(Item);
+                if (CurrentCell && *CurrentCell != GetCell(Item->GetActorLocation()))
+                {{
+                    UnregisterCollectible(Item);
+                    RegisterCollectible(Item);
+                }}
+            }}
+
+            ACollectibleItem* UCollectibleRegistrySubsystem::FindBestInCone(const FVector& Origin, const FVector& Direction, float Radius, float HalfAngleDegrees) const
+            {{
+                CODINGWITHAI_SCOPE(CollectibleQuery);
+                const FVector Forward = Direction.GetSafeNormal();
+                const float CosHalfAngle = FMath::Cos(FMath::DegreesToRadians(HalfAngleDegrees));
+
+                ACollectibleItem* Best = nullptr;
+                float BestDistanceSquared = TNumericLimits<float>::Max();
+                ForEachInRadius(Origin, Radius, [&](ACollectibleItem* Item, float DistanceSquared)
+                {{
+                    const FVector ToItem = Item->GetActorLocation() - Origin;
+                    const bool bInCone = FVector::DotProduct(ToItem, Forward) >= CosHalfAngle * FMath::Sqrt(DistanceSquared);
+                    if (bInCone && DistanceSquared < BestDistanceSquared)
+                    {{
+                        Best = Item;
+                        BestDistanceSquared = DistanceSquared;
+                    }}
+                }});
+                return Best;
+            }}
+
+            int32 UCollectibleRegistrySubsystem::FindNearestCollectibles(const FVector& Origin, float Radius, int32 MaxCount, TArray<ACollectibleItem*>& OutItems) const
+            {{
+                CODINGWITHAI_SCOPE(CollectibleQuery);
+                OutItems.Reset();
+                if (MaxCount <= 0)
+                {{
+                    return 0;
+                }}
+
+                // Bounded max-heap on distance: the farthest kept candidate sits on top and is the
+                // one replaced, so the query stays O(candidates * log MaxCount).
+                using FCandidate = TPair<float, ACollectibleItem*>;
+                const auto FarthestFirst = [](const FCandidate& A, const FCandidate& B) {{ return A.Key > B.Key; }};
+
+                TArray<FCandidate, TInlineAllocator<16>> Nearest;
+                ForEachInRadius(Origin, Radius, [&](ACollectibleItem* Item, float DistanceSquared)
+                {{
+                    if (Nearest.Num() < MaxCount)
+                    {{
+                        Nearest.HeapPush(FCandidate(DistanceSquared, Item), FarthestFirst);
+                    }}
+                    else if (DistanceSquared < Nearest.HeapTop().Key)
+                    {{
+                        Nearest.HeapPopDiscard(FarthestFirst, EAllowShrinking::No);
+                        Nearest.HeapPush(FCandidate(DistanceSquared, Item), FarthestFirst);
+                    }}
+                }});
+
+                Nearest.Sort([](const FCandidate& A, const FCandidate& B) {{ return A.Key < B.Key; }});
+                OutItems.Reserve(Nearest.Num());
+                for (const FCandidate& Candidate : Nearest)
+                {{
+                    OutItems.Add(Candidate.Value);
+                }}
+                return OutItems.Num();
+            }}
+
+            TArray<ACollectibleItem*> UCollectibleRegistrySubsystem::GetNearestCollectibles(FVector Origin, float Radius, int32 MaxCount) const
+            {{
+                TArray<ACollectibleItem*> Items;
+                FindNearestCollectibles(Origin, Radius, MaxCount, Items);
+                return Items;
+            }}
+        '''
+
+        return header, source
+
+    # ----------------------------------------------------------------------------------
+    # Collected-state table
+    # ----------------------------------------------------------------------------------
+    def _render_collectible_state(self) -> tuple[str, ...]:
+        header = f'''
+            #pragma once
+
+            #include "CoreMinimal.h"
+            #include "Subsystems/WorldSubsystem.h"
+            #include "CollectibleStateSubsystem.generated.h"
+
+            DECLARE_DYNAMIC_MULTICAST_DELEGATE(FOnCollectibleStateRestored);
+
+            /** Ids of the collected placed items; small enough to copy into a USaveGame as is. */
+            USTRUCT(BlueprintType)
+            struct FCollectibleStateTable
+            {{
+                GENERATED_BODY()
+
+                UPROPERTY(SaveGame, VisibleAnywhere, BlueprintReadOnly, Category = "Collecting")
+                TSet<FGuid> CollectedIds;
+            }};
+
+            /**
+             * Remembers which placed collectibles were collected, keyed by their PersistentId. Items
+             * check it when their World Partition cell streams in, so unloaded cells cost only the
+             * ids of what was collected in them and collected items do not come back.
+             */
+            UCLASS()
+            class {self.options.module_api} UCollectibleStateSubsystem : public UWorldSubsystem
+            {{
+                GENERATED_BODY()
+
+            public:
+                bool IsCollected(const FGuid& PersistentId) const {{ return State.CollectedIds.Contains(PersistentId); }}
+
+                /** Records a collected item; items without a persistent id are not tracked. */
+                void MarkCollected(const FGuid& PersistentId);
+
+                UFUNCTION(BlueprintPure, Category = "Collecting")
+                FCollectibleStateTable GetStateTable() const {{ return State; }}
+
+                /** Replaces the table, e.g. from a loaded save, and removes loaded items it lists. */
+                UFUNCTION(BlueprintCallable, Category = "Collecting")
+                void RestoreStateTable(const FCollectibleStateTable& Table);
+
+                UFUNCTION(BlueprintPure, Category = "Collecting")
+                int32 GetNumCollected() const {{ return State.CollectedIds.Num(); }}
+
+                /** Broadcast after RestoreStateTable, for collected items drawn without an actor. */
+                UPROPERTY(BlueprintAssignable, Category = "Collecting")
+                FOnCollectibleStateRestored OnStateRestored;
+
+            private:
+                UPROPERTY()
+                FCollectibleStateTable State;
+            }};
+        '''
+
+        source = '''
+            #include "Collectibles/CollectibleStateSubsystem.h"
+
+            #include "Collectibles/CollectibleItem.h"
+            #include "EngineUtils.h"
+
+            void UCollectibleStateSubsystem::MarkCollected(const FGuid& PersistentId)
+            {
+                if (PersistentId.IsValid())
+                {
+                    State.CollectedIds.Add(PersistentId);
+                }
+            }
+
+            void UCollectibleStateSubsystem::RestoreStateTable(const FCollectibleStateTable& Table)
+            {
+                State = Table;
+                for (TActorIterator<ACollectibleItem> It(GetWorld()); It; ++It)
+                {
+                    if (!It->IsCollected() && IsCollected(It->GetPersistentId()))
+                    {
+                        It->RemoveCollected();
+                    }
+                }
+                OnStateRestored.Broadcast();
+            }
+        '''
+
+        return header, source
+
+    # ----------------------------------------------------------------------------------
+    # Enemy AI character
+    # ----------------------------------------------------------------------------------
+    def _render_enemy_ai_character(self) -> tuple[str, ...]:
+        if self.options.replication:
+            enemy_defaults = """
+                GetMesh()->bEnableUpdateRateOptimizations = true;
+
+                // Clients beyond the cull distance never receive the pursuer; closer ones get the
+                // rate of its significance bucket, and adaptive updates drop to the minimum while idle.
+                SetNetCullDistanceSquared(FMath::Square(15000.0f));
+                SetMinNetUpdateFrequency(2.0f);
+            """
+            apply_net_frequency = """
+                SetNetUpdateFrequency(Bucket.NetUpdateFrequency);
+            """
+        else:
+            enemy_defaults = """
+                GetMesh()->bEnableUpdateRateOptimizations = true;
+            """
+            apply_net_frequency = ""
+
+        header = f'''
+            #pragma once
+
+            #include "CoreMinimal.h"
+            #include "GameFramework/Character.h"
+            #include "EnemyAICharacter.generated.h"
+
+            struct FEnemySignificanceBucket;
+
+            UCLASS()
+            class {self.options.module_api} AEnemyAICharacter : public ACharacter
+            {{
+                GENERATED_BODY()
+
+            public:
+                AEnemyAICharacter();
+
+                /** Applies the tick, animation and perception fidelity of a significance bucket. */
+                void ApplySignificance(const FEnemySignificanceBucket& Bucket);
+
+            protected:
+                virtual void BeginPlay() override;
+                virtual void EndPlay(const EEndPlayReason::Type EndPlayReason) override;
+            }};
+        '''
+
+        source = f'''
+            #include "Characters/EnemyAICharacter.h"
+
+            #include "AI/EnemyAIController.h"
+            #include "AI/EnemySignificanceSubsystem.h"
+            #include "CodingWithAiStats.h"
+            #include "Components/SkeletalMeshComponent.h"
+            #include "GameFramework/CharacterMovementComponent.h"
+            #include "Navigation/PathFollowingComponent.h"
+
+            AEnemyAICharacter::AEnemyAICharacter()
+            {{
+                PrimaryActorTick.bCanEverTick = false;
+                AutoPossessAI = EAutoPossessAI::PlacedInWorldOrSpawned;
+
+                {_embed(enemy_defaults, 16)}
+            }}
+
+            void AEnemyAICharacter::BeginPlay()
+            {{
+                Super::BeginPlay();
+                CODINGWITHAI_INC_COUNTER(ActiveEnemies);
+
+                if (UEnemySignificanceSubsystem* Significance = GetWorld()->GetSubsystem<UEnemySignificanceSubsystem>())
+                {{
+                    Significance->RegisterEnemy(this);
+                }}
+            }}
+
+            void AEnemyAICharacter::EndPlay(const EEndPlayReason::Type EndPlayReason)
+            {{
+                if (UEnemySignificanceSubsystem* Significance = GetWorld()->GetSubsystem<UEnemySignificanceSubsystem>())
+                {{
+                    Significance->UnregisterEnemy(this);
+                }}
+
+                CODINGWITHAI_DEC_COUNTER(ActiveEnemies);
+                Super::EndPlay(EndPlayReason);
+            }}
+
+            void AEnemyAICharacter::ApplySignificance(const FEnemySignificanceBucket& Bucket)
+            {{
+                GetCharacterMovement()->SetComponentTickInterval(Bucket.TickInterval);
+                GetMesh()->SetComponentTickInterval(Bucket.TickInterval);
+                GetMesh()->VisibilityBasedAnimTickOption = Bucket.bTickPoseWhenOffscreen
+                    ? EVisibilityBasedAnimTickOption::AlwaysTickPose
+                    : EVisibilityBasedAnimTickOption::OnlyTickPoseWhenRendered;
+
+                {_embed(apply_net_frequency, 16)}
+
+                if (AEnemyAIController* EnemyController = Cast<AEnemyAIController>(GetController()))
+                {{
+                    EnemyController->GetPathFollowingComponent()->SetComponentTickInterval(Bucket.TickInterval);
+                    EnemyController->SetPerceptionActive(Bucket.bPerceptionEnabled);
+                }}
+            }}
+        '''
+
+        return header, source
+
+    # ----------------------------------------------------------------------------------
+    # Enemy significance
+    # ----------------------------------------------------------------------------------
+    def _render_enemy_significance(self) -> tuple[str, ...]:
+        default_buckets = _embed(
+            "\n".join(
+                f"Buckets.Emplace({distance:.1f}f, {interval}f, {str(perception).lower()}, {str(tick_pose).lower()}, {net_frequency}f);"
+                for distance, interval, perception, tick_pose, net_frequency in ENEMY_SIGNIFICANCE_BUCKETS
+            ),
+            16,
+        )
+
+        header = f'''
+            #pragma once
+
+            #include "CoreMinimal.h"
+            #include "Engine/DeveloperSettings.h"
+            #include "Subsystems/WorldSubsystem.h"
+            #include "EnemySignificanceSubsystem.generated.h"
+
+            class AEnemyAICharacter;
+
+            USTRUCT(BlueprintType)
+            struct {self.options.module_api} FEnemySignificanceBucket
+            {{
+                GENERATED_BODY()
+
+                FEnemySignificanceBucket() = default;
+                FEnemySignificanceBucket(float InMaxDistance, float InTickInterval, bool bInPerceptionEnabled, bool bInTickPoseWhenOffscreen, float InNetUpdateFrequency)
+                    : MaxDistance(InMaxDistance)
+                    , TickInterval(InTickInterval)
+                    , bPerceptionEnabled(bInPerceptionEnabled)
+                    , bTickPoseWhenOffscreen(bInTickPoseWhenOffscreen)
+                    , NetUpdateFrequency(InNetUpdateFrequency)
+                {{
+                }}
+
+                /** Enemies up to this distance from the nearest player's view point use this bucket. */
+                UPROPERTY(EditAnywhere, Category = "Significance")
+                float MaxDistance = 0.0f;
+
+                /** Tick interval of movement, animation and path following; 0 ticks every frame. */
+                UPROPERTY(EditAnywhere, Category = "Significance")
+                float TickInterval = 0.0f;
+
+                UPROPERTY(EditAnywhere, Category = "Significance")
+                bool bPerceptionEnabled = true;
+
+                UPROPERTY(EditAnywhere, Category = "Significance")
+                bool bTickPoseWhenOffscreen = true;
+
+                /** Server replication rate in updates per second; used by replicated builds. */
+                UPROPERTY(EditAnywhere, Category = "Significance", meta = (ClampMin = "0.1"))
+                float NetUpdateFrequency = 10.0f;
+            }};
+
+            /** Distance bucket table for pursuer LOD, editable under Project Settings. */
+            UCLASS(Config = Game, DefaultConfig, meta = (DisplayName = "Enemy Significance"))
+            class {self.options.module_api} UEnemySignificanceSettings : public UDeveloperSettings
+            {{
+                GENERATED_BODY()
+
+            public:
+                UEnemySignificanceSettings();
+
+                /** Sorted by MaxDistance; enemies beyond the last bucket use the last bucket. */
+                UPROPERTY(Config, EditAnywhere, Category = "Significance")
+                TArray<FEnemySignificanceBucket> Buckets;
+
+                UPROPERTY(Config, EditAnywhere, Category = "Significance", meta = (ClampMin = "0.0"))
+                float EvaluationInterval;
+
+                /** How many buckets an enemy drops while it has not been rendered recently. */
+                UPROPERTY(Config, EditAnywhere, Category = "Significance", meta = (ClampMin = "0"))
+                int32 OffscreenBucketPenalty;
+            }};
+
+            /**
+             * Periodically sorts registered enemies into the significance buckets by distance to
+             * the nearest player's view point and visibility, and applies a bucket only when an
+             * enemy changes bucket.
+             */
+            UCLASS()
+            class {self.options.module_api} UEnemySignificanceSubsystem : public UTickableWorldSubsystem
+            {{
+                GENERATED_BODY()
+
+            public:
+                virtual void Tick(float DeltaTime) override;
+                virtual TStatId GetStatId() const override;
+
+                void RegisterEnemy(AEnemyAICharacter* Enemy);
+                void UnregisterEnemy(AEnemyAICharacter* Enemy);
+
+                int32 GetNumRegistered() const {{ return Enemies.Num(); }}
+
+            private:
+                void EvaluateSignificance();
+
+                struct FTrackedEnemy
+                {{
+                    TWeakObjectPtr<AEnemyAICharacter> Enemy;
+                    int32 BucketIndex = INDEX_NONE;
+                }};
+
+                TArray<FTrackedEnemy> Enemies;
+                float TimeSinceEvaluation = 0.0f;
+            }};
+        '''
+
+        source = f'''
+            #include "AI/EnemySignificanceSubsystem.h"
+
+            #include "Characters/EnemyAICharacter.h"
+            #include "CodingWithAiStats.h"
+            #include "Engine/World.h"
+            #include "GameFramework/PlayerController.h"
+
+            UEnemySignificanceSettings::UEnemySignificanceSettings()
+            {{
+                {default_buckets}
+                EvaluationInterval = 0.25f;
+                OffscreenBucketPenalty = 1;
+            }}
+
+            void UEnemySignificanceSubsystem::RegisterEnemy(AEnemyAICharacter* Enemy)
+            {{
+                Enemies.Add({{Enemy, INDEX_NONE}});
+
+                // Evaluate on the next tick so new enemies do not run at full rate for a whole interval.
+                TimeSinceEvaluation = TNumericLimits<float>::Max();
+            }}
+
+            void UEnemySignificanceSubsystem::UnregisterEnemy(AEnemyAICharacter* Enemy)
+            {{
+                Enemies.RemoveAllSwap([Enemy](const FTrackedEnemy& Tracked) {{ return Tracked.Enemy == Enemy; }});
+            }}
+
+            void UEnemySignificanceSubsystem::Tick(float DeltaTime)
+            {{
+                Super::Tick(DeltaTime);
+
+                TimeSinceEvaluation += DeltaTime;
+                if (!Enemies.IsEmpty() && TimeSinceEvaluation >= GetDefault<UEnemySignificanceSettings>()->EvaluationInterval)
+                {{
+                    TimeSinceEvaluation = 0.0f;
+                    EvaluateSignificance();
+                }}
+            }}
+
+            void UEnemySignificanceSubsystem::EvaluateSignificance()
+            {{
+                CODINGWITHAI_SCOPE(EvaluateSignificance);
+                const UEnemySignificanceSettings* Settings = GetDefault<UEnemySignificanceSettings>();
+                if (Settings->Buckets.IsEmpty())
+                {{
+                    return;
+                }}
+
+                // A server measures against every connected player, so each enemy uses its nearest viewer.
+                TArray<FVector, TInlineAllocator<8>> ViewLocations;
+                for (FConstPlayerControllerIterator It = GetWorld()->GetPlayerControllerIterator(); It; ++It)
+                {{
+                    FVector ViewLocation;
+                    FRotator ViewRotation;
+                    It->Get()->GetPlayerViewPoint(ViewLocation, ViewRotation);
+                    ViewLocations.Add(ViewLocation);
+                }}
+                if (ViewLocations.IsEmpty())
+                {{
+                    return;
+                }}
+
+                // Nothing is rendered on a dedicated server, so visibility cannot lower a bucket there.
+                const bool bUseVisibility = GetWorld()->GetNetMode() != NM_DedicatedServer;
+                const int32 LastBucket = Settings->Buckets.Num() - 1;
+                for (int32 Index = Enemies.Num() - 1; Index >= 0; --Index)
+                {{
+                    FTrackedEnemy& Tracked = Enemies[Index];
+                    AEnemyAICharacter* Enemy = Tracked.Enemy.Get();
+                    if (!Enemy)
+                    {{
+                        Enemies.RemoveAtSwap(Index, 1, EAllowShrinking::No);
+                        continue;
+                    }}
+
+                    const FVector EnemyLocation = Enemy->GetActorLocation();
+                    float DistanceSquared = TNumericLimits<float>::Max();
+                    for (const FVector& ViewLocation : ViewLocations)
+                    {{
+                        DistanceSquared = FMath::Min(DistanceSquared, FVector::DistSquared(ViewLocation, EnemyLocation));
+                    }}
+
+                    int32 BucketIndex = 0;
+                    while (BucketIndex < LastBucket && DistanceSquared > FMath::Square(Settings->Buckets[BucketIndex].MaxDistance))
+                    {{
+                        ++BucketIndex;
+                    }}
+
+                    if (bUseVisibility && !Enemy->WasRecentlyRendered(0.2f))
+                    {{
+                        BucketIndex = FMath::Min(BucketIndex + Settings->OffscreenBucketPenalty, LastBucket);
+                    }}
+
+                    if (BucketIndex != Tracked.BucketIndex)
+                    {{
+                        Tracked.BucketIndex = BucketIndex;
+                        Enemy->ApplySignificance(Settings->Buckets[BucketIndex]);
+                    }}
+                }}
+            }}
+
+            TStatId UEnemySignificanceSubsystem::GetStatId() const
+            {{
+                RETURN_QUICK_DECLARE_CYCLE_STAT(UEnemySignificanceSubsystem, STATGROUP_Tickables);
+            }}
+        '''
+
+        return header, source
+
+    # ----------------------------------------------------------------------------------
+    # Enemy AI controller
+    # ----------------------------------------------------------------------------------
+    def _render_enemy_ai_controller(self) -> tuple[str, ...]:
+        header = f'''
+            #pragma once
+
+            #include "CoreMinimal.h"
+            #include "AIController.h"
+            #include "EnemyAIController.generated.h"
+
+            class UAIPerceptionComponent;
+            class UAISenseConfig_Sight;
+            class UEnemySearchScheduler;
+            class UNavigationSystemV1;
+
+            UCLASS()
+            class {self.options.module_api} AEnemyAIController : public AAIController
+            {{
+                GENERATED_BODY()
+
+            public:
+                AEnemyAIController();
+
+                /**
+                 * Runs one search step. Called by UEnemySearchScheduler within its frame budget;
+                 * returns the delay in seconds before the next step, or a negative value once the
+                 * search is over.
+                 */
+                float SearchTick();
+
+                /** Suspends sight perception for low-significance enemies and restores it when promoted. */
+                void SetPerceptionActive(bool bActive);
+
+            protected:
+                virtual void OnPossess(APawn* InPawn) override;
+                virtual void OnUnPossess() override;
+                virtual void EndPlay(const EEndPlayReason::Type EndPlayReason) override;
+
+                UFUNCTION()
+                void HandleTargetPerceptionUpdated(AActor* Actor, FAIStimulus Stimulus);
+
+                void BeginSearch();
+                void EndSearch();
+                bool IsNearFailedDestination(const FVector& Location) const;
+
+                UPROPERTY(VisibleAnywhere, BlueprintReadOnly, Category = "AI")
+                UAIPerceptionComponent* PerceptionComponent;
+
+                /** World services resolved on possession instead of on every search step. */
+                TWeakObjectPtr<UEnemySearchScheduler> SearchScheduler;
+                TWeakObjectPtr<UNavigationSystemV1> NavigationSystem;
+
+                UPROPERTY()
+                UAISenseConfig_Sight* SightConfig;
+
+                UPROPERTY(EditDefaultsOnly, Category = "AI")
+                float SearchDuration;
+
+                /** Seconds between search moves while the previous move succeeded. */
+                UPROPERTY(EditDefaultsOnly, Category = "AI")
+                float SearchInterval;
+
+                UPROPERTY(EditDefaultsOnly, Category = "AI")
+                float SearchRadius;
+
+                /** Upper bound for the exponential back-off applied after failed path requests. */
+                UPROPERTY(EditDefaultsOnly, Category = "AI")
+                float MaxSearchBackoff;
+
+                double SearchStartTime;
+                int32 ConsecutiveSearchFailures;
+                bool bPerceptionActive;
+
+                /** Recent destinations whose path request failed; nearby candidates are skipped. */
+                TArray<FVector, TInlineAllocator<4>> FailedDestinations;
+            }};
+        '''
+
+        source = f'''
+            #include "AI/EnemyAIController.h"
+
+            #include "AI/EnemySearchScheduler.h"
+            #include "CodingWithAiLog.h"
+            #include "CodingWithAiStats.h"
+            #include "NavigationSystem.h"
+            #include "Navigation/PathFollowingComponent.h"
+            #include "Perception/AIPerceptionComponent.h"
+            #include "Perception/AISenseConfig_Sight.h"
+            #include "Perception/AISense_Sight.h"
+
+            namespace
+            {{
+                constexpr int32 MaxDestinationAttempts = 3;
+                constexpr int32 MaxRememberedFailures = 4;
+                constexpr float FailedDestinationRadius = 150.0f;
+            }}
+
+            AEnemyAIController::AEnemyAIController()
+            {{
+                PerceptionComponent = CreateDefaultSubobject<UAIPerceptionComponent>(TEXT("PerceptionComponent"));
+                SetPerceptionComponent(*PerceptionComponent);
+
+                SightConfig = CreateDefaultSubobject<UAISenseConfig_Sight>(TEXT("SightConfig"));
+                SightConfig->SightRadius = 900.0f;
+                SightConfig->LoseSightRadius = 1200.0f;
+                SightConfig->PeripheralVisionAngleDegrees = 75.0f;
+                SightConfig->SetMaxAge(5.0f);
+                SightConfig->DetectionByAffiliation.bDetectEnemies = true;
+                SightConfig->DetectionByAffiliation.bDetectFriendlies = true;
+                SightConfig->DetectionByAffiliation.bDetectNeutrals = true;
+
+                PerceptionComponent->ConfigureSense(*SightConfig);
+                PerceptionComponent->SetDominantSense(SightConfig->GetSenseImplementation());
+                PerceptionComponent->OnTargetPerceptionUpdated.AddDynamic(this, &AEnemyAIController::HandleTargetPerceptionUpdated);
+
+                SearchDuration = 60.0f;
+                SearchInterval = 2.5f;
+                SearchRadius = 600.0f;
+                MaxSearchBackoff = 20.0f;
+                SearchStartTime = 0.0;
+                ConsecutiveSearchFailures = 0;
+                bPerceptionActive = true;
+            }}
+
+            void AEnemyAIController::OnPossess(APawn* InPawn)
+            {{
+                Super::OnPossess(InPawn);
+                SearchScheduler = GetWorld()->GetSubsystem<UEnemySearchScheduler>();
+                NavigationSystem = FNavigationSystem::GetCurrent<UNavigationSystemV1>(GetWorld());
+                UE_LOG(LogCodingWithAi, Verbose, TEXT("EnemyAIController possessed %s"), *GetNameSafe(InPawn));
+            }}
+
+            void AEnemyAIController::OnUnPossess()
+            {{
+                EndSearch();
+                Super::OnUnPossess();
+            }}
+
+            void AEnemyAIController::EndPlay(const EEndPlayReason::Type EndPlayReason)
+            {{
+                // A streamed-out cell removes its pawns and their controllers without unpossessing.
+                EndSearch();
+                Super::EndPlay(EndPlayReason);
+            }}
+
+            void AEnemyAIController::SetPerceptionActive(bool bActive)
+            {{
+                if (bPerceptionActive != bActive)
+                {{
+                    bPerceptionActive = bActive;
+                    PerceptionComponent->SetSenseEnabled(UAISense_Sight::StaticClass(), bActive);
+                }}
+            }}
+
+            void AEnemyAIController::HandleTargetPerceptionUpdated(AActor* Actor, FAIStimulus Stimulus)
+            {{
+                CODINGWITHAI_SCOPE(HandleTargetPerceptionUpdated);
+                // Stimuli expiring because significance switched sight off are not a lost target.
+                if (!Actor || !bPerceptionActive)
+                {{
+                    return;
+                }}
+
+                if (Stimulus.WasSuccessfullySensed())
+                {{
+                    UE_LOG(LogCodingWithAi, Verbose, TEXT("Player seen: %s"), *Actor->GetName());
+                    MoveToActor(Actor, 75.0f);
+                    EndSearch();
+                }}
+                else
+                {{
+                    UE_LOG(LogCodingWithAi, Verbose, TEXT("Player lost: %s"), *Actor->GetName());
+                    BeginSearch();
+                }}
+            }}
+
+            void AEnemyAIController::BeginSearch()
+            {{
+                SearchStartTime = GetWorld()->GetTimeSeconds();
+                ConsecutiveSearchFailures = 0;
+                FailedDestinations.Reset();
+
+                if (UEnemySearchScheduler* Scheduler = SearchScheduler.Get())
+                {{
+                    Scheduler->RequestSearch(this);
+                }}
+            }}
+
+            void AEnemyAIController::EndSearch()
+            {{
+                if (UEnemySearchScheduler* Scheduler = SearchScheduler.Get())
+                {{
+                    Scheduler->CancelSearch(this);
+                }}
+            }}
+
+            float AEnemyAIController::SearchTick()
+            {{
+                CODINGWITHAI_SCOPE(SearchTick);
+                const APawn* ControlledPawn = GetPawn();
+                const UNavigationSystemV1* NavSystem = NavigationSystem.Get();
+                if (!ControlledPawn || !NavSystem || GetWorld()->GetTimeSeconds() - SearchStartTime > SearchDuration)
+                {{
+                    return -1.0f;
+                }}
+
+                // Let the current move finish instead of queueing another path request.
+                if (GetMoveStatus() == EPathFollowingStatus::Moving)
+                {{
+                    return SearchInterval;
+                }}
+
+                const FVector Origin = ControlledPawn->GetActorLocation();
+                for (int32 Attempt = 0; Attempt < MaxDestinationAttempts; ++Attempt)
+                {{
+                    FNavLocation Destination;
+                    if (!NavSystem->GetRandomReachablePointInRadius(Origin, SearchRadius, Destination))
+                    {{
+                        break;
+                    }}
+                    if (IsNearFailedDestination(Destination.Location))
+                    {{
+                        continue;
+                    }}
+
+                    if (MoveToLocation(Destination.Location) != EPathFollowingRequestResult::Failed)
+                    {{
+                        ConsecutiveSearchFailures = 0;
+                        return SearchInterval;
+                    }}
+
+                    if (FailedDestinations.Num() >= MaxRememberedFailures)
+                    {{
+                        FailedDestinations.RemoveAt(0, 1, EAllowShrinking::No);
+                    }}
+                    FailedDestinations.Add(Destination.Location);
+                    break;
+                }}
+
+                ++ConsecutiveSearchFailures;
+                return FMath::Min(SearchInterval * FMath::Pow(2.0f, static_cast<float>(ConsecutiveSearchFailures)), MaxSearchBackoff);
+            }}
+
+            bool AEnemyAIController::IsNearFailedDestination(const FVector& Location) const
+            {{
+                for (const FVector& Failed : FailedDestinations)
+                {{
+                    if (FVector::DistSquared(Failed, Location) < FMath::Square(FailedDestinationRadius))
+                    {{
+                        return true;
+                    }}
+                }}
+                return false;
+            }}
+        '''
+
+        return header, source
+
+    # ----------------------------------------------------------------------------------
+    # Enemy search scheduler
+    # ----------------------------------------------------------------------------------
+    def _render_enemy_search_scheduler(self) -> tuple[str, ...]:
+        header = f'''
+            #pragma once
+
+            #include "CoreMinimal.h"
+            #include "Subsystems/WorldSubsystem.h"
+            #include "EnemySearchScheduler.generated.h"
+
+            class AEnemyAIController;
+
+            /**
+             * Time-slices the search behavior of every enemy that lost its target. Each frame at most
+             * MaxSearchesPerFrame due controllers run a search step, and the frame stops early once
+             * FrameBudgetSeconds is spent, so large groups never spike the timer manager or the
+             * pathfinding queue.
+             */
+            UCLASS()
+            class {self.options.module_api} UEnemySearchScheduler : public UTickableWorldSubsystem
+            {{
+                GENERATED_BODY()
+
+            public:
+                virtual void Tick(float DeltaTime) override;
+                virtual TStatId GetStatId() const override;
+
+                void RequestSearch(AEnemyAIController* Controller);
+                void CancelSearch(AEnemyAIController* Controller);
+
+                int32 GetNumSearching() const {{ return Entries.Num(); }}
+
+                int32 MaxSearchesPerFrame = 8;
+                double FrameBudgetSeconds = 0.0005;
+
+            private:
+                struct FSearchEntry
+                {{
+                    TWeakObjectPtr<AEnemyAIController> Controller;
+                    double NextSearchTime = 0.0;
+                }};
+
+                TArray<FSearchEntry> Entries;
+
+                /** Round-robin position, so enemies past the budget go first next frame. */
+                int32 Cursor = 0;
+            }};
+        '''
+
+        source = f'''
+            #include "AI/EnemySearchScheduler.h"
+
+            #include "AI/EnemyAIController.h"
+            #include "CodingWithAiStats.h"
+
+            void UEnemySearchScheduler::RequestSearch(AEnemyAIController* Controller)
+            {{
+                const double Now = GetWorld()->GetTimeSeconds();
+                for (FSearchEntry& Entry : Entries)
+                {{
+                    if (Entry.Controller == Controller)
+                    {{
+                        Entry.NextSearchTime = Now;
+                        return;
+                    }}
+                }}
+
+                Entries.Add({{Controller, Now}});
+            }}
+
+            void UEnemySearchScheduler::CancelSearch(AEnemyAIController* Controller)
+            {{
+                Entries.RemoveAllSwap([Controller](const FSearchEntry& Entry) {{ return Entry.Controller == Controller; }});
+            }}
+
+            void UEnemySearchScheduler::Tick(float DeltaTime)
+            {{
+                Super::Tick(DeltaTime);
+                if (Entries.IsEmpty())
+                {{
+                    return;
+                }}
+
+                CODINGWITHAI_SCOPE(SearchScheduler);
+
+                const double Now = GetWorld()->GetTimeSeconds();
+                const double Deadline = FPlatformTime::Seconds() + FrameBudgetSeconds;
+                int32 Processed = 0;
+
+                for (int32 Visited = 0, Pending = Entries.Num(); Visited < Pending && Processed < MaxSearchesPerFrame && Entries.Num() > 0; ++Visited)
+                {{
+                    if (Cursor >= Entries.Num())
+                    {{
+                        Cursor = 0;
+                    }}
+
+                    FSearchEntry& Entry = Entries[Cursor];
+                    AEnemyAIController* Controller = Entry.Controller.Get();
+                    if (!Controller)
+                    {{
+                        Entries.RemoveAtSwap(Cursor, 1, EAllowShrinking::No);
+                        continue;
+                    }}
+
+                    if (Entry.NextSearchTime > Now)
+                    {{
+                        ++Cursor;
+                        continue;
+                    }}
+
+                    const float Delay = Controller->SearchTick();
+                    ++Processed;
+                    if (Delay < 0.0f)
+                    {{
+                        Entries.RemoveAtSwap(Cursor, 1, EAllowShrinking::No);
+                    }}
+                    else
+                    {{
+                        Entries[Cursor].NextSearchTime = Now + Delay;
+                        ++Cursor;
+                    }}
+
+                    if (FPlatformTime::Seconds() > Deadline)
+                    {{
+                        break;
+                    }}
+                }}
+            }}
+
+            TStatId UEnemySearchScheduler::GetStatId() const
+            {{
+                RETURN_QUICK_DECLARE_CYCLE_STAT(UEnemySearchScheduler, STATGROUP_Tickables);
+            }}
+        '''
+
+        return header, source
+
+    # ----------------------------------------------------------------------------------
+    # Shader distance feedback
+    # ----------------------------------------------------------------------------------
+    def _render_shader_manager(self) -> tuple[str, ...]:
+        if self.options.shader_backend == "parameter_collection":
+            # One manager drives a shared collection; environment materials read it directly,
+            # so there are no per-actor MIDs and static mesh draw batching keeps working.
+            backend_forward_declarations = """
+                class UMaterialParameterCollection;
+                class UMaterialParameterCollectionInstance;
+            """
+            backend_members = """
+                /** Collection holding HeatValue/HeatIntensity; place one manager per collection. */
+                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Shader")
+                UMaterialParameterCollection* ParameterCollection;
+
+                UPROPERTY()
+                UMaterialParameterCollectionInstance* CollectionInstance;
+            """
+            backend_includes = """
+                #include "Materials/MaterialParameterCollection.h"
+                #include "Materials/MaterialParameterCollectionInstance.h"
+            """
+            backend_defaults = """
+                ParameterCollection = nullptr;
+                CollectionInstance = nullptr;
+            """
+            backend_setup = """
+                if (ParameterCollection)
+                {
+                    CollectionInstance = GetWorld()->GetParameterCollectionInstance(ParameterCollection);
+                }
+            """
+            backend_target = "CollectionInstance"
+            write_heat_value = "CollectionInstance->SetScalarParameterValue(HeatValueName, HeatAlpha);"
+            write_heat_intensity = "CollectionInstance->SetScalarParameterValue(HeatIntensityName, Intensity);"
+        else:
+            backend_forward_declarations = """
+                class UMaterialInstanceDynamic;
+            """
+            backend_members = """
+                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Shader")
+                UMaterialInterface* BaseMaterial;
+
+                UPROPERTY()
+                UMaterialInstanceDynamic* DynamicMaterial;
+
+                int32 HeatValueIndex;
+                int32 HeatIntensityIndex;
+            """
+            backend_includes = """
+                #include "Materials/MaterialInstanceDynamic.h"
+            """
+            backend_defaults = """
+                HeatValueIndex = INDEX_NONE;
+                HeatIntensityIndex = INDEX_NONE;
+            """
+            backend_setup = """
+                if (BaseMaterial)
+                {
+                    DynamicMaterial = UMaterialInstanceDynamic::Create(BaseMaterial, this);
+                    PreviewMesh->SetMaterial(0, DynamicMaterial);
+
+                    // Resolve the parameter slots once so refreshes write by index, not by name lookup.
+                    DynamicMaterial->InitializeScalarParameterAndGetIndex(HeatValueName, 0.0f, HeatValueIndex);
+                    DynamicMaterial->InitializeScalarParameterAndGetIndex(HeatIntensityName, 0.0f, HeatIntensityIndex);
+                }
+            """
+            backend_target = "DynamicMaterial"
+            write_heat_value = """
+                if (!DynamicMaterial->SetScalarParameterByIndex(HeatValueIndex, HeatAlpha))
+                {
+                    DynamicMaterial->SetScalarParameterValue(HeatValueName, HeatAlpha);
+                }
+            """
+            write_heat_intensity = """
+                if (!DynamicMaterial->SetScalarParameterByIndex(HeatIntensityIndex, Intensity))
+                {
+                    DynamicMaterial->SetScalarParameterValue(HeatIntensityName, Intensity);
+                }
+            """
+
+        header = f'''
+            #pragma once
+
+            #include "CoreMinimal.h"
+            #include "GameFramework/Actor.h"
+            #include "ProgressShaderManager.generated.h"
+
+            {_embed(backend_forward_declarations, 12)}
+            class UCollectionInventoryComponent;
+            class UStaticMeshComponent;
+
+            UCLASS()
+            class {self.options.module_api} AProgressShaderManager : public AActor
+            {{
+                GENERATED_BODY()
+
+            public:
+                AProgressShaderManager();
+
+                virtual void Tick(float DeltaTime) override;
+
+            protected:
+                virtual void BeginPlay() override;
+                virtual void EndPlay(const EEndPlayReason::Type EndPlayReason) override;
+
+                UFUNCTION(BlueprintCallable, Category = "Shader")
+                void RefreshHeat();
+
+                UFUNCTION()
+                void HandleCollectionChanged(int32 CollectedCount);
+
+                /** Binds the inventory of a newly resolved player. */
+                void BindInventory(AActor* Player);
+
+                UPROPERTY(VisibleAnywhere, BlueprintReadOnly, Category = "Shader")
+                UStaticMeshComponent* PreviewMesh;
+
+                /**
+                 * Soft references, so the manager does not keep the actors' cells loaded. They resolve
+                 * once the actors have streamed in; until then the heat keeps its last value.
+                 */
+                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Shader")
+                TSoftObjectPtr<AActor> PlayerActor;
+
+                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Shader")
+                TSoftObjectPtr<AActor> TargetActor;
+
+                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Shader")
+                float WarmDistance;
+
+                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Shader")
+                float CoolDistance;
+
+                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Shader")
+                float CollectedIntensityScale;
+
+                /** Seconds between heat refreshes; 0 refreshes every frame. */
+                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Shader", meta = (ClampMin = "0.0"))
+                float UpdateInterval;
+
+                /** Parameter changes smaller than this are not pushed to the material. */
+                UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "Shader", meta = (ClampMin = "0.0"))
+                float ParameterEpsilon;
+
+                {_embed(backend_members, 16)}
+
+                /** PlayerActor's inventory, bound once the player has resolved. */
+                TWeakObjectPtr<UCollectionInventoryComponent> CachedInventory;
+
+                int32 CachedCollectedCount;
+                float LastHeatValue;
+                float LastHeatIntensity;
+            }};
+        '''
+
+        source = f'''
+            #include "Shaders/ProgressShaderManager.h"
+
+            #include "Characters/CollectionInventoryComponent.h"
+            #include "CodingWithAiStats.h"
+            #include "Components/StaticMeshComponent.h"
+            {_embed(backend_includes, 12)}
+
+            namespace
+            {{
+                const FName HeatValueName(TEXT("HeatValue"));
+                const FName HeatIntensityName(TEXT("HeatIntensity"));
+            }}
+
+            AProgressShaderManager::AProgressShaderManager()
+            {{
+                PrimaryActorTick.bCanEverTick = true;
+
+                PreviewMesh = CreateDefaultSubobject<UStaticMeshComponent>(TEXT("PreviewMesh"));
+                SetRootComponent(PreviewMesh);
+
+                WarmDistance = 200.0f;
+                CoolDistance = 1200.0f;
+                CollectedIntensityScale = 0.15f;
+                UpdateInterval = 0.1f;
+                ParameterEpsilon = 0.005f;
+                CachedCollectedCount = 0;
+                LastHeatValue = TNumericLimits<float>::Lowest();
+                LastHeatIntensity = TNumericLimits<float>::Lowest();
+                {_embed(backend_defaults, 16)}
+            }}
+
+            void AProgressShaderManager::BeginPlay()
+            {{
+                Super::BeginPlay();
+                SetActorTickInterval(UpdateInterval);
+
+                {_embed(backend_setup, 16)}
+
+                RefreshHeat();
+            }}
+
+            void AProgressShaderManager::BindInventory(AActor* Player)
+            {{
+                CachedInventory = Player->FindComponentByClass<UCollectionInventoryComponent>();
+                if (UCollectionInventoryComponent* Inventory = CachedInventory.Get())
+                {{
+                    CachedCollectedCount = Inventory->GetItemCount();
+                    Inventory->OnCollectionChanged.AddDynamic(this, &AProgressShaderManager::HandleCollectionChanged);
+                }}
+            }}
+
+            void AProgressShaderManager::EndPlay(const EEndPlayReason::Type EndPlayReason)
+            {{
+                if (UCollectionInventoryComponent* Inventory = CachedInventory.Get())
+                {{
+                    Inventory->OnCollectionChanged.RemoveDynamic(this, &AProgressShaderManager::HandleCollectionChanged);
+                }}
+
+                Super::EndPlay(EndPlayReason);
+            }}
+
+            void AProgressShaderManager::Tick(float DeltaTime)
+            {{
+                Super::Tick(DeltaTime);
+                RefreshHeat();
+            }}
+
+            void AProgressShaderManager::HandleCollectionChanged(int32 CollectedCount)
+            {{
+                CachedCollectedCount = CollectedCount;
+                RefreshHeat();
+            }}
+
+            void AProgressShaderManager::RefreshHeat()
+            {{
+                CODINGWITHAI_SCOPE(RefreshHeat);
+
+                // Get() only searches again after new objects were loaded, e.g. when a cell streamed in.
+                AActor* Player = PlayerActor.Get();
+                const AActor* Target = TargetActor.Get();
+                if (!{backend_target} || !Player || !Target)
+                {{
+                    return;
+                }}
+
+                if (!CachedInventory.IsValid())
+                {{
+                    BindInventory(Player);
+                }}
+
+                const float Distance = FVector::Distance(Player->GetActorLocation(), Target->GetActorLocation());
+                const float HeatAlpha = FMath::GetMappedRangeValueClamped(FVector2f(WarmDistance, CoolDistance), FVector2f(1.0f, 0.0f), Distance);
+                const float Intensity = HeatAlpha + CachedCollectedCount * CollectedIntensityScale;
+
+                if (FMath::Abs(HeatAlpha - LastHeatValue) >= ParameterEpsilon)
+                {{
+                    LastHeatValue = HeatAlpha;
+                    {_embed(write_heat_value, 20)}
+                    CODINGWITHAI_INC_COUNTER(MaterialParameterWrites);
+                }}
+
+                if (FMath::Abs(Intensity - LastHeatIntensity) >= ParameterEpsilon)
+                {{
+                    LastHeatIntensity = Intensity;
+                    {_embed(write_heat_intensity, 20)}
+                    CODINGWITHAI_INC_COUNTER(MaterialParameterWrites);
+                }}
+            }}
+        '''
+
+        return header, source
+
+    # ----------------------------------------------------------------------------------
+    # Mass crowd pursuers
+    # ----------------------------------------------------------------------------------
+    def _render_mass_crowd(self) -> tuple[str, ...]:
+        api = self.options.module_api
+        fragments = f'''
+            #pragma once
+
+            #include "CoreMinimal.h"
+            #include "MassEntityTypes.h"
+            #include "PursuerFragments.generated.h"
+
+            UENUM()
+            enum class EPursuerState : uint8
+            {{
+                Idle,
+                Chase,
+                Search
+            }};
+
+            /** Per-entity pursuit state, the Mass counterpart of AEnemyAIController's chase/search. */
+            USTRUCT()
+            struct {api} FPursuerFragment : public FMassFragment
+            {{
+                GENERATED_BODY()
+
+                EPursuerState State = EPursuerState::Idle;
+                FVector LastKnownTargetLocation = FVector::ZeroVector;
+                FVector SearchGoal = FVector::ZeroVector;
+                float SearchTimeRemaining = 0.0f;
+
+                /** World time at which this pursuer may spend another line-of-sight trace. */
+                double NextVisionTraceTime = 0.0;
+                bool bCanSeeTarget = false;
+            }};
+
+            USTRUCT()
+            struct {api} FPursuerTag : public FMassTag
+            {{
+                GENERATED_BODY()
+            }};
+
+            /** Tuning shared by every pursuer created from the same trait settings. */
+            USTRUCT()
+            struct {api} FPursuerParameters : public FMassConstSharedFragment
+            {{
+                GENERATED_BODY()
+
+                UPROPERTY(EditAnywhere, Category = "Pursuer")
+                float SightRadius = 900.0f;
+
+                UPROPERTY(EditAnywhere, Category = "Pursuer")
+                float PeripheralVisionAngleDegrees = 75.0f;
+
+                /** Seconds before a pursuer re-checks line of sight; staggers traces across frames. */
+                UPROPERTY(EditAnywhere, Category = "Pursuer", meta = (ClampMin = "0.0"))
+                float VisionTraceInterval = 0.25f;
+
+                UPROPERTY(EditAnywhere, Category = "Pursuer")
+                float ChaseSpeed = 450.0f;
+
+                UPROPERTY(EditAnywhere, Category = "Pursuer")
+                float SearchSpeed = 250.0f;
+
+                UPROPERTY(EditAnywhere, Category = "Pursuer")
+                float SearchDuration = 20.0f;
+
+                UPROPERTY(EditAnywhere, Category = "Pursuer")
+                float SearchRadius = 600.0f;
+
+                UPROPERTY(EditAnywhere, Category = "Pursuer")
+                float AcceptanceRadius = 75.0f;
+            }};
+        '''
+
+        trait_header = f'''
+            #pragma once
+
+            #include "CoreMinimal.h"
+            #include "MassEntityTraitBase.h"
+            #include "Mass/PursuerFragments.h"
+            #include "PursuerTrait.generated.h"
+
+            /** Adds the pursuer fragments to a Mass entity config; pair it with the visualization/LOD traits. */
+            UCLASS(meta = (DisplayName = "{self.options.project_name} Pursuer"))
+            class {api} UPursuerTrait : public UMassEntityTraitBase
+            {{
+                GENERATED_BODY()
+
+            protected:
+                virtual void BuildTemplate(FMassEntityTemplateBuildContext& BuildContext, const UWorld& World) const override;
+
+                UPROPERTY(EditAnywhere, Category = "Pursuer")
+                FPursuerParameters Parameters;
+            }};
+        '''
+
+        trait_source = '''
+            #include "Mass/PursuerTrait.h"
+
+            #include "MassCommonFragments.h"
+            #include "MassEntityTemplateRegistry.h"
+            #include "MassEntityUtils.h"
+
+            void UPursuerTrait::BuildTemplate(FMassEntityTemplateBuildContext& BuildContext, const UWorld& World) const
+            {
+                FMassEntityManager& EntityManager = UE::Mass::Utils::GetEntityManagerChecked(World);
+
+                BuildContext.RequireFragment<FTransformFragment>();
+                BuildContext.AddFragment<FPursuerFragment>();
+                BuildContext.AddTag<FPursuerTag>();
+                BuildContext.AddConstSharedFragment(EntityManager.GetOrCreateConstSharedFragment(Parameters));
+            }
+        '''
+
+        processors_header = f'''
+            #pragma once
+
+            #include "CoreMinimal.h"
+            #include "MassEntityQuery.h"
+            #include "MassProcessor.h"
+            #include "PursuerProcessors.generated.h"
+
+            /**
+             * Shared vision check: the player is looked up once per frame and every pursuer runs a
+             * cheap distance/cone test against it. Only pursuers inside the cone spend a line trace,
+             * at most MaxTracesPerFrame per frame and once per VisionTraceInterval each.
+             */
+            UCLASS()
+            class {api} UPursuerVisionProcessor : public UMassProcessor
+            {{
+                GENERATED_BODY()
+
+            public:
+                UPursuerVisionProcessor();
+
+            protected:
+                virtual void ConfigureQueries(const TSharedRef<FMassEntityManager>& EntityManager) override;
+                virtual void Execute(FMassEntityManager& EntityManager, FMassExecutionContext& Context) override;
+
+                UPROPERTY(EditDefaultsOnly, Category = "Pursuer")
+                int32 MaxTracesPerFrame;
+
+            private:
+                FMassEntityQuery EntityQuery;
+            }};
+
+            /** Moves pursuers toward the player while chasing and wanders around the last sighting while searching. */
+            UCLASS()
+            class {api} UPursuerMovementProcessor : public UMassProcessor
+            {{
+                GENERATED_BODY()
+
+            public:
+                UPursuerMovementProcessor();
+
+            protected:
+                virtual void ConfigureQueries(const TSharedRef<FMassEntityManager>& EntityManager) override;
+                virtual void Execute(FMassEntityManager& EntityManager, FMassExecutionContext& Context) override;
+
+            private:
+                FMassEntityQuery EntityQuery;
+            }};
+        '''
+
+        processors_source = '''
+            #include "Mass/PursuerProcessors.h"
+
+            #include "CodingWithAiStats.h"
+            #include "Engine/World.h"
+            #include "GameFramework/Pawn.h"
+            #include "Kismet/GameplayStatics.h"
+            #include "Mass/PursuerFragments.h"
+            #include "MassCommonFragments.h"
+            #include "MassCommonTypes.h"
+            #include "MassExecutionContext.h"
+
+            UPursuerVisionProcessor::UPursuerVisionProcessor()
+                : EntityQuery(*this)
+            {
+                ExecutionOrder.ExecuteInGroup = UE::Mass::ProcessorGroupNames::Tasks;
+                // Line traces and the player lookup touch the game world.
+                bRequiresGameThreadExecution = true;
+                MaxTracesPerFrame = 32;
+            }
+
+            void UPursuerVisionProcessor::ConfigureQueries(const TSharedRef<FMassEntityManager>& EntityManager)
+            {
+                EntityQuery.AddRequirement<FTransformFragment>(EMassFragmentAccess::ReadOnly);
+                EntityQuery.AddRequirement<FPursuerFragment>(EMassFragmentAccess::ReadWrite);
+                EntityQuery.AddConstSharedRequirement<FPursuerParameters>();
+                EntityQuery.AddTagRequirement<FPursuerTag>(EMassFragmentPresence::All);
+            }
+
+            void UPursuerVisionProcessor::Execute(FMassEntityManager& EntityManager, FMassExecutionContext& Context)
+            {
+                CODINGWITHAI_SCOPE(PursuerVision);
+                UWorld* World = EntityManager.GetWorld();
+                const APawn* Player = World ? UGameplayStatics::GetPlayerPawn(World, 0) : nullptr;
+                if (!Player)
+                {
+                    return;
+                }
+
+                const FVector TargetLocation = Player->GetActorLocation();
+                const double Now = World->GetTimeSeconds();
+                FCollisionQueryParams TraceParams(SCENE_QUERY_STAT(PursuerVision), false, Player);
+                int32 TracesLeft = MaxTracesPerFrame;
+
+                EntityQuery.ForEachEntityChunk(Context, [&](FMassExecutionContext& ChunkContext)
+                {
+                    const TConstArrayView<FTransformFragment> Transforms = ChunkContext.GetFragmentView<FTransformFragment>();
+                    const TArrayView<FPursuerFragment> Pursuers = ChunkContext.GetMutableFragmentView<FPursuerFragment>();
+                    const FPursuerParameters& Parameters = ChunkContext.GetConstSharedFragment<FPursuerParameters>();
+                    const float SightRadiusSquared = FMath::Square(Parameters.SightRadius);
+                    const float MinCosine = FMath::Cos(FMath::DegreesToRadians(Parameters.PeripheralVisionAngleDegrees));
+
+                    for (int32 Index = 0; Index < ChunkContext.GetNumEntities(); ++Index)
+                    {
+                        const FTransform& Transform = Transforms[Index].GetTransform();
+                        FPursuerFragment& Pursuer = Pursuers[Index];
+
+                        const FVector ToTarget = TargetLocation - Transform.GetLocation();
+                        const bool bInCone = ToTarget.SizeSquared() <= SightRadiusSquared
+                            && FVector::DotProduct(Transform.GetRotation().GetForwardVector(), ToTarget.GetSafeNormal()) >= MinCosine;
+
+                        if (!bInCone)
+                        {
+                            Pursuer.bCanSeeTarget = false;
+                        }
+                        else if (Now >= Pursuer.NextVisionTraceTime && TracesLeft > 0)
+                        {
+                            --TracesLeft;
+                            Pursuer.NextVisionTraceTime = Now + Parameters.VisionTraceInterval;
+                            Pursuer.bCanSeeTarget = !World->LineTraceTestByChannel(Transform.GetLocation(), TargetLocation, ECC_Visibility, TraceParams);
+                        }
+
+                        if (Pursuer.bCanSeeTarget)
+                        {
+                            Pursuer.State = EPursuerState::Chase;
+                            Pursuer.LastKnownTargetLocation = TargetLocation;
+                        }
+                        else if (Pursuer.State == EPursuerState::Chase)
+                        {
+                            Pursuer.State = EPursuerState::Search;
+                            Pursuer.SearchGoal = Pursuer.LastKnownTargetLocation;
+                            Pursuer.SearchTimeRemaining = Parameters.SearchDuration;
+                        }
+                    }
+                });
+            }
+
+            UPursuerMovementProcessor::UPursuerMovementProcessor()
+                : EntityQuery(*this)
+            {
+                ExecutionOrder.ExecuteInGroup = UE::Mass::ProcessorGroupNames::Movement;
+                ExecutionOrder.ExecuteAfter.Add(UE::Mass::ProcessorGroupNames::Tasks);
+            }
+
+            void UPursuerMovementProcessor::ConfigureQueries(const TSharedRef<FMassEntityManager>& EntityManager)
+            {
+                EntityQuery.AddRequirement<FTransformFragment>(EMassFragmentAccess::ReadWrite);
+                EntityQuery.AddRequirement<FPursuerFragment>(EMassFragmentAccess::ReadWrite);
+                EntityQuery.AddConstSharedRequirement<FPursuerParameters>();
+                EntityQuery.AddTagRequirement<FPursuerTag>(EMassFragmentPresence::All);
+            }
+
+            void UPursuerMovementProcessor::Execute(FMassEntityManager& EntityManager, FMassExecutionContext& Context)
+            {
+                CODINGWITHAI_SCOPE(PursuerMovement);
+                const float DeltaTime = Context.GetDeltaTimeSeconds();
+
+                EntityQuery.ForEachEntityChunk(Context, [DeltaTime](FMassExecutionContext& ChunkContext)
+                {
+                    const TArrayView<FTransformFragment> Transforms = ChunkContext.GetMutableFragmentView<FTransformFragment>();
+                    const TArrayView<FPursuerFragment> Pursuers = ChunkContext.GetMutableFragmentView<FPursuerFragment>();
+                    const FPursuerParameters& Parameters = ChunkContext.GetConstSharedFragment<FPursuerParameters>();
+
+                    for (int32 Index = 0; Index < ChunkContext.GetNumEntities(); ++Index)
+                    {
+                        FTransform& Transform = Transforms[Index].GetMutableTransform();
+                        FPursuerFragment& Pursuer = Pursuers[Index];
+                        const FVector Location = Transform.GetLocation();
+
+                        FVector Goal;
+                        float Speed;
+                        if (Pursuer.State == EPursuerState::Chase)
+                        {
+                            Goal = Pursuer.LastKnownTargetLocation;
+                            Speed = Parameters.ChaseSpeed;
+                        }
+                        else if (Pursuer.State == EPursuerState::Search)
+                        {
+                            Pursuer.SearchTimeRemaining -= DeltaTime;
+                            if (Pursuer.SearchTimeRemaining <= 0.0f)
+                            {
+                                Pursuer.State = EPursuerState::Idle;
+                                continue;
+                            }
+                            if (FVector::DistSquared2D(Location, Pursuer.SearchGoal) <= FMath::Square(Parameters.AcceptanceRadius))
+                            {
+                                const FVector2D Offset = FMath::RandPointInCircle(Parameters.SearchRadius);
+                                Pursuer.SearchGoal = Pursuer.LastKnownTargetLocation + FVector(Offset, 0.0f);
+                            }
+                            Goal = Pursuer.SearchGoal;
+                            Speed = Parameters.SearchSpeed;
+                        }
+                        else
+                        {
+                            continue;
+                        }
+
+                        const FVector ToGoal = (Goal - Location) * FVector(1.0f, 1.0f, 0.0f);
+                        const float Distance = ToGoal.Size();
+                        if (Distance <= Parameters.AcceptanceRadius)
+                        {
+                            continue;
+                        }
+
+                        const FVector Direction = ToGoal / Distance;
+                        Transform.SetLocation(Location + Direction * FMath::Min(Speed * DeltaTime, Distance));
+                        Transform.SetRotation(Direction.ToOrientationQuat());
+                    }
+                });
+            }
+        '''
+
+        return fragments, trait_header, trait_source, processors_header, processors_source
+
+    # ----------------------------------------------------------------------------------
+    # Network benchmark probe
+    # ----------------------------------------------------------------------------------
+    def _render_net_bench(self) -> tuple[str, ...]:
+        header = f'''
+            #pragma once
+
+            #include "CoreMinimal.h"
+            #include "Subsystems/WorldSubsystem.h"
+            #include "CodingWithAiNetBenchSubsystem.generated.h"
+
+            /**
+             * Server-side probe for network benchmarks, created only with -CodingWithAiNetBench.
+             * Once a second it logs one "NetBench" line with the connected clients, bytes per
+             * second sent and received, and the average and worst server frame time, which
+             * Scripts/benchmark_setup.py --net-bench parses. Frame time is the work done per frame,
+             * without the idle wait of the server's tick-rate cap.
+             */
+            UCLASS()
+            class {self.options.module_api} UCodingWithAiNetBenchSubsystem : public UTickableWorldSubsystem
+            {{
+                GENERATED_BODY()
+
+            public:
+                virtual bool ShouldCreateSubsystem(UObject* Outer) const override;
+                virtual void Tick(float DeltaTime) override;
+                virtual TStatId GetStatId() const override;
+
+            protected:
+                virtual bool DoesSupportWorldType(const EWorldType::Type WorldType) const override;
+
+            private:
+                float WindowSeconds = 0.0f;
+                double WindowWorkSeconds = 0.0;
+                double WindowWorstFrameSeconds = 0.0;
+                int32 WindowFrames = 0;
+            }};
+        '''
+
+        source = f'''
+            #include "Net/CodingWithAiNetBenchSubsystem.h"
+
+            #include "CodingWithAiLog.h"
+            #include "Engine/NetDriver.h"
+            #include "Engine/World.h"
+            #include "Misc/App.h"
+            #include "Misc/CommandLine.h"
+            #include "Misc/Parse.h"
+
+            bool UCodingWithAiNetBenchSubsystem::ShouldCreateSubsystem(UObject* Outer) const
+            {{
+                return Super::ShouldCreateSubsystem(Outer) && FParse::Param(FCommandLine::Get(), TEXT("CodingWithAiNetBench"));
+            }}
+
+            bool UCodingWithAiNetBenchSubsystem::DoesSupportWorldType(const EWorldType::Type WorldType) const
+            {{
+                return WorldType == EWorldType::Game;
+            }}
+
+            void UCodingWithAiNetBenchSubsystem::Tick(float DeltaTime)
+            {{
+                Super::Tick(DeltaTime);
+
+                const UNetDriver* NetDriver = GetWorld()->GetNetDriver();
+                if (!NetDriver || !NetDriver->IsServer())
+                {{
+                    return;
+                }}
+
+                // DeltaTime is clamped to the tick interval by the tick-rate cap, so subtract the time
+                // the engine slept waiting for the next tick to get the frame's actual work.
+                const double FrameWorkSeconds = FMath::Max(FApp::GetDeltaTime() - FApp::GetIdleTime(), 0.0);
+                WindowSeconds += DeltaTime;
+                WindowWorkSeconds += FrameWorkSeconds;
+                WindowWorstFrameSeconds = FMath::Max(WindowWorstFrameSeconds, FrameWorkSeconds);
+                ++WindowFrames;
+                if (WindowSeconds < 1.0f)
+                {{
+                    return;
+                }}
+
+                UE_LOG(LogCodingWithAi, Display, TEXT("NetBench clients=%d out_bytes_per_sec=%d in_bytes_per_sec=%d avg_frame_ms=%.3f max_frame_ms=%.3f"),
+                    NetDriver->ClientConnections.Num(),
+                    static_cast<int32>(NetDriver->OutBytesPerSecond),
+                    static_cast<int32>(NetDriver->InBytesPerSecond),
+                    WindowWorkSeconds * 1000.0 / WindowFrames,
+                    WindowWorstFrameSeconds * 1000.0);
+
+                WindowSeconds = 0.0f;
+                WindowWorkSeconds = 0.0;
+                WindowWorstFrameSeconds = 0.0;
+                WindowFrames = 0;
+            }}
+
+            TStatId UCodingWithAiNetBenchSubsystem::GetStatId() const
+            {{
+                RETURN_QUICK_DECLARE_CYCLE_STAT(UCodingWithAiNetBenchSubsystem, STATGROUP_Tickables);
+            }}
+        '''
+
+        return header, source
+
+    # ----------------------------------------------------------------------------------
+    # Performance automation tests
+    # ----------------------------------------------------------------------------------
+    def _render_performance_tests(self) -> tuple[str, ...]:
+        if self.options.shader_backend == "parameter_collection":
+            heat_includes = """
+                #include "Materials/MaterialParameterCollection.h"
+            """
+            # A transient collection with the two parameters the manager writes.
+            heat_setup = """
+                UMaterialParameterCollection* Collection = NewObject<UMaterialParameterCollection>(GetTransientPackage());
+                for (const TCHAR* ParameterName : {TEXT("HeatValue"), TEXT("HeatIntensity")})
+                {
+                    Collection->ScalarParameters.AddDefaulted_GetRef().ParameterName = ParameterName;
+                }
+                World->AddParameterCollectionInstance(Collection, true);
+                SetObjectProperty(Manager, TEXT("ParameterCollection"), Collection);
+            """
+        else:
+            heat_includes = """
+                #include "Materials/Material.h"
+            """
+            heat_setup = """
+                SetObjectProperty(Manager, TEXT("BaseMaterial"), UMaterial::GetDefaultMaterial(MD_Surface));
+            """
+
+        movement = '''
+            #include "Characters/AgentKaiCharacter.h"
+            #include "Misc/AutomationTest.h"
+
+            #if WITH_DEV_AUTOMATION_TESTS
+
+            IMPLEMENT_SIMPLE_AUTOMATION_TEST(
+                FAgentKaiYawBasisBenchmark,
+                "CodingWithAi.Perf.MovementYawBasis",
+                EAutomationTestFlags::ApplicationContextMask | EAutomationTestFlags::PerfFilter)
+
+            bool FAgentKaiYawBasisBenchmark::RunTest(const FString& Parameters)
+            {
+                constexpr int32 Frames = 200000;
+
+                // Previous per-axis handlers: one FRotationMatrix per axis per frame.
+                FVector Checksum = FVector::ZeroVector;
+                const double PerAxisStart = FPlatformTime::Seconds();
+                for (int32 Frame = 0; Frame < Frames; ++Frame)
+                {
+                    const FRotator YawRotation(0.0f, Frame * 0.01f, 0.0f);
+                    Checksum += FRotationMatrix(YawRotation).GetUnitAxis(EAxis::X);
+                    Checksum += FRotationMatrix(YawRotation).GetUnitAxis(EAxis::Y);
+                }
+                const double PerAxisSeconds = FPlatformTime::Seconds() - PerAxisStart;
+
+                // Combined handler: one sin/cos pair per frame shared by both axes.
+                FVector CombinedChecksum = FVector::ZeroVector;
+                const double CombinedStart = FPlatformTime::Seconds();
+                for (int32 Frame = 0; Frame < Frames; ++Frame)
+                {
+                    FVector Forward, Right;
+                    AAgentKaiCharacter::ComputeYawBasis(Frame * 0.01f, Forward, Right);
+                    CombinedChecksum += Forward;
+                    CombinedChecksum += Right;
+                }
+                const double CombinedSeconds = FPlatformTime::Seconds() - CombinedStart;
+
+                TestTrue(TEXT("Combined basis matches the per-axis rotation matrices"), Checksum.Equals(CombinedChecksum, 1.0f));
+                AddInfo(FString::Printf(
+                    TEXT("Yaw basis over %d frames: per-axis %.3f ms, combined %.3f ms (%.1f ns saved per frame)"),
+                    Frames,
+                    PerAxisSeconds * 1000.0,
+                    CombinedSeconds * 1000.0,
+                    (PerAxisSeconds - CombinedSeconds) * 1.0e9 / Frames));
+                return true;
+            }
+
+            #endif
+        '''
+
+        gameplay = f'''
+            #include "AI/EnemyAIController.h"
+            #include "Async/TaskGraphInterfaces.h"
+            #include "Characters/AgentKaiCharacter.h"
+            #include "Characters/EnemyAICharacter.h"
+            #include "Collectibles/CollectibleItem.h"
+            #include "Components/StaticMeshComponent.h"
+            #include "Engine/Engine.h"
+            #include "Engine/GameInstance.h"
+            #include "Engine/StaticMesh.h"
+            #include "Engine/World.h"
+            {_embed(heat_includes, 12)}
+            #include "Misc/AutomationTest.h"
+            #include "Misc/DateTime.h"
+            #include "Misc/FileHelper.h"
+            #include "Misc/Paths.h"
+            #include "Shaders/ProgressShaderManager.h"
+
+            #if WITH_DEV_AUTOMATION_TESTS
+
+            namespace CodingWithAiPerf
+            {{
+                constexpr int32 NumCollectibles = 500;
+                constexpr int32 NumEnemies = 50;
+                constexpr int32 NumFrames = 300;
+                constexpr float FrameDelta = 1.0f / 60.0f;
+
+                struct FFrameStats
+                {{
+                    TArray<double> FrameMs;
+                    TArray<double> GameThreadMs;
+                    int32 UObjectDelta = 0;
+                    int64 MemoryDeltaBytes = 0;
+                }};
+
+                UWorld* CreateWorld()
+                {{
+                    UWorld* World = UWorld::CreateWorld(EWorldType::Game, false, TEXT("CodingWithAiPerfWorld"));
+                    FWorldContext& WorldContext = GEngine->CreateNewWorldContext(EWorldType::Game);
+                    WorldContext.SetCurrentWorld(World);
+
+                    // Without a game instance and game mode the world never begins play, so no
+                    // actor would run BeginPlay or register its tick.
+                    UGameInstance* GameInstance = NewObject<UGameInstance>(GEngine);
+                    WorldContext.OwningGameInstance = GameInstance;
+                    World->SetGameInstance(GameInstance);
+
+                    FURL URL;
+                    URL.AddOption(TEXT("game=/Script/Engine.GameModeBase"));
+                    World->SetGameMode(URL);
+                    World->InitializeActorsForPlay(URL);
+                    World->BeginPlay();
+                    return World;
+                }}
+
+                void DestroyWorld(UWorld* World)
+                {{
+                    GEngine->DestroyWorldContext(World);
+                    World->DestroyWorld(false);
+                }}
+
+                void SetObjectProperty(UObject* Target, FName Name, UObject* Value)
+                {{
+                    if (FObjectPropertyBase* Property = FindFProperty<FObjectPropertyBase>(Target->GetClass(), Name))
+                    {{
+                        Property->SetObjectPropertyValue_InContainer(Target, Value);
+                    }}
+                }}
+
+                /** Ticks the world for NumFrames; BeforeTick drives input for the frame. */
+                FFrameStats RunFrames(UWorld* World, TFunctionRef<void(int32)> BeforeTick)
+                {{
+                    FFrameStats Stats;
+                    const int32 ObjectsBefore = GUObjectArray.GetObjectArrayNumMinusAvailable();
+                    const uint64 MemoryBefore = FPlatformMemory::GetStats().UsedPhysical;
+
+                    for (int32 Frame = 0; Frame < NumFrames; ++Frame)
+                    {{
+                        const double FrameStart = FPlatformTime::Seconds();
+                        BeforeTick(Frame);
+                        World->Tick(LEVELTICK_All, FrameDelta);
+                        const double GameThreadEnd = FPlatformTime::Seconds();
+
+                        // Frame time also covers the task graph work (async traces, perception) the tick queued.
+                        FTaskGraphInterface::Get().ProcessThreadUntilIdle(ENamedThreads::GameThread);
+
+                        Stats.GameThreadMs.Add((GameThreadEnd - FrameStart) * 1000.0);
+                        Stats.FrameMs.Add((FPlatformTime::Seconds() - FrameStart) * 1000.0);
+                    }}
+
+                    Stats.UObjectDelta = GUObjectArray.GetObjectArrayNumMinusAvailable() - ObjectsBefore;
+                    Stats.MemoryDeltaBytes = static_cast<int64>(FPlatformMemory::GetStats().UsedPhysical) - static_cast<int64>(MemoryBefore);
+                    return Stats;
+                }}
+
+                double Average(const TArray<double>& Samples)
+                {{
+                    double Sum = 0.0;
+                    for (const double Sample : Samples)
+                    {{
+                        Sum += Sample;
+                    }}
+                    return Samples.Num() > 0 ? Sum / Samples.Num() : 0.0;
+                }}
+
+                double Percentile95(TArray<double> Samples)
+                {{
+                    if (Samples.IsEmpty())
+                    {{
+                        return 0.0;
+                    }}
+                    Samples.Sort();
+                    return Samples[FMath::Min(FMath::FloorToInt32(Samples.Num() * 0.95), Samples.Num() - 1)];
+                }}
+
+                /** Appends one row per scenario to Saved/Automation/CodingWithAiPerf.csv for CI to diff. */
+                void AppendCsv(const TCHAR* Scenario, int32 Collectibles, int32 Enemies, const FFrameStats& Stats)
+                {{
+                    const FString Path = FPaths::ProjectSavedDir() / TEXT("Automation") / TEXT("CodingWithAiPerf.csv");
+                    if (!FPaths::FileExists(Path))
+                    {{
+                        FFileHelper::SaveStringToFile(
+                            TEXT("Timestamp,Scenario,Collectibles,Enemies,Frames,AvgFrameMs,P95FrameMs,AvgGameThreadMs,P95GameThreadMs,UObjectDelta,MemoryDeltaKB\\n"),
+                            *Path);
+                    }}
+
+                    const FString Row = FString::Printf(
+                        TEXT("%s,%s,%d,%d,%d,%.4f,%.4f,%.4f,%.4f,%d,%lld\\n"),
+                        *FDateTime::UtcNow().ToIso8601(),
+                        Scenario,
+                        Collectibles,
+                        Enemies,
+                        Stats.FrameMs.Num(),
+                        Average(Stats.FrameMs),
+                        Percentile95(Stats.FrameMs),
+                        Average(Stats.GameThreadMs),
+                        Percentile95(Stats.GameThreadMs),
+                        Stats.UObjectDelta,
+                        Stats.MemoryDeltaBytes / 1024);
+                    FFileHelper::SaveStringToFile(Row, *Path, FFileHelper::EEncodingOptions::AutoDetect, &IFileManager::Get(), FILEWRITE_Append);
+                }}
+            }}
+
+            BEGIN_DEFINE_SPEC(
+                FCodingWithAiGameplayPerfSpec,
+                "CodingWithAi.Perf.Gameplay",
+                EAutomationTestFlags::ApplicationContextMask | EAutomationTestFlags::PerfFilter)
+                UWorld* World = nullptr;
+                AAgentKaiCharacter* Agent = nullptr;
+
+                /** Engine cube with simple collision, so every grab query has geometry to hit. */
+                UStaticMesh* ItemMesh = nullptr;
+
+                void SpawnCollectibles(int32 Count);
+                void SpawnEnemies(int32 Count);
+                void Record(const TCHAR* Scenario, int32 Collectibles, int32 Enemies, const CodingWithAiPerf::FFrameStats& Stats);
+            END_DEFINE_SPEC(FCodingWithAiGameplayPerfSpec)
+
+            void FCodingWithAiGameplayPerfSpec::SpawnCollectibles(int32 Count)
+            {{
+                // A grid in front of the hero so some pickups are always inside the grab cone.
+                const int32 Columns = FMath::CeilToInt32(FMath::Sqrt(static_cast<float>(Count)));
+                for (int32 Index = 0; Index < Count; ++Index)
+                {{
+                    const FVector Location(100.0f + (Index / Columns) * 80.0f, ((Index % Columns) - Columns / 2) * 80.0f, 50.0f);
+                    const FTransform Transform(FQuat::Identity, Location, FVector(0.3f));
+                    ACollectibleItem* Item = World->SpawnActorDeferred<ACollectibleItem>(ACollectibleItem::StaticClass(), Transform);
+                    Item->GetItemMesh()->SetStaticMesh(ItemMesh);
+                    Item->FinishSpawning(Transform);
+                }}
+            }}
+
+            void FCodingWithAiGameplayPerfSpec::SpawnEnemies(int32 Count)
+            {{
+                for (int32 Index = 0; Index < Count; ++Index)
+                {{
+                    const float Angle = 2.0f * PI * Index / Count;
+                    const FTransform Transform(FVector(FMath::Cos(Angle), FMath::Sin(Angle), 0.0f) * 1500.0f + FVector(0.0f, 0.0f, 100.0f));
+                    AEnemyAICharacter* Enemy = World->SpawnActorDeferred<AEnemyAICharacter>(AEnemyAICharacter::StaticClass(), Transform);
+                    Enemy->AIControllerClass = AEnemyAIController::StaticClass();
+                    Enemy->FinishSpawning(Transform);
+                }}
+            }}
+
+            void FCodingWithAiGameplayPerfSpec::Record(const TCHAR* Scenario, int32 Collectibles, int32 Enemies, const CodingWithAiPerf::FFrameStats& Stats)
+            {{
+                CodingWithAiPerf::AppendCsv(Scenario, Collectibles, Enemies, Stats);
+                AddInfo(FString::Printf(
+                    TEXT("%s: avg frame %.3f ms, p95 %.3f ms, game thread %.3f ms, %d UObjects, %lld KiB"),
+                    Scenario,
+                    CodingWithAiPerf::Average(Stats.FrameMs),
+                    CodingWithAiPerf::Percentile95(Stats.FrameMs),
+                    CodingWithAiPerf::Average(Stats.GameThreadMs),
+                    Stats.UObjectDelta,
+                    Stats.MemoryDeltaBytes / 1024));
+                TestEqual(TEXT("Recorded frames"), Stats.FrameMs.Num(), CodingWithAiPerf::NumFrames);
+            }}
+
+            void FCodingWithAiGameplayPerfSpec::Define()
+            {{
+                using namespace CodingWithAiPerf;
+
+                BeforeEach([this]()
+                {{
+                    ItemMesh = LoadObject<UStaticMesh>(nullptr, TEXT("/Engine/BasicShapes/Cube.Cube"));
+                    World = CreateWorld();
+                    Agent = World->SpawnActor<AAgentKaiCharacter>(FVector(0.0f, 0.0f, 100.0f), FRotator::ZeroRotator);
+                }});
+
+                AfterEach([this]()
+                {{
+                    DestroyWorld(World);
+                    World = nullptr;
+                    Agent = nullptr;
+                }});
+
+                It("grabs from a field of collectibles", [this]()
+                {{
+                    TestNotNull(TEXT("Collectible mesh"), ItemMesh);
+                    SpawnCollectibles(NumCollectibles);
+                    const FFrameStats Stats = RunFrames(World, [this](int32 Frame)
+                    {{
+                        Agent->SetActorRotation(FRotator(0.0f, (Frame % 90) - 45.0f, 0.0f));
+                        if (Frame % 5 == 0)
+                        {{
+                            Agent->StartGrab();
+                        }}
+                    }});
+                    Record(TEXT("Grab"), NumCollectibles, 0, Stats);
+                    TestTrue(TEXT("Grabs collected items"), Agent->GetCollectedCount() > 0);
+                }});
+
+                It("refreshes heat while the hero moves", [this]()
+                {{
+                    AActor* Target = World->SpawnActor<ACollectibleItem>(FVector(800.0f, 0.0f, 50.0f), FRotator::ZeroRotator);
+                    const FTransform Transform;
+                    AProgressShaderManager* Manager = World->SpawnActorDeferred<AProgressShaderManager>(AProgressShaderManager::StaticClass(), Transform);
+                    SetObjectProperty(Manager, TEXT("PlayerActor"), Agent);
+                    SetObjectProperty(Manager, TEXT("TargetActor"), Target);
+                    {_embed(heat_setup, 20)}
+                    Manager->FinishSpawning(Transform);
+
+                    const FFrameStats Stats = RunFrames(World, [this](int32 Frame)
+                    {{
+                        Agent->SetActorLocation(FVector(FMath::Sin(Frame * 0.05f) * 600.0f, 0.0f, 100.0f));
+                    }});
+                    Record(TEXT("Heat"), 1, 0, Stats);
+                }});
+
+                It("chases and searches with a crowd of pursuers", [this]()
+                {{
+                    SpawnEnemies(NumEnemies);
+                    const FFrameStats Stats = RunFrames(World, [this](int32 Frame)
+                    {{
+                        // Circle through the ring so enemies keep gaining and losing sight of the hero.
+                        const float Angle = Frame * 0.03f;
+                        Agent->SetActorLocation(FVector(FMath::Cos(Angle), FMath::Sin(Angle), 0.0f) * 1200.0f + FVector(0.0f, 0.0f, 100.0f));
+                    }});
+                    Record(TEXT("Chase"), 0, NumEnemies, Stats);
+                }});
+            }}
+
+            #endif
+        '''
+
+        return movement, gameplay
+
+
+# --------------------------------------------------------------------------------------
+# Command line / batch mode
+# --------------------------------------------------------------------------------------
+@dataclass
+class ProjectResult:
+    project_root: Path
+    seconds: float
+    report: GenerationReport | None = None
+    error: str | None = None
+
+
+def _seed_render_cache(entries: dict[tuple[GeneratorOptions, str], tuple[bytes, ...]]) -> None:
+    _RENDER_CACHE.update(entries)
+
+
+def _generate_project(
+    project_root: Path,
+    options: GeneratorOptions,
+    only: Sequence[str] | None,
+    incremental: bool,
+    template_cache: bool,
+    dry_run: bool,
+    prune: bool,
+) -> ProjectResult:
+    started = time.perf_counter()
+    try:
+        setup = CodingWithAiSetup(project_root, options, template_cache=template_cache)
+        report = setup.run(only=only, incremental=incremental, quiet=True, dry_run=dry_run, prune=prune)
+    except Exception as error:  # one broken checkout must not abort the whole batch
+        return ProjectResult(project_root, time.perf_counter() - started, error=f"{type(error).__name__}: {error}")
+    return ProjectResult(project_root, time.perf_counter() - started, report=report)
+
+
+def load_project_manifest(path: Path, defaults: GeneratorOptions) -> list[tuple[Path, GeneratorOptions]]:
+    """Read a JSON list of project roots.
+
+    Entries are either a path string or an object with ``root`` and optional
+    GeneratorOptions overrides such as ``project_name`` or ``shader_backend``. Relative roots
+    and template directories resolve against the manifest.
+    """
+    entries = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: expected a JSON list of project roots")
+    if not entries:
+        raise ValueError(f"{path}: lists no projects")
+
+    projects = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"root": entry}
+        overrides = {key: value for key, value in entry.items() if key != "root"}
+        unknown = set(overrides) - {option.name for option in fields(GeneratorOptions)}
+        if unknown:
+            raise ValueError(f"{path}: unknown option(s) {', '.join(sorted(unknown))}")
+        if overrides.get("template_dir"):
+            overrides["template_dir"] = str((path.parent / overrides["template_dir"]).resolve())
+        options = replace(defaults, **overrides)
+        projects.append(((path.parent / entry["root"]).resolve(), options))
+    return projects
+
+
+def generate_projects(
+    projects: Sequence[tuple[Path, GeneratorOptions]],
+    only: Sequence[str] | None = None,
+    incremental: bool = True,
+    jobs: int | None = None,
+    template_cache: bool = True,
+    dry_run: bool = False,
+    prune: bool = True,
+) -> list[ProjectResult]:
+    """Generate many projects in one process, fanning the disk work out over a process pool.
+
+    Templates are rendered once per distinct set of options in the parent process and
+    handed to the workers, so no worker re-renders what another project already produced.
+    """
+    first_roots: dict[GeneratorOptions, Path] = {}
+    for root, options in projects:
+        first_roots.setdefault(options, root)
+    for options, root in first_roots.items():
+        CodingWithAiSetup(root, options, template_cache=template_cache and not dry_run).render(only)
+
+    settings = (only, incremental, template_cache, dry_run, prune)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(projects)))
+    if jobs == 1:
+        return [_generate_project(root, options, *settings) for root, options in projects]
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_seed_render_cache, initargs=(dict(_RENDER_CACHE),)) as pool:
+        futures = [pool.submit(_generate_project, root, options, *settings) for root, options in projects]
+        return [future.result() for future in futures]
+
+
+def print_timing_report(results: Sequence[ProjectResult], elapsed: float) -> None:
+    width = max([len("Project")] + [len(str(result.project_root)) for result in results])
+    print(f"{'Project':<{width}}  {'Written':>7}  {'Unchanged':>9}  {'Pruned':>6}  {'Stale':>5}  {'Seconds':>8}")
+    for result in results:
+        if result.report is None:
+            print(f"{str(result.project_root):<{width}}  FAILED {result.error}")
+            continue
+        report = result.report
+        print(
+            f"{str(result.project_root):<{width}}  {len(report.written):>7}  {len(report.skipped):>9}  "
+            f"{len(report.pruned):>6}  {len(report.stale):>5}  {result.seconds:>8.3f}"
+        )
+    failed = sum(result.report is None for result in results)
+    print(f"Generated {len(results) - failed}/{len(results)} projects in {elapsed:.3f}s")
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate the Coding_with_Ai C++ scaffolding for one or more UE5 projects.")
+    parser.add_argument("project_roots", nargs="*", type=Path, help="UE5 project roots (default: this script's project)")
+    parser.add_argument("--manifest", type=Path, help="JSON list of project roots to generate")
+    parser.add_argument("--only", action="append", metavar="UNIT", help="generate only this unit and its dependents (repeatable)")
+    parser.add_argument("--full", action="store_true", help="rewrite every file instead of skipping unchanged ones")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--project-name", default=PROJECT_NAME)
+    parser.add_argument("--module-api", default=MODULE_API)
+    parser.add_argument("--shader-backend", choices=SHADER_BACKENDS, default="dynamic_instance")
+    parser.add_argument("--shipping-log-verbosity", choices=LOG_VERBOSITIES, default="Warning")
+    parser.add_argument("--build-profile", choices=BUILD_PROFILES, default="fast_iteration")
+    parser.add_argument("--grab-query", choices=GRAB_QUERIES, default="registry")
+    parser.add_argument("--mass-crowd", action="store_true", help="also generate the MassEntity pursuer crowd")
+    parser.add_argument("--replication", action="store_true", help="generate server-authoritative, replicated gameplay")
+    parser.add_argument("--template-dir", type=Path, help="directory of extra or replacement generation units")
+    parser.add_argument("--no-template-cache", action="store_true", help="ignore and do not write the on-disk render cache")
+    parser.add_argument("--diff", action="store_true", help="print unified diffs of what would change without touching disk")
+    parser.add_argument("--keep-stale", action="store_true", help="do not delete files the generator no longer produces")
+    args = parser.parse_args(argv)
+
+    defaults = GeneratorOptions(
+        project_name=args.project_name,
+        module_api=args.module_api,
+        shader_backend=args.shader_backend,
+        shipping_log_verbosity=args.shipping_log_verbosity,
+        build_profile=args.build_profile,
+        grab_query=args.grab_query,
+        mass_crowd=args.mass_crowd,
+        replication=args.replication,
+        template_dir=str(args.template_dir.resolve()) if args.template_dir else None,
+    )
+    projects = [(root.resolve(), defaults) for root in args.project_roots]
+    try:
+        if args.manifest:
+            projects += load_project_manifest(args.manifest, defaults)
+        if not projects:
+            setup = CodingWithAiSetup(options=defaults, template_cache=not args.no_template_cache)
+            setup.run(only=args.only, incremental=not args.full, dry_run=args.diff, prune=not args.keep_stale)
+            return 0
+
+        started = time.perf_counter()
+        results = generate_projects(
+            projects,
+            only=args.only,
+            incremental=not args.full,
+            jobs=args.jobs,
+            template_cache=not args.no_template_cache,
+            dry_run=args.diff,
+            prune=not args.keep_stale,
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    for result in results:
+        if result.report and result.report.diffs:
+            print("".join(result.report.diffs), end="")
+    print_timing_report(results, time.perf_counter() - started)
+    return 1 if any(result.report is None for result in results) else 0
 
 
 if __name__ == "__main__":
-    setup = CodingWithAiSetup()
-    setup.run()
+    raise SystemExit(main())